@@ -0,0 +1,119 @@
+"""
+Benchmark: many threads hammering one popular park/day through reserve_tickets.
+
+Checks that the conditional UPDATE never oversells and reports throughput.
+
+    python benchmarks/bench_capacity.py --threads 16 --capacity 2000
+    python benchmarks/bench_capacity.py --database-url mysql+pymysql://user:pw@host/db
+
+Point --database-url at a scratch database only: all tables are dropped first.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, datetime
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--capacity', type=int, default=2000)
+    parser.add_argument('--max-tickets', type=int, default=4)
+    parser.add_argument('--database-url', default=None,
+                        help='defaults to a temporary SQLite file')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    tmpdir = None
+    if args.database_url is None:
+        tmpdir = tempfile.mkdtemp(prefix='bench_capacity_')
+        args.database_url = 'sqlite:///' + os.path.join(tmpdir, 'bench.db')
+    os.environ['TEST_DATABASE_URL'] = args.database_url
+
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'main'))
+    from sqlalchemy.exc import OperationalError
+    from app import create_app, db
+    from app.models import Park, Booking, ParkDayInventory, User
+    from app.capacity import reserve_tickets, SoldOutError
+
+    app = create_app('testing')
+    day = date(2030, 10, 31)
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        park = Park(name='Bench Park', location='Dublin', description='bench',
+                    short_description='bench', slug='bench-park', daily_capacity=args.capacity)
+        user = User(name='Bench', last_name='User', email='bench@example.com', password='x')
+        db.session.add_all([park, user])
+        db.session.commit()
+        park_id, user_id = park.park_id, user.user_id
+
+    counters = {'ok': 0, 'sold_out': 0, 'locked': 0, 'tickets': 0}
+    lock = threading.Lock()
+    start_gate = threading.Barrier(args.threads)
+
+    def worker():
+        rng = random.Random()
+        start_gate.wait()
+        with app.app_context():
+            while True:
+                n = rng.randint(1, args.max_tickets)
+                try:
+                    reserve_tickets(park_id, day, n)
+                    db.session.add(Booking(user_id=user_id, park_id=park_id,
+                                           date=datetime.combine(day, datetime.min.time()),
+                                           num_tickets=n, health_safety=True))
+                    db.session.commit()
+                    with lock:
+                        counters['ok'] += 1
+                        counters['tickets'] += n
+                except SoldOutError:
+                    db.session.rollback()
+                    with lock:
+                        counters['sold_out'] += 1
+                    if n == 1:
+                        break
+                except OperationalError:
+                    db.session.rollback()
+                    with lock:
+                        counters['locked'] += 1
+            db.session.remove()
+
+    threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    with app.app_context():
+        sold = db.session.get(ParkDayInventory, (park_id, day)).tickets_sold
+        booked = db.session.query(db.func.sum(Booking.num_tickets)).filter_by(park_id=park_id).scalar() or 0
+
+    print(f'database         {app.config["SQLALCHEMY_DATABASE_URI"]}')
+    print(f'threads          {args.threads}')
+    print(f'capacity         {args.capacity}')
+    print(f'bookings         {counters["ok"]}')
+    print(f'sold-out replies {counters["sold_out"]}')
+    print(f'lock retries     {counters["locked"]}')
+    print(f'elapsed          {elapsed:.3f}s')
+    print(f'throughput       {counters["ok"] / elapsed:.1f} bookings/s')
+    print(f'inventory sold   {sold}')
+    print(f'booked tickets   {booked}')
+
+    assert sold == booked == counters['tickets'], 'inventory and bookings disagree'
+    assert sold <= args.capacity, 'oversold!'
+    print('OK: no oversell')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,338 @@
+"""
+Benchmark: HTTP load through scripted user journeys, with per-route latency percentiles.
+
+Each virtual user repeats one journey with a fresh cookie jar:
+
+    index        GET  /
+    park_detail  GET  /parks/<id>          (popular parks more often)
+    login        POST /login               (a seeded customer, repeat customers more often)
+    booking      POST /booking             (1-4 tickets, 1-60 days ahead; only a
+                                            redirect to /profile is a confirmed booking)
+    profile      GET  /profile
+
+Transports:
+    client   app.test_client() per virtual user, no network (default)
+    http     a threaded werkzeug server started in this process, driven over
+             real sockets; or --url to target a server that is already running
+             (gunicorn etc.) on the same --database-url
+
+--threads virtual users run in each of --processes processes. Requests made
+during the first --warmup seconds are not recorded. A request that fails or
+lands anywhere but its expected page (a sold-out or busy booking is sent back
+to /booking/new) counts as an error and is left out of the percentiles.
+
+    python benchmarks/bench_http.py --threads 8 --duration 30
+    python benchmarks/bench_http.py --transport http --processes 4 --threads 4
+    python benchmarks/bench_http.py --database-url sqlite:////tmp/scale.db   # after flask seed --scale
+
+Without --database-url a temporary SQLite file is seeded with a small
+`flask seed --scale` population. Logins use the production password hash
+cost, as they would in production. Bookings are real writes: point
+--database-url at a scratch copy.
+
+Results and regressions:
+
+    python benchmarks/bench_http.py --output baseline.json           # on main
+    python benchmarks/bench_http.py --baseline baseline.json         # on the branch
+
+With --baseline, p95/p99 latency and throughput per route are compared and
+the script exits with status 1 if any got worse by more than --tolerance.
+"""
+import argparse
+import http.cookiejar
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import date, timedelta
+
+import benchstats
+
+ROUTES = ('index', 'park_detail', 'login', 'booking', 'profile')
+PASSWORD = 'password123'
+REGRESSION_METRICS = {'p95_ms': 1, 'p99_ms': 1, 'rps': -1}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--transport', choices=('client', 'http'), default='client')
+    parser.add_argument('--url', default=None, help='base URL of a running server (http transport)')
+    parser.add_argument('--threads', type=int, default=8, help='virtual users per process')
+    parser.add_argument('--processes', type=int, default=1)
+    parser.add_argument('--duration', type=float, default=20, help='recorded seconds')
+    parser.add_argument('--warmup', type=float, default=3, help='unrecorded seconds before that')
+    parser.add_argument('--database-url', default=None, help='defaults to a freshly seeded temporary SQLite file')
+    parser.add_argument('--seed-users', type=int, default=2000, help='size of the temporary database')
+    parser.add_argument('--seed-bookings', type=int, default=50000, help='size of the temporary database')
+    parser.add_argument('--output', default=None, help='write results as JSON')
+    parser.add_argument('--baseline', default=None, help='results JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.15, help='allowed relative slowdown')
+    parser.add_argument('--random-seed', type=int, default=1)
+    parser.add_argument('--worker', type=int, default=None, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def build_app(database_url):
+    os.environ['TEST_DATABASE_URL'] = database_url
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'main'))
+    from app import create_app
+    from config import Config
+
+    app = create_app('testing')
+    # errors become 500 responses instead of exceptions, and logins pay the real hash cost
+    app.config.update(TESTING=False, PASSWORD_HASH_METHOD=Config.PASSWORD_HASH_METHOD)
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    return app
+
+
+def seed_database(app, args):
+    from app import db
+    from app.seed_data.scale import ScaleSeeder
+    end = date.today() + timedelta(days=90)
+    with app.app_context():
+        db.create_all()
+        ScaleSeeder(args.seed_users, 20, args.seed_bookings, 1000, end - timedelta(days=364), end,
+                    password=PASSWORD).run()
+        db.session.remove()
+
+
+def load_targets(app):
+    """Park ids by popularity and the number of seeded customers."""
+    from app import db
+    from app.models import Booking, Park, User
+    from app.seed_data.scale import SCALE_DOMAIN
+    with app.app_context():
+        parks = [row[0] for row in db.session.execute(
+            db.select(Park.park_id).outerjoin(Booking).group_by(Park.park_id)
+            .order_by(db.func.count(Booking.booking_id).desc()))]
+        users = User.query.filter(User.email.like(f'%@{SCALE_DOMAIN}')).count()
+        db.session.remove()
+    if not parks or not users:
+        sys.exit('no seeded customers: run `flask seed --scale` against --database-url first')
+    return parks, users
+
+
+class ClientSession:
+    """One virtual user on app.test_client()."""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def send(self, method, path, data=None):
+        response = self.client.open(path, method=method, data=data)
+        response.get_data()
+        response.close()
+        return response.status_code, response.headers.get('Location', '')
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HttpSession:
+    """One virtual user over HTTP with its own cookie jar; redirects are not followed."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), _NoRedirect())
+
+    def send(self, method, path, data=None):
+        body = urllib.parse.urlencode(data).encode() if data is not None else None
+        request = urllib.request.Request(self.base_url + path, data=body, method=method)
+        try:
+            with self.opener.open(request, timeout=60) as response:
+                response.read()
+                return response.status, response.headers.get('Location', '')
+        except urllib.error.HTTPError as error:
+            error.read()
+            return error.code, error.headers.get('Location', '')
+        except OSError:
+            return 599, ''
+
+
+class Recorder:
+    """Per-thread samples of successful requests; nothing is recorded before the warmup ends."""
+
+    def __init__(self, record_from):
+        self.record_from = record_from
+        self.samples = {route: [] for route in ROUTES}
+        self.errors = {route: 0 for route in ROUTES}
+        self.journeys = 0
+
+    def timed(self, route, session, method, path, data=None, expect=None):
+        started = time.perf_counter()
+        status, location = session.send(method, path, data)
+        elapsed = time.perf_counter() - started
+        if started >= self.record_from:
+            if status >= 400 or (expect and expect not in location):
+                self.errors[route] += 1
+            else:
+                self.samples[route].append(elapsed)
+        return status
+
+
+def journey(session, recorder, rng, parks, users):
+    # the same skew as the seeder: popular parks and repeat customers come up most
+    park = parks[int(len(parks) * rng.random() ** 2)]
+    user = int(users * rng.random() ** 3)
+    day = date.today() + timedelta(days=rng.randint(1, 60))
+    recorder.timed('index', session, 'GET', '/')
+    recorder.timed('park_detail', session, 'GET', f'/parks/{park}')
+    recorder.timed('login', session, 'POST', '/login',
+                   {'email': f'user{user}@scale.example.com', 'password': PASSWORD}, expect='/profile')
+    recorder.timed('booking', session, 'POST', '/booking',
+                   {'park_id': park, 'date': f'{day.isoformat()}T{rng.randint(9, 18):02d}:00',
+                    'num_tickets': rng.randint(1, 4), 'health_safety': 'on'}, expect='/profile')
+    recorder.timed('profile', session, 'GET', '/profile')
+    if time.perf_counter() >= recorder.record_from:
+        recorder.journeys += 1
+
+
+def run_threads(args, make_session, parks, users, seed):
+    record_from = time.perf_counter() + args.warmup
+    deadline = record_from + args.duration
+    recorders = [Recorder(record_from) for _ in range(args.threads)]
+    gate = threading.Barrier(args.threads)
+
+    def virtual_user(n):
+        rng = random.Random(seed * 1000 + n)
+        gate.wait()
+        while time.perf_counter() < deadline:
+            journey(make_session(), recorders[n], rng, parks, users)
+
+    threads = [threading.Thread(target=virtual_user, args=(n,)) for n in range(args.threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = max(time.perf_counter(), deadline) - record_from
+    return {
+        'elapsed': elapsed,
+        'journeys': sum(r.journeys for r in recorders),
+        'samples': {route: [s for r in recorders for s in r.samples[route]] for route in ROUTES},
+        'errors': {route: sum(r.errors[route] for r in recorders) for route in ROUTES},
+    }
+
+
+def start_server(app):
+    from werkzeug.serving import make_server
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+
+def run_worker(args):
+    """One process of virtual users; prints its raw samples as JSON."""
+    app = build_app(args.database_url)
+    parks, users = load_targets(app)
+    if args.transport == 'http':
+        make_session = lambda: HttpSession(args.url)
+    else:
+        make_session = lambda: ClientSession(app)
+    print(json.dumps(run_threads(args, make_session, parks, users, args.random_seed + args.worker)))
+
+
+def merge(parts):
+    return {
+        'elapsed': max(p['elapsed'] for p in parts),
+        'journeys': sum(p['journeys'] for p in parts),
+        'samples': {route: [s for p in parts for s in p['samples'][route]] for route in ROUTES},
+        'errors': {route: sum(p['errors'][route] for p in parts) for route in ROUTES},
+    }
+
+
+def summarize(run):
+    results = {}
+    for route in ROUTES:
+        stats = benchstats.describe(run['samples'][route])
+        stats['errors'] = run['errors'][route]
+        stats['rps'] = round(stats['count'] / run['elapsed'], 2)
+        results[route] = stats
+    total = [s for route in ROUTES for s in run['samples'][route]]
+    results['all'] = dict(benchstats.describe(total), errors=sum(run['errors'].values()),
+                          rps=round(len(total) / run['elapsed'], 2),
+                          journeys_per_s=round(run['journeys'] / run['elapsed'], 2))
+    return results
+
+
+def print_table(results):
+    columns = ('count', 'errors', 'rps', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms')
+    print(f'{"route":14}' + ''.join(f'{c:>10}' for c in columns))
+    for route, stats in results.items():
+        print(f'{route:14}' + ''.join(f'{str(stats.get(c, "-")):>10}' for c in columns))
+    print(f'journeys/s {results["all"]["journeys_per_s"]}')
+
+
+def main():
+    args = parse_args()
+    if args.worker is not None:
+        return run_worker(args)
+
+    database = args.database_url and args.database_url.split('@')[-1]
+    if args.database_url is None:
+        database = f'temporary sqlite, {args.seed_users} users, {args.seed_bookings} bookings'
+        tmpdir = tempfile.mkdtemp(prefix='bench_http_')
+        args.database_url = 'sqlite:///' + os.path.join(tmpdir, 'bench.db')
+        app = build_app(args.database_url)
+        seed_database(app, args)
+    else:
+        app = build_app(args.database_url)
+
+    server = None
+    if args.transport == 'http' and args.url is None:
+        server, args.url = start_server(app)
+
+    if args.processes > 1:
+        command = [sys.executable, os.path.abspath(__file__), '--database-url', args.database_url,
+                   '--transport', args.transport, '--threads', str(args.threads),
+                   '--duration', str(args.duration), '--warmup', str(args.warmup),
+                   '--random-seed', str(args.random_seed)]
+        if args.url:
+            command += ['--url', args.url]
+        workers = [subprocess.Popen(command + ['--worker', str(n)], stdout=subprocess.PIPE, text=True)
+                   for n in range(args.processes)]
+        outputs = [worker.communicate()[0] for worker in workers]
+        if any(worker.returncode for worker in workers):
+            sys.exit('a worker process failed')
+        run = merge([json.loads(out.strip().splitlines()[-1]) for out in outputs])
+    else:
+        parks, users = load_targets(app)
+        if args.transport == 'http':
+            make_session = lambda: HttpSession(args.url)
+        else:
+            make_session = lambda: ClientSession(app)
+        run = run_threads(args, make_session, parks, users, args.random_seed)
+    if server is not None:
+        server.shutdown()
+
+    results = summarize(run)
+    print_table(results)
+    meta = benchstats.run_meta(benchmark='bench_http', transport=args.transport, url=args.url if server is None else None,
+                               threads=args.threads, processes=args.processes, duration_s=args.duration,
+                               warmup_s=args.warmup, database=database)
+    if args.output:
+        benchstats.save(args.output, meta, results)
+        print(f'results written to {args.output}')
+    if args.baseline:
+        baseline = benchstats.load(args.baseline)
+        for key in ('transport', 'threads', 'processes', 'database'):
+            if baseline['meta'].get(key) != meta[key]:
+                print(f"warning: baseline ran with {key}={baseline['meta'].get(key)!r}, this run {meta[key]!r}")
+        worse = benchstats.compare(results, baseline['results'], REGRESSION_METRICS, tolerance=args.tolerance)
+        benchstats.print_regressions(worse, args.tolerance)
+        if worse:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark: admin inbox search, LIKE '%term%' versus the full-text index.
+
+Fills a temporary SQLite database with synthetic contact messages and runs
+the same queries MessageView issues for a search (row count + first page),
+once through the old LIKE path and once through search.match_messages().
+
+    python benchmarks/bench_message_search.py --messages 200000 --repeat 5
+    python benchmarks/bench_message_search.py --database-url mysql+pymysql://user:pw@host/db
+
+Point --database-url at a scratch database only: all tables are dropped first.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from itertools import accumulate
+from datetime import datetime, timedelta
+
+WORDS = ('the a and was we my to it for of ghost pumpkin haunted maze scream witch spider '
+         'coffin lantern bat ticket booking parking queue family group ride train house '
+         'skeleton candle fog night late early cold refund birthday discount manor').split()
+TERMS = ('refund', 'haunted manor', 'birthd', 'skeleton fog night', 'zombie')
+SYLLABLES = ('ka', 'lo', 'mi', 'ru', 'ten', 'vor', 'sha', 'gel', 'pin', 'dus')
+
+
+def _vocabulary(rng, size=20000):
+    # common words first, then made-up ones; picked with Zipf-like weights
+    made_up = {''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4))) for _ in range(size)}
+    vocabulary = list(WORDS) + sorted(made_up)
+    cum_weights = list(accumulate(1.0 / (rank + 1) for rank in range(len(vocabulary))))
+    return vocabulary, cum_weights
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--page-size', type=int, default=20)
+    parser.add_argument('--database-url', default=None,
+                        help='defaults to a temporary SQLite file')
+    return parser.parse_args()
+
+
+def _timed(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), result
+
+
+def main():
+    args = parse_args()
+    if args.database_url is None:
+        args.database_url = 'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='bench_search_'), 'bench.db')
+    os.environ['TEST_DATABASE_URL'] = args.database_url
+
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'main'))
+    from sqlalchemy import Unicode, cast, or_
+    from app import create_app, db
+    from app.models import Message
+    from app.search import match_messages
+
+    app = create_app('testing')
+    app.config['QUERY_SLOW_MS'] = None
+    rng = random.Random(42)
+    vocabulary, cum_weights = _vocabulary(rng)
+    start = datetime(2025, 1, 1)
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        loaded = time.perf_counter()
+        for offset in range(0, args.messages, 10000):
+            rows = [{'name': f'Visitor {i}', 'email': f'visitor{i}@example.com',
+                     'message': ' '.join(rng.choices(vocabulary, cum_weights=cum_weights, k=rng.randint(8, 60))),
+                     'created_at': start + timedelta(minutes=i)}
+                    for i in range(offset, min(offset + 10000, args.messages))]
+            db.session.execute(db.insert(Message), rows)
+            db.session.commit()
+        loaded = time.perf_counter() - loaded
+
+        def like_search(term):
+            clauses = []
+            for word in term.split():
+                pattern = f'%{word}%'
+                clauses.append(or_(*(cast(col, Unicode).ilike(pattern)
+                                     for col in (Message.name, Message.email, Message.message))))
+            count = db.session.query(db.func.count(Message.message_id)).filter(*clauses).scalar()
+            page = (Message.query.filter(*clauses).order_by(Message.created_at.desc())
+                    .limit(args.page_size).all())
+            return count, len(page)
+
+        def fts_search(term):
+            matches = match_messages(term, db.engine.dialect.name)
+            on = matches.c.message_id == Message.message_id
+            count = db.session.query(db.func.count(Message.message_id)).join(matches, on).scalar()
+            page = (Message.query.join(matches, on).order_by(matches.c.score, Message.created_at.desc())
+                    .limit(args.page_size).all())
+            return count, len(page)
+
+        print(f'database   {app.config["SQLALCHEMY_DATABASE_URI"]}')
+        print(f'messages   {args.messages} (loaded + indexed in {loaded:.1f}s)')
+        print(f'{"term":22}{"LIKE ms":>10}{"FTS ms":>10}{"speed-up":>10}{"hits":>10}')
+        for term in TERMS:
+            like_ms, (like_hits, _) = _timed(lambda: like_search(term), args.repeat)
+            fts_ms, (fts_hits, _) = _timed(lambda: fts_search(term), args.repeat)
+            print(f'{term:22}{like_ms:10.1f}{fts_ms:10.1f}{like_ms / fts_ms:9.1f}x{fts_hits:>10}')
+            # LIKE also matches inside words, so FTS should never find more
+            if fts_hits > like_hits:
+                print(f'  warning: FTS found more rows than LIKE ({fts_hits} > {like_hits})')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+"""
+Micro-benchmarks: serialization, template rendering, user loading and password checks.
+
+    park_to_json / booking_to_json            to_json() over N already-loaded rows
+    park_query_to_json / booking_query_to_json  the same including the SELECT
+    render_index                              index.html with N parks (fragment cache warm)
+    render_index_cold                         the same with the fragment cache cleared first
+    render_park_detail                        park_detail.html for one park
+    render_bookings                           components/bookings.html with N bookings
+    load_user_cached / load_user_uncached     the Flask-Login user loader, principal cache hit / miss
+    has_role_orm / has_role_principal         User.has_role() vs CachedPrincipal.has_role()
+    verify_password                           one check against a seeded hash (production cost)
+
+Each benchmark is calibrated to run at least --min-time per round, then run
+for --warmup unrecorded rounds and --rounds recorded ones with the garbage
+collector off (as timeit does). Statistics are per call. Row-based
+benchmarks also report the time per row.
+
+    python benchmarks/bench_micro.py
+    python benchmarks/bench_micro.py --database-url sqlite:////tmp/scale.db --rows 100 1000 10000
+    python benchmarks/bench_micro.py --filter render --output micro.json
+    python benchmarks/bench_micro.py --baseline micro.json          # exits 1 on regressions
+
+Without --database-url a temporary SQLite file is seeded as in bench_http.py.
+Nothing is written to the database.
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+
+import benchstats
+import bench_http
+
+REGRESSION_METRICS = {'p50_ms': 1}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url', default=None, help='defaults to a freshly seeded temporary SQLite file')
+    parser.add_argument('--seed-users', type=int, default=2000, help='size of the temporary database')
+    parser.add_argument('--seed-bookings', type=int, default=50000, help='size of the temporary database')
+    parser.add_argument('--rows', type=int, nargs='+', default=[100, 1000], help='N for row-based benchmarks')
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--warmup', type=int, default=3, help='unrecorded rounds')
+    parser.add_argument('--min-time', type=float, default=0.05, help='seconds per round, by calibration')
+    parser.add_argument('--filter', default=None, help='only benchmarks whose name contains this')
+    parser.add_argument('--output', default=None, help='write results as JSON')
+    parser.add_argument('--baseline', default=None, help='results JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.10, help='allowed relative slowdown of the median')
+    return parser.parse_args()
+
+
+def measure(func, rounds, warmup, min_time):
+    """Per-call durations of rounds rounds, each looping func enough times to last min_time."""
+    func()  # template compilation, first queries, lazy imports
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        if time.perf_counter() - started >= min_time or number >= 1 << 20:
+            break
+        number *= 2
+    samples = []
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for n in range(warmup + rounds):
+            started = time.perf_counter()
+            for _ in range(number):
+                func()
+            if n >= warmup:
+                samples.append((time.perf_counter() - started) / number)
+    finally:
+        if enabled:
+            gc.enable()
+    return samples, number
+
+
+def benchmarks(app, rows_list):
+    """(name, setup) pairs; setup() runs in a request context and returns (callable to time, rows or None)."""
+    from flask import render_template
+    from sqlalchemy.orm import joinedload
+    from app import db
+    from app.cache import park_catalog
+    from app.models import Booking, Park, User
+    from app.passwords import verify_password
+    from app.principals import invalidate_principal, load_principal
+    from app.seed_data.scale import SCALE_DOMAIN
+
+    def customer():
+        return User.query.filter(User.email.like(f'%@{SCALE_DOMAIN}')).order_by(User.user_id).first()
+
+    def to_json(model, n):
+        def setup():
+            objects = model.query.limit(n).all()
+            return lambda: [obj.to_json() for obj in objects], len(objects)
+        return setup
+
+    def query_to_json(model, n):
+        def setup():
+            def run():
+                result = [obj.to_json() for obj in model.query.limit(n).all()]
+                db.session.expunge_all()
+                return result
+            return run, min(n, model.query.count())
+        return setup
+
+    def render_index(n, cold):
+        def setup():
+            parks = park_catalog.get_parks()[:n]
+            fragments = app.extensions['fragment_cache']
+            def run():
+                if cold:
+                    fragments.invalidate()
+                return render_template('index.html', parks=parks)
+            return run, len(parks)
+        return setup
+
+    def render_park_detail():
+        park = Park.query.order_by(Park.park_id).first()
+        return lambda: render_template('park_detail.html', park=park), None
+
+    def render_bookings(n):
+        def setup():
+            bookings = (Booking.query.options(joinedload(Booking.park))
+                        .order_by(Booking.date.desc()).limit(n).all())
+            return lambda: render_template('components/bookings.html', bookings=bookings), len(bookings)
+        return setup
+
+    def load_user(cached):
+        def setup():
+            loader = app.login_manager._user_callback
+            user_id = str(customer().user_id)
+            def run():
+                if not cached:
+                    invalidate_principal(int(user_id))
+                return loader(user_id)
+            return run, None
+        return setup
+
+    def has_role_orm():
+        user = customer()
+        user.role  # loaded once, as after the first check in a request
+        return lambda: user.has_role('admin'), None
+
+    def has_role_principal():
+        principal = load_principal(customer().user_id)
+        return lambda: principal.has_role('admin'), None
+
+    def verify():
+        stored = customer().password
+        return lambda: verify_password(stored, bench_http.PASSWORD), None
+
+    cases = []
+    for n in rows_list:
+        cases += [
+            (f'park_to_json[{n}]', to_json(Park, n)),
+            (f'booking_to_json[{n}]', to_json(Booking, n)),
+            (f'park_query_to_json[{n}]', query_to_json(Park, n)),
+            (f'booking_query_to_json[{n}]', query_to_json(Booking, n)),
+            (f'render_index[{n}]', render_index(n, cold=False)),
+            (f'render_index_cold[{n}]', render_index(n, cold=True)),
+            (f'render_bookings[{n}]', render_bookings(n)),
+        ]
+    cases += [
+        ('render_park_detail', render_park_detail),
+        ('load_user_cached', load_user(cached=True)),
+        ('load_user_uncached', load_user(cached=False)),
+        ('has_role_orm', has_role_orm),
+        ('has_role_principal', has_role_principal),
+        ('verify_password', verify),
+    ]
+    return cases
+
+
+def main():
+    args = parse_args()
+    database = args.database_url and args.database_url.split('@')[-1]
+    if args.database_url is None:
+        database = f'temporary sqlite, {args.seed_users} users, {args.seed_bookings} bookings'
+        args.database_url = 'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='bench_micro_'), 'bench.db')
+        app = bench_http.build_app(args.database_url)
+        bench_http.seed_database(app, args)
+    else:
+        app = bench_http.build_app(args.database_url)
+    bench_http.load_targets(app)  # exits with a hint if the database was never seeded
+
+    from app import db
+    results = {}
+    print(f'{"benchmark":30}{"loops":>8}{"p50_ms":>12}{"mean_ms":>12}{"stdev_ms":>12}{"per_row_us":>12}')
+    for name, setup in benchmarks(app, args.rows):
+        if args.filter and args.filter not in name:
+            continue
+        with app.test_request_context('/'):
+            func, rows = setup()
+            samples, number = measure(func, args.rounds, args.warmup, args.min_time)
+            db.session.rollback()
+            db.session.remove()
+        stats = benchstats.describe(samples, digits=6)
+        stats['loops'] = number
+        stats['ops_per_s'] = round(1000 / stats['p50_ms'], 1) if stats['p50_ms'] else None
+        if rows:
+            stats['rows'] = rows
+            stats['per_row_us'] = round(stats['p50_ms'] * 1000 / rows, 3)
+        results[name] = stats
+        print(f'{name:30}{number:>8}{stats["p50_ms"]:>12}{stats["mean_ms"]:>12}{stats["stdev_ms"]:>12}'
+              f'{str(stats.get("per_row_us", "-")):>12}')
+
+    meta = benchstats.run_meta(benchmark='bench_micro', rounds=args.rounds, warmup=args.warmup,
+                               min_time_s=args.min_time, database=database)
+    if args.output:
+        benchstats.save(args.output, meta, results)
+        print(f'results written to {args.output}')
+    if args.baseline:
+        baseline = benchstats.load(args.baseline)
+        if baseline['meta'].get('database') != database:
+            print(f"warning: baseline ran against {baseline['meta'].get('database')!r}")
+        worse = benchstats.compare(results, baseline['results'], REGRESSION_METRICS,
+                                   tolerance=args.tolerance, min_delta=0.001)
+        benchstats.print_regressions(worse, args.tolerance)
+        if worse:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
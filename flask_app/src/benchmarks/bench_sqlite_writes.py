@@ -0,0 +1,149 @@
+"""
+Benchmark: concurrent writes against SQLite, before and after the pragma profile.
+
+Writer threads place bookings and contact messages through commit_with_retry
+while reader threads keep querying parks, once per profile:
+
+    baseline  foreign_keys only, rollback journal, no retry (the old setup)
+    tuned     SQLITE_PRAGMAS from config (WAL, synchronous=NORMAL, ...) + retry
+
+    python benchmarks/bench_sqlite_writes.py --threads 8 --writes 200 --readers 4
+
+Each profile runs in its own process on a fresh temporary database file.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, datetime
+
+PROFILES = ('baseline', 'tuned')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=8, help='writer threads')
+    parser.add_argument('--writes', type=int, default=200, help='writes per writer thread')
+    parser.add_argument('--readers', type=int, default=4, help='reader threads')
+    parser.add_argument('--profile', choices=PROFILES, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def run_profile(args):
+    tmpdir = tempfile.mkdtemp(prefix='bench_sqlite_writes_')
+    os.environ['TEST_DATABASE_URL'] = 'sqlite:///' + os.path.join(tmpdir, 'bench.db')
+
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'main'))
+    from sqlalchemy.exc import OperationalError
+    from app import create_app, db
+    from app.models import Park, Booking, Message, User
+    from app.capacity import reserve_tickets
+    from app.transactions import commit_with_retry
+
+    from config import config
+    if args.profile == 'baseline':
+        config['testing'].SQLITE_PRAGMAS = {}  # bound to the engine when the app is created
+    app = create_app('testing')
+    if args.profile == 'baseline':
+        app.config['DB_COMMIT_RETRIES'] = 1
+
+    day = date(2030, 10, 31)
+    with app.app_context():
+        db.create_all()
+        park = Park(name='Bench Park', location='Dublin', description='bench',
+                    short_description='bench', slug='bench-park', daily_capacity=10 ** 9)
+        user = User(name='Bench', last_name='User', email='bench@example.com', password='x')
+        db.session.add_all([park, user])
+        db.session.commit()
+        park_id, user_id = park.park_id, user.user_id
+        journal_mode = db.session.execute(db.text('PRAGMA journal_mode')).scalar()
+
+    counters = {'writes': 0, 'failed': 0, 'reads': 0}
+    lock = threading.Lock()
+    done = threading.Event()
+    start_gate = threading.Barrier(args.threads + args.readers)
+
+    def writer(n):
+        start_gate.wait()
+        with app.app_context():
+            for i in range(args.writes):
+                if i % 2:
+                    def work():
+                        reserve_tickets(park_id, day, 1)
+                        db.session.add(Booking(user_id=user_id, park_id=park_id,
+                                               date=datetime.combine(day, datetime.min.time()),
+                                               num_tickets=1, health_safety=True))
+                else:
+                    def work():
+                        db.session.add(Message(name=f'w{n}', email='bench@example.com', message='boo'))
+                try:
+                    commit_with_retry(work)
+                    key = 'writes'
+                except OperationalError:
+                    key = 'failed'
+                with lock:
+                    counters[key] += 1
+            db.session.remove()
+
+    def reader():
+        start_gate.wait()
+        with app.app_context():
+            while not done.is_set():
+                Park.query.order_by(Park.park_id).all()
+                db.session.commit()
+                with lock:
+                    counters['reads'] += 1
+            db.session.remove()
+
+    writers = [threading.Thread(target=writer, args=(n,)) for n in range(args.threads)]
+    readers = [threading.Thread(target=reader) for _ in range(args.readers)]
+    started = time.perf_counter()
+    for t in writers + readers:
+        t.start()
+    for t in writers:
+        t.join()
+    elapsed = time.perf_counter() - started
+    done.set()
+    for t in readers:
+        t.join()
+
+    print(json.dumps({
+        'profile': args.profile,
+        'journal_mode': journal_mode,
+        'elapsed_s': round(elapsed, 3),
+        'writes': counters['writes'],
+        'failed_writes': counters['failed'],
+        'writes_per_s': round(counters['writes'] / elapsed, 1),
+        'reads_per_s': round(counters['reads'] / elapsed, 1),
+    }))
+
+
+def main():
+    args = parse_args()
+    if args.profile:
+        return run_profile(args)
+
+    results = []
+    for profile in PROFILES:
+        out = subprocess.run(
+            [sys.executable, __file__, '--profile', profile, '--threads', str(args.threads),
+             '--writes', str(args.writes), '--readers', str(args.readers)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        results.append(json.loads(out.strip().splitlines()[-1]))
+
+    columns = ('journal_mode', 'elapsed_s', 'writes', 'failed_writes', 'writes_per_s', 'reads_per_s')
+    print(f'{"":16}' + ''.join(f'{p:>12}' for p in PROFILES))
+    for column in columns:
+        print(f'{column:16}' + ''.join(f'{str(r[column]):>12}' for r in results))
+    baseline, tuned = results
+    if baseline['writes_per_s']:
+        print(f'write speed-up   {tuned["writes_per_s"] / baseline["writes_per_s"]:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
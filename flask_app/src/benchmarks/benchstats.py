@@ -0,0 +1,100 @@
+"""
+Shared helpers for the benchmark scripts: latency statistics, run metadata,
+JSON results and baseline comparison.
+
+Results files look like {"meta": {...}, "results": {name: {metric: value}}};
+compare() reads two of them and lists the metrics that got worse.
+"""
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile (q in 0..100) of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def describe(seconds, digits=3):
+    """Count, mean, stdev and percentiles in milliseconds for a list of durations in seconds."""
+    values = sorted(seconds)
+    if not values:
+        return {'count': 0}
+    ms = lambda value: round(value * 1000, digits)
+    return {
+        'count': len(values),
+        'mean_ms': ms(statistics.fmean(values)),
+        'stdev_ms': ms(statistics.stdev(values)) if len(values) > 1 else 0.0,
+        'min_ms': ms(values[0]),
+        'p50_ms': ms(percentile(values, 50)),
+        'p95_ms': ms(percentile(values, 95)),
+        'p99_ms': ms(percentile(values, 99)),
+        'max_ms': ms(values[-1]),
+    }
+
+
+def run_meta(**settings):
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                  cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        revision = ''
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'git_revision': revision or None,
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        **settings,
+    }
+
+
+def save(path, meta, results):
+    with open(path, 'w') as f:
+        json.dump({'meta': meta, 'results': results}, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(results, baseline, metrics, tolerance=0.15, min_delta=0.5):
+    """
+    (name, metric, baseline value, current value) for every metric that got
+    worse by more than tolerance (relative) and min_delta (absolute).
+    metrics maps metric name -> +1 if higher is worse (latency), -1 if lower
+    is worse (throughput). Names missing from either side are skipped.
+    """
+    worse = []
+    for name, current in sorted(results.items()):
+        before = baseline.get(name)
+        if not before:
+            continue
+        for metric, direction in metrics.items():
+            old, new = before.get(metric), current.get(metric)
+            if old is None or new is None:
+                continue
+            change = (new - old) * direction
+            if change > min_delta and change > tolerance * abs(old):
+                worse.append((name, metric, old, new))
+    return worse
+
+
+def print_regressions(worse, tolerance):
+    if not worse:
+        print(f'no regressions beyond {tolerance:.0%}')
+        return
+    print(f'REGRESSIONS beyond {tolerance:.0%}:')
+    for name, metric, old, new in worse:
+        change = (new - old) / old if old else math.inf
+        print(f'  {name:28} {metric:10} {old:>10} -> {new:<10} ({change:+.0%})')
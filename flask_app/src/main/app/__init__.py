@@ -1,7 +1,6 @@
 from flask import Flask, render_template
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
-from flask_admin import Admin
 from config import config
 
 ## to enforce FK in SQLite3
@@ -9,7 +8,8 @@ from sqlalchemy import event
 from sqlalchemy.engine import Engine
 import sqlite3
 
-db = SQLAlchemy()
+from .routing import RoutingSession
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
  ## Enforce FK in SQLite3 ##
 @event.listens_for(Engine, "connect")
@@ -19,43 +19,117 @@ def set_sqlite_pragma(dbapi_connection, connection_record):
         cursor.execute("PRAGMA foreign_keys=ON;")
         cursor.close()
 
-def create_app(config_name="development"): 
-
-    app = Flask(__name__)
-    app.config.from_object(config[config_name])
-    db.init_app(app)
-    config[config_name].init_app(app)
-
-    from .models import User, Role, Booking, Park, Message, AppIndexView, UserView, RoleView, BookingView, ParkView, MessageView
-    
-    # Configure Flask-Login
-    login_manager = LoginManager()
-    login_manager.login_view = 'login.login'
-    login_manager.init_app(app)
-    
-    # User loader function for Flask-Login
-    @login_manager.user_loader
-    def load_user(user_id):
-        return db.session.get(User, int(user_id))
-    
+## + the SQLITE_PRAGMAS profile (WAL, synchronous, mmap...) on the app's own engines ##
+# Bound when the app is created, so connections opened outside an app context
+# (CLI code, the message buffer thread, benchmarks) get it too.
+def _bind_sqlite_pragmas(app):
+    pragmas = dict(app.config.get('SQLITE_PRAGMAS') or {})
+    if not pragmas:
+        return
+
+    def apply_pragmas(dbapi_connection, connection_record):
+        if isinstance(dbapi_connection, sqlite3.Connection):
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value};")
+            cursor.close()
+
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, "connect", apply_pragmas)
+
+def create_app(config_name="development", admin=None):
+    """
+    admin overrides the ADMIN_MOUNT setting: 'eager', 'lazy' or 'off' (see
+    startup.py); 'only' builds the admin-only app a lazy mount dispatches to.
+    """
+    from .startup import StartupPhases
+    phases = StartupPhases()
+
+    with phases.phase('config'):
+        app = Flask(__name__)
+        app.config.from_object(config[config_name])
+        app.config['CONFIG_NAME'] = config_name
+        admin = admin or app.config.get('ADMIN_MOUNT', 'eager')
+        admin_only = admin == 'only'
+
+    with phases.phase('database'):
+        from . import pool
+        pool.apply_pool_class(app, admin_only)
+        db.init_app(app)
+        _bind_sqlite_pragmas(app)
+        if not admin_only:
+            config[config_name].init_app(app)
+
+    with phases.phase('extensions'):
+        from . import routing
+        routing.init_app(app)
+
+        from .cache import park_catalog
+        park_catalog.init_app(app)
+
+        from . import metrics, querylog
+        if not admin_only:
+            from .message_buffer import message_buffer
+            message_buffer.init_app(app)
+
+            from . import assets, images, fragments
+            assets.init_app(app)
+            images.init_app(app)
+            fragments.init_app(app)
+        metrics.init_app(app)
+        querylog.init_app(app)
+        pool.init_app(app, 'admin' if admin_only else 'web')
+
+    with phases.phase('models and login'):
+        from .principals import load_principal
+        from . import daily_stats  # keeps park_daily_stats in step with Booking writes
+
+        # Configure Flask-Login
+        login_manager = LoginManager()
+        login_manager.login_view = 'login.login'
+        login_manager.init_app(app)
+
+        # User loader function for Flask-Login (cached per worker, see principals.py)
+        @login_manager.user_loader
+        def load_user(user_id):
+            return load_principal(int(user_id))
+
     # Flask-Admin
-    admin = Admin (app, name='Wednesdays-Wicked-Adventures', template_mode='bootstrap4', index_view=AppIndexView())
-    admin.add_view(UserView(User, db.session))
-    admin.add_view(RoleView(Role, db.session))
-    admin.add_view(BookingView(Booking, db.session))
-    admin.add_view(ParkView(Park, db.session))
-    admin.add_view(MessageView(Message, db.session))
-    
-    # Register Blueprints
-    ## UI Routes
-    from .login import auth_login as login_blueprint
-    app.register_blueprint(login_blueprint)   
-    from .main import main as main_blueprint
-    app.register_blueprint(main_blueprint)
-
-    @app.errorhandler(404)
-    def page_not_found(e):
-        return render_template("404.html"), 404
+    with phases.phase('admin'):
+        if admin in ('eager', 'only'):
+            from .admin import init_admin
+            init_admin(app)
+        elif admin == 'lazy':
+            from .startup import AdminDispatcher
+            app.wsgi_app = AdminDispatcher(app.wsgi_app, lambda: create_app(config_name, admin='only'))
 
-    return app
+    with phases.phase('blueprints'):
+        ## UI Routes
+        from .login import auth_login as login_blueprint
+        app.register_blueprint(login_blueprint)
+        if not admin_only:
+            from .main import main as main_blueprint
+            app.register_blueprint(main_blueprint)
+            ## JSON API
+            from .api import api as api_blueprint
+            app.register_blueprint(api_blueprint)
+
+    if not admin_only:
+        with phases.phase('cli'):
+            from .migrations import schema_cli
+            app.cli.add_command(schema_cli)
+            app.cli.add_command(daily_stats.daily_stats_cli)
+            from .revenue import revenue_cli
+            app.cli.add_command(revenue_cli)
+            from .seed_data.scale import seed_command
+            app.cli.add_command(seed_command)
+            from .startup import startup_profile_command
+            app.cli.add_command(startup_profile_command)
 
+        @app.errorhandler(404)
+        def page_not_found(e):
+            return render_template("404.html"), 404
+
+    app.extensions['startup_phases'] = phases.phases
+    return app
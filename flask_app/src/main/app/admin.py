@@ -0,0 +1,353 @@
+from datetime import date, timedelta
+from wtforms.validators import DataRequired, InputRequired, NumberRange, Optional, Regexp, ValidationError
+from flask_login import current_user
+from flask_admin import Admin, AdminIndexView, BaseView, expose
+from flask_admin.contrib.sqla import ModelView
+from flask import current_app, redirect, request, url_for, flash
+from sqlalchemy.orm import joinedload
+from . import db
+from .cache import park_catalog
+from .capacity import SoldOutError, release_tickets, reserve_tickets, set_capacity
+from .models import User, Role, Booking, Park, Message, PriceTier, PriceModifier
+from .passwords import hash_password
+from .pricing import format_cents
+from .revenue import GRAINS, revenue_report
+from . import admin_paging, search
+
+## Flask-Admin views ##
+# Everything that needs Flask-Admin or WTForms lives here, so the models and
+# the public site import neither. init_admin() mounts the admin on an app;
+# create_app() calls it at boot (ADMIN_MOUNT = 'eager') or leaves /admin to
+# a separate admin app built on first use (ADMIN_MOUNT = 'lazy', see
+# startup.py).
+
+
+def init_admin(app):
+    admin = Admin(app, name='Wednesdays-Wicked-Adventures', template_mode='bootstrap4', index_view=AppIndexView())
+    admin.add_view(UserView(User, db.session))
+    admin.add_view(RoleView(Role, db.session))
+    admin.add_view(BookingView(Booking, db.session))
+    admin.add_view(ParkView(Park, db.session))
+    admin.add_view(MessageView(Message, db.session))
+    admin.add_view(PriceTierView(PriceTier, db.session, name='Price Tiers', category='Pricing'))
+    admin.add_view(PriceModifierView(PriceModifier, db.session, name='Date Modifiers', category='Pricing'))
+    admin.add_view(RevenueView(name='Revenue', endpoint='revenue', category='Pricing'))
+    return admin
+
+
+class AppModelView(ModelView):
+    ## seek pagination and bounded counts, see admin_paging.py ##
+    list_template = 'admin/model/seek_list.html'
+
+    def is_accessible(self):
+        return (current_user.is_authenticated and current_user.has_role('admin'))
+    
+    def inaccessible_callback(self, name, **kwargs):
+        flash('ADMIN ACCESS ONLY! Please login with Admin credentials!')
+        return redirect(url_for("login.login"))
+
+    def _get_list_extra_args(self):
+        # cursors belong to one page; sort, filter and page-size links start over
+        view_args = super()._get_list_extra_args()
+        view_args.extra_args.pop(admin_paging.AFTER_ARG, None)
+        view_args.extra_args.pop(admin_paging.BEFORE_ARG, None)
+        return view_args
+
+    def _pk_column(self):
+        return getattr(self.model, self._primary_key)
+
+    def seek_key(self, sort_column, sort_desc, search=None):
+        """(column, descending) the list can seek on, or None to page with OFFSET."""
+        if search:
+            return None
+        if sort_column is not None:
+            column = self._sortable_columns.get(sort_column)
+            if column is None or isinstance(column, list) or self._sortable_joins.get(sort_column):
+                return None
+            return column, bool(sort_desc)
+        order = list(self._get_default_order())
+        if not order:
+            return self._pk_column(), False
+        column, joins, descending = order[0]
+        if len(order) > 1 or joins:
+            return None
+        return column, bool(descending)
+
+    def _seek_from_request(self, column, descending):
+        pk = self._pk_column()
+        for arg, backwards in ((admin_paging.AFTER_ARG, False), (admin_paging.BEFORE_ARG, True)):
+            cursor = request.args.get(arg)
+            if not cursor:
+                continue
+            try:
+                cursor_desc, value, pk_value = admin_paging.decode_cursor(cursor, column, pk)
+            except ValueError:
+                return None
+            if cursor_desc != descending:
+                return None
+            return admin_paging.seek_condition(column, pk, value, pk_value, descending != backwards), backwards
+        return None
+
+    def _list_count(self, query, filtered):
+        limit = current_app.config.get('ADMIN_EXACT_COUNT_LIMIT')
+        if limit is None:
+            return query.order_by(None).count()
+        count = admin_paging.bounded_count(self.session, query, self._pk_column(), limit)
+        if count <= limit:
+            return count
+        if filtered:
+            return admin_paging.ApproximateCount(limit, at_least=True)
+        estimate = admin_paging.estimate_rows(self.session, self.model.__table__)
+        return admin_paging.ApproximateCount(max(estimate, count))
+
+    def get_list(self, page, sort_column, sort_desc, search, filters, execute=True, page_size=None):
+        joins, count_joins = {}, {}
+        query = self.get_query()
+        if self._search_supported and search:
+            query, _, joins, count_joins = self._apply_search(query, None, joins, count_joins, search)
+        if filters and self._filters:
+            query, _, joins, count_joins = self._apply_filters(query, None, joins, count_joins, filters)
+
+        count = self._list_count(query, bool(search or filters))
+
+        for j in self._auto_joins:
+            query = query.options(joinedload(j))
+
+        key = self.seek_key(sort_column, sort_desc, search)
+        backwards = False
+        if key is None:
+            query, joins = self._apply_sorting(query, joins, sort_column, sort_desc)
+        else:
+            column, descending = key
+            seek = self._seek_from_request(column, descending)
+            if seek is not None:
+                condition, backwards = seek
+                query = query.filter(condition)
+                page = 0
+            descending = descending != backwards
+            pk = self._pk_column()
+            for part in ([column] if column is pk else [column, pk]):
+                query = query.order_by(part.desc() if descending else part.asc())
+        query = self._apply_pagination(query, page, page_size)
+
+        if execute:
+            query = query.all()
+            if backwards:
+                query.reverse()
+        return count, query
+
+    def seek_pager(self, data, page, count):
+        """(previous_url, next_url) for the list template; None where there is no such page."""
+        view_args = self._get_list_extra_args()
+        page_size = view_args.page_size or self.page_size
+        sort_column = self._get_column_by_idx(view_args.sort)
+        key = self.seek_key(sort_column and sort_column[0], view_args.sort_desc, view_args.search)
+
+        def url(page, row=None, arg=None):
+            extra_args = dict(view_args.extra_args)
+            if key is not None and row is not None:
+                column, descending = key
+                value = getattr(row, column.key)
+                if value is not None and page:
+                    extra_args[arg] = admin_paging.encode_cursor(
+                        column.key, descending, value, getattr(row, self._primary_key))
+            return self._get_list_url(view_args.clone(page=page or None, extra_args=extra_args))
+
+        previous_url = next_url = None
+        if page > 0:
+            previous_url = url(page - 1, data[0] if data else None, admin_paging.BEFORE_ARG)
+        more = len(data) == page_size
+        if more and count is not None and not isinstance(count, admin_paging.ApproximateCount):
+            more = (page + 1) * page_size < count
+        if more:
+            next_url = url(page + 1, data[-1], admin_paging.AFTER_ARG)
+        return previous_url, next_url
+
+class AppIndexView(AdminIndexView):
+    def is_accessible(self):
+        return (current_user.is_authenticated and current_user.has_role('admin'))
+    
+    def inaccessible_callback(self, name, **kwargs):
+        flash('ADMIN ACCESS ONLY! Please login with Admin credentials!')
+        return redirect(url_for("login.login"))
+    
+
+class UserView(AppModelView):
+
+    column_list = ('name', 'last_name', 'email', 'password', 'role')
+    column_labels = dict(name='Name', last_name= 'Last Name', email='Email', password='Password', role='Role')
+    column_filters = ('name', 'email')
+    column_formatters = dict(password=lambda v, c, m, p: '*****')
+    column_searchable_list = ('name', 'email')
+    column_sortable_list = ('email',)
+    form_columns = ('name', 'last_name', 'email', 'password', 'role')
+    form_args = dict(
+        name=dict(validators=[DataRequired()]),
+        last_name=dict(validators=[DataRequired()]),
+        email=dict(validators=[DataRequired()]),
+        password=dict(validators=[DataRequired()]),
+        role=dict(validators=[DataRequired()])
+    )
+
+    def on_model_change(self, form, model, is_created):
+        model.password = hash_password(model.password)
+
+
+class RoleView(AppModelView):
+
+    column_list = ('name',)
+    column_labels = dict(name='Name')
+    column_filters = ('name',)
+    column_searchable_list = ('name',)
+    column_sortable_list = ()
+    form_columns = ('name',)
+    form_args = dict(
+        name=dict(validators=[DataRequired()])
+    )
+
+class BookingView(AppModelView):
+  
+    column_list = ('park','date', 'num_tickets', 'health_safety', 'user')
+    column_labels = dict(park='Park', date='Date', num_tickets='Number of Tickets', health_safety='Health & Safety', user='User')
+    column_filters = ('park', 'user')
+    column_searchable_list = ('park.name', 'user.name')
+    column_sortable_list = ('date',)
+    column_default_sort = ('date', True)
+    form_columns = ('park', 'date', 'num_tickets', 'health_safety', 'user')
+    form_args = dict(
+        park=dict(validators=[DataRequired()]),
+        user=dict(validators=[DataRequired()]),
+        date=dict(validators=[DataRequired()]),
+        num_tickets=dict(validators=[DataRequired()]),
+        health_safety=dict(validators=[DataRequired()])
+    )
+
+    ## keep park_day_inventory in step, as main.booking does (see capacity.py) ##
+    def update_model(self, form, model):
+        # park_id and date are still the stored values until the form is applied
+        model._reserved = (model.park_id, model.date.date(), model.num_tickets)
+        return super().update_model(form, model)
+
+    def on_model_change(self, form, model, is_created):
+        reserved = getattr(model, '_reserved', None)
+        if reserved is not None:
+            release_tickets(*reserved)
+        try:
+            reserve_tickets(model.park.park_id, model.date.date(), model.num_tickets)
+        except SoldOutError as e:
+            raise ValidationError(f'{e}.')
+
+    def on_model_delete(self, model):
+        release_tickets(model.park_id, model.date.date(), model.num_tickets)
+
+class ParkView(AppModelView):
+  
+    column_list = ('name', 'location', 'description', 'image_path', 'short_description', 'slug', 'folder', 'hours','min_age', 'price', 'base_price_cents', 'wait_time', 'height_requirement', 'daily_capacity')
+    column_labels = dict(name='Name', location='Location', description='Description', image_path='Image Path', short_description='Short Description', slug='Slug', folder='Folder', hours='Hours', min_age='Min Age', price='Price', base_price_cents='Base Price (cents)', wait_time='Wait Time', height_requirement='Height Requirement', daily_capacity='Daily Capacity')
+    column_filters = ('name', 'location')
+    column_formatters = dict(description=lambda v, c, m, p: m.description[:50] + '...')
+    column_searchable_list = ('name', 'location')
+    column_sortable_list = ('name', 'slug')
+    form_columns = ('name', 'location', 'description', 'image_path', 'short_description', 'slug', 'folder', 'hours','min_age', 'price', 'base_price_cents', 'wait_time', 'height_requirement', 'daily_capacity')
+    form_args = dict(
+        name=dict(validators=[DataRequired()]),
+        location=dict(validators=[DataRequired()]),
+        description=dict(validators=[DataRequired()]),
+        image_path=dict(validators=[DataRequired()]),
+        short_description=dict(validators=[DataRequired()]),
+        slug=dict(validators=[DataRequired()]),
+        folder=dict(validators=[DataRequired()]),
+        hours=dict(validators=[DataRequired()]),
+        min_age=dict(validators=[DataRequired()]),
+        price=dict(validators=[DataRequired()]),
+        base_price_cents=dict(validators=[InputRequired(), NumberRange(min=0)]),
+        wait_time=dict(validators=[DataRequired()]),
+        height_requirement=dict(validators=[DataRequired()]),
+        daily_capacity=dict(validators=[InputRequired(), NumberRange(min=0)]),
+    )
+
+    def on_model_change(self, form, model, is_created):
+        if not is_created:
+            set_capacity(model.park_id, model.daily_capacity, date.today())
+        park_catalog.invalidate()
+
+    def after_model_delete(self, model):
+        park_catalog.invalidate()
+
+class PriceTierView(AppModelView):
+
+    column_list = ('park', 'min_tickets', 'unit_price_cents')
+    column_labels = dict(park='Park', min_tickets='From Tickets', unit_price_cents='Unit Price (cents)')
+    column_filters = ('park',)
+    form_columns = ('park', 'min_tickets', 'unit_price_cents')
+    form_args = dict(
+        park=dict(validators=[DataRequired()]),
+        min_tickets=dict(validators=[InputRequired(), NumberRange(min=2)]),
+        unit_price_cents=dict(validators=[InputRequired(), NumberRange(min=0)])
+    )
+
+class PriceModifierView(AppModelView):
+
+    column_list = ('name', 'park', 'starts_on', 'ends_on', 'weekdays', 'percent')
+    column_labels = dict(name='Name', park='Park (blank: all)', starts_on='From', ends_on='Until',
+                         weekdays='Weekdays (0=Mon)', percent='Percent')
+    column_filters = ('park',)
+    form_columns = ('name', 'park', 'starts_on', 'ends_on', 'weekdays', 'percent')
+    form_args = dict(
+        name=dict(validators=[DataRequired()]),
+        weekdays=dict(validators=[Optional(), Regexp(r'^[0-6]{1,7}$', message='Digits 0 (Monday) to 6 (Sunday)')]),
+        percent=dict(validators=[InputRequired(), NumberRange(min=-99)])
+    )
+
+class MessageView(AppModelView):
+   
+    column_list = ('name', 'email', 'message', 'created_at')
+    column_labels = dict(name='Name', email='Email', message='Message', created_at='Create Date')
+    column_filters = ('email',)
+    column_searchable_list = ('name', 'email', 'message')
+    column_sortable_list = ('created_at',)
+    column_default_sort = ('created_at', True)
+    form_columns = ('name', 'email', 'message', 'created_at')
+    form_args = dict(
+        name=dict(validators=[DataRequired()]),
+        email=dict(validators=[DataRequired()]),
+        message=dict(validators=[DataRequired()])
+    )
+
+    def _apply_search(self, query, count_query, joins, count_joins, search_term):
+        ## ranked full-text match instead of LIKE '%term%' on every column ##
+        matches = search.match_messages(search_term, db.engine.dialect.name)
+        if matches is None:
+            return super()._apply_search(query, count_query, joins, count_joins, search_term)
+        on = matches.c.message_id == Message.message_id
+        query = query.join(matches, on).order_by(matches.c.score)
+        if count_query is not None:
+            count_query = count_query.join(matches, on)
+        return query, count_query, joins, count_joins
+
+
+class RevenueView(BaseView):
+
+    def is_accessible(self):
+        return (current_user.is_authenticated and current_user.has_role('admin'))
+
+    def inaccessible_callback(self, name, **kwargs):
+        flash('ADMIN ACCESS ONLY! Please login with Admin credentials!')
+        return redirect(url_for("login.login"))
+
+    @expose('/')
+    def index(self):
+        grain = request.args.get('by', 'day')
+        try:
+            end = date.fromisoformat(request.args['to']) if request.args.get('to') else date.today()
+            start = date.fromisoformat(request.args['from']) if request.args.get('from') else end - timedelta(days=29)
+        except ValueError:
+            flash('Dates must be YYYY-MM-DD.', 'error')
+            return redirect(url_for('.index'))
+        max_days = current_app.config.get('REVENUE_MAX_DAYS', 731)
+        if end < start or (end - start).days >= max_days or grain not in GRAINS:
+            flash(f'Pick a range of 1 to {max_days} days, by day, week or park; use `flask revenue report` for more.', 'error')
+            return redirect(url_for('.index'))
+        rows, summary = revenue_report(start, end, grain)
+        return self.render('admin/revenue.html', rows=rows, summary=summary, grains=GRAINS,
+                           format_cents=format_cents)
@@ -0,0 +1,117 @@
+import base64
+import json
+import operator
+from datetime import date, datetime
+
+from flask import current_app
+from sqlalchemy import and_, func, or_, text
+from .cache import TTLCache
+
+## Admin list paging for large tables ##
+# Flask-Admin pages with OFFSET and shows an exact COUNT(*), and both read
+# the whole table once it holds millions of rows. AppModelView seeks
+# instead: the Next / Previous links carry the sort key and primary key of
+# the edge row, and the page is WHERE (key, pk) > edge ORDER BY key, pk
+# LIMIT n, answered from the sort key's index however deep it is. Rows
+# whose key is NULL cannot be seeked past, so those links fall back to
+# OFFSET, as do searches and relation sorts. Counts are exact up to
+# ADMIN_EXACT_COUNT_LIMIT (a bounded count never reads more rows than
+# that); past it an unfiltered list shows an estimate from table statistics
+# (sqlite_stat1 after ANALYZE, information_schema.TABLES on MySQL) or the
+# primary key span, and a filtered one shows "10,000+".
+
+AFTER_ARG = 'after'
+BEFORE_ARG = 'before'
+
+_estimates = TTLCache(ttl=60, maxsize=256)
+
+
+class ApproximateCount(int):
+    """Row count the list view shows as '~1,204,000' (estimate) or '10,000+' (lower bound)."""
+
+    def __new__(cls, value, at_least=False):
+        count = super().__new__(cls, value)
+        count.at_least = at_least
+        return count
+
+    def __str__(self):
+        return f'{int(self):,}+' if self.at_least else f'~{int(self):,}'
+
+
+## Cursors ##
+def encode_cursor(key, desc, value, pk_value):
+    if isinstance(value, (datetime, date)):
+        value = value.isoformat()
+    raw = json.dumps([key, bool(desc), value, pk_value], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, column, pk):
+    """(desc, value, pk_value) from a cursor made for column; ValueError if it is not one."""
+    padded = cursor + '=' * (-len(cursor) % 4)
+    try:
+        key, desc, value, pk_value = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise ValueError('invalid cursor')
+    if key != column.key or value is None:
+        raise ValueError('cursor is for another sort')
+    return bool(desc), _coerce(column, value), _coerce(pk, pk_value)
+
+
+def _coerce(column, value):
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+
+def seek_condition(column, pk, value, pk_value, descending):
+    """Rows strictly after (value, pk_value) in ORDER BY column, pk (both descending or both ascending)."""
+    beyond = operator.lt if descending else operator.gt
+    if column is pk:
+        return beyond(pk, pk_value)
+    return or_(beyond(column, value), and_(column == value, beyond(pk, pk_value)))
+
+
+## Counts ##
+def bounded_count(session, query, pk, limit):
+    """Rows in query, but reading no more than limit + 1 of them."""
+    rows = query.with_entities(pk).order_by(None).limit(limit + 1).subquery()
+    return session.query(func.count()).select_from(rows).scalar()
+
+
+def estimate_rows(session, table):
+    bind = session.get_bind()
+    key = (str(bind.url), table.name)
+    estimate = _estimates.get(key)
+    if estimate is None:
+        estimate = _table_stats(session, bind.dialect.name, table.name)
+        if estimate is None:
+            estimate = _key_span(session, table)
+        _estimates.set(key, estimate, current_app.config.get('ADMIN_COUNT_CACHE_TTL', 60))
+    return estimate
+
+
+def _table_stats(session, dialect, table_name):
+    if dialect == 'sqlite':
+        analyzed = session.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")).first()
+        if analyzed is None:
+            return None
+        stats = session.execute(text('SELECT stat FROM sqlite_stat1 WHERE tbl = :t'), {'t': table_name}).scalars()
+        rows = [int(stat.split()[0]) for stat in stats if stat]
+        return max(rows) if rows else None
+    if dialect == 'mysql':
+        return session.execute(text(
+            'SELECT TABLE_ROWS FROM information_schema.TABLES '
+            'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :t'), {'t': table_name}).scalar()
+    return None
+
+
+def _key_span(session, table):
+    # MAX and MIN of an integer primary key are two index probes
+    (pk,) = table.primary_key.columns
+    low, high = session.query(func.min(pk), func.max(pk)).one()
+    return 0 if low is None else high - low + 1
@@ -0,0 +1,176 @@
+from datetime import datetime
+from functools import wraps
+from flask import Blueprint, jsonify, request, current_app
+from flask_login import current_user
+from . import db
+from .models import Booking, Park, User
+from .bookings import encode_cursor, decode_cursor, older_than_cursor
+from .capacity import reserve_tickets, SoldOutError
+from .transactions import commit_with_retry
+from sqlalchemy.exc import OperationalError
+
+api = Blueprint('api', __name__, url_prefix='/api/v1')
+
+## Projections ##
+# The API selects plain columns and serializes the result rows directly, so
+# list endpoints never build ORM objects (or touch relationships). These
+# tuples are also the public contract: User.password is deliberately absent.
+
+PARK_FIELDS = (
+    Park.park_id, Park.name, Park.location, Park.description, Park.image_path,
+    Park.short_description, Park.slug, Park.folder, Park.hours, Park.difficulty,
+    Park.min_age, Park.price, Park.wait_time, Park.height_requirement, Park.daily_capacity,
+)
+
+BOOKING_FIELDS = (
+    Booking.booking_id, Booking.park_id, Booking.date, Booking.num_tickets, Booking.health_safety,
+)
+
+USER_FIELDS = (
+    User.user_id, User.name, User.last_name, User.email, User.role_id,
+)
+
+
+def _serialize(row):
+    return {key: value.isoformat() if isinstance(value, datetime) else value
+            for key, value in row._mapping.items()}
+
+
+def _error(message, status):
+    return jsonify({'error': message}), status
+
+
+def _page_size():
+    default = current_app.config['API_PAGE_SIZE']
+    try:
+        limit = int(request.args.get('limit', default))
+    except ValueError:
+        limit = default
+    return max(1, min(limit, current_app.config['API_MAX_PAGE_SIZE']))
+
+
+def _page(rows, limit, cursor_of):
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = cursor_of(rows[-1])
+    return jsonify({'data': [_serialize(row) for row in rows], 'next_cursor': next_cursor})
+
+
+def api_login_required(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not current_user.is_authenticated:
+            return _error('authentication required', 401)
+        return view(*args, **kwargs)
+    return wrapper
+
+
+## Parks ##
+@api.route('/parks')
+def list_parks():
+    limit = _page_size()
+    query = db.select(*PARK_FIELDS).order_by(Park.park_id).limit(limit + 1)
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            (after_id,) = decode_cursor(cursor)
+            query = query.where(Park.park_id > int(after_id))
+        except ValueError:
+            return _error('invalid cursor', 400)
+
+    rows = db.session.execute(query).all()
+    return _page(rows, limit, lambda row: encode_cursor(row.park_id))
+
+
+@api.route('/parks/<int:park_id>')
+def get_park(park_id):
+    row = db.session.execute(db.select(*PARK_FIELDS).where(Park.park_id == park_id)).first()
+    if row is None:
+        return _error('park not found', 404)
+    return jsonify(_serialize(row))
+
+
+@api.route('/parks/<slug>')
+def get_park_by_slug(slug):
+    row = db.session.execute(db.select(*PARK_FIELDS).where(Park.slug == slug)).first()
+    if row is None:
+        return _error('park not found', 404)
+    return jsonify(_serialize(row))
+
+
+## Current user ##
+@api.route('/me')
+@api_login_required
+def me():
+    row = db.session.execute(
+        db.select(*USER_FIELDS).where(User.user_id == current_user.user_id)
+    ).first()
+    return jsonify(_serialize(row))
+
+
+@api.route('/me/bookings')
+@api_login_required
+def my_bookings():
+    limit = _page_size()
+    query = (
+        db.select(*BOOKING_FIELDS)
+        .where(Booking.user_id == current_user.user_id)
+        .order_by(Booking.date.desc(), Booking.booking_id.desc())
+        .limit(limit + 1)
+    )
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            query = query.where(older_than_cursor(cursor))
+        except ValueError:
+            return _error('invalid cursor', 400)
+
+    rows = db.session.execute(query).all()
+    return _page(rows, limit, lambda row: encode_cursor(row.date, row.booking_id))
+
+
+@api.route('/bookings', methods=['POST'])
+@api_login_required
+def create_booking():
+    payload = request.get_json(silent=True) or {}
+    try:
+        park_id = int(payload['park_id'])
+        date = datetime.fromisoformat(payload['date'])
+        num_tickets = int(payload.get('num_tickets', 1))
+    except (KeyError, TypeError, ValueError):
+        return _error('park_id, date and num_tickets are required', 400)
+
+    def place_booking():
+        reserve_tickets(park_id, date.date(), num_tickets)
+        booking = Booking(
+            user_id=current_user.user_id,
+            park_id=park_id,
+            date=date,
+            num_tickets=num_tickets,
+            health_safety=bool(payload.get('health_safety', False))
+        )
+        db.session.add(booking)
+        return booking
+
+    try:
+        booking = commit_with_retry(place_booking)
+    except SoldOutError:
+        db.session.rollback()
+        return _error('not enough tickets left for that day', 409)
+    except LookupError:
+        db.session.rollback()
+        return _error('park not found', 404)
+    except ValueError as e:
+        db.session.rollback()
+        return _error(str(e), 400)
+    except OperationalError:
+        return _error('the database is busy, please retry', 503)
+
+    return jsonify({
+        'booking_id': booking.booking_id,
+        'park_id': booking.park_id,
+        'date': booking.date.isoformat(),
+        'num_tickets': booking.num_tickets,
+        'health_safety': booking.health_safety
+    }), 201
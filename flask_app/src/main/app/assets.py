@@ -0,0 +1,131 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+import click
+from flask import current_app, request, send_from_directory
+from flask.cli import with_appcontext
+
+try:
+    import brotli
+except ImportError:  # in requirements.txt; without it only gzip variants are built
+    brotli = None
+
+## Fingerprinted static assets ##
+# `flask assets build` copies every file in ASSET_FILES to
+# static/dist/<name>.<hash>.<ext> plus .gz / .br variants and writes
+# dist/manifest.json. At runtime url_for('static', filename='css/styles.css')
+# is rewritten to the fingerprinted path, and those paths are served with a
+# one-year immutable Cache-Control and the best encoding the client accepts.
+# Without a manifest everything falls back to the plain static files.
+
+MANIFEST_NAME = 'manifest.json'
+IMMUTABLE_MAX_AGE = 31536000
+
+
+def _dist_folder(app):
+    return app.config.get('ASSET_DIST_FOLDER') or os.path.join(app.static_folder, 'dist')
+
+
+def _fingerprint(path, content):
+    digest = hashlib.sha256(content).hexdigest()[:12]
+    root, ext = os.path.splitext(path)
+    return f'{root}.{digest}{ext}'
+
+
+def build_assets(static_folder, files, dist_folder):
+    if os.path.isdir(dist_folder):
+        shutil.rmtree(dist_folder)
+    manifest = {}
+    for name in files:
+        with open(os.path.join(static_folder, name), 'rb') as f:
+            content = f.read()
+        hashed = _fingerprint(name, content)
+        target = os.path.join(dist_folder, hashed)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'wb') as f:
+            f.write(content)
+        with open(target + '.gz', 'wb') as f:
+            f.write(gzip.compress(content, compresslevel=9, mtime=0))
+        if brotli is not None:
+            with open(target + '.br', 'wb') as f:
+                f.write(brotli.compress(content, quality=11))
+        manifest[name] = 'dist/' + hashed
+    with open(os.path.join(dist_folder, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_manifest(app):
+    path = os.path.join(_dist_folder(app), MANIFEST_NAME)
+    manifest = {}
+    if app.config.get('ASSET_FINGERPRINTING', True) and os.path.exists(path):
+        with open(path) as f:
+            manifest = json.load(f)
+    app.extensions['asset_manifest'] = manifest
+    return manifest
+
+
+def _rewrite_static_url(endpoint, values):
+    if endpoint != 'static' or 'filename' not in values:
+        return
+    hashed = current_app.extensions.get('asset_manifest', {}).get(values['filename'])
+    if hashed:
+        values['filename'] = hashed
+
+
+def _serve_static(filename):
+    app = current_app
+    if not filename.startswith('dist/') or not app.extensions.get('asset_manifest'):
+        return app.send_static_file(filename)
+
+    dist_folder = _dist_folder(app)
+    relative = filename[len('dist/'):]
+    accepted = request.accept_encodings
+    encoding = None
+    for candidate, suffix in (('br', '.br'), ('gzip', '.gz')):
+        if accepted[candidate] and os.path.exists(os.path.join(dist_folder, relative + suffix)):
+            encoding, relative = candidate, relative + suffix
+            break
+
+    response = send_from_directory(
+        dist_folder, relative,
+        mimetype=mimetypes.guess_type(filename)[0],
+        max_age=IMMUTABLE_MAX_AGE,
+        conditional=True,
+    )
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Cache-Control'] = f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def init_app(app):
+    app.config.setdefault('ASSET_FILES', [])
+    load_manifest(app)
+    app.url_defaults(_rewrite_static_url)
+    if 'static' in app.view_functions:
+        app.view_functions['static'] = _serve_static
+    app.cli.add_command(assets_cli)
+
+
+## CLI: flask assets build ##
+@click.group('assets')
+def assets_cli():
+    """Static asset pipeline."""
+
+
+@assets_cli.command('build')
+@with_appcontext
+def build_command():
+    """Fingerprint and precompress ASSET_FILES into static/dist."""
+    app = current_app
+    manifest = build_assets(app.static_folder, app.config['ASSET_FILES'], _dist_folder(app))
+    load_manifest(app)
+    for name, hashed in sorted(manifest.items()):
+        click.echo(f'{name} -> {hashed}')
+    if brotli is None:
+        click.echo('brotli not installed: only gzip variants were written')
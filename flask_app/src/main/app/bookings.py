@@ -0,0 +1,61 @@
+import base64
+from datetime import datetime
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import joinedload
+from . import db
+from .models import Booking
+
+## Booking history queries ##
+# Keyset (seek) pagination on (date, booking_id) instead of OFFSET, with the
+# park eager-loaded in the same SELECT, so a page costs one query no matter
+# how many bookings the user has or how many distinct parks they visited.
+
+def encode_cursor(*values):
+    raw = '|'.join(v.isoformat() if isinstance(v, datetime) else str(v) for v in values)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    try:
+        return base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError('invalid cursor')
+
+
+def older_than_cursor(cursor):
+    date_value, booking_id = decode_cursor(cursor)
+    date_value, booking_id = datetime.fromisoformat(date_value), int(booking_id)
+    return or_(
+        Booking.date < date_value,
+        and_(Booking.date == date_value, Booking.booking_id < booking_id),
+    )
+
+
+def booking_history(user_id, cursor=None, per_page=20):
+    query = (
+        Booking.query
+        .options(joinedload(Booking.park))
+        .filter(Booking.user_id == user_id)
+        .order_by(Booking.date.desc(), Booking.booking_id.desc())
+    )
+    if cursor:
+        query = query.filter(older_than_cursor(cursor))
+
+    rows = query.limit(per_page + 1).all()
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = encode_cursor(rows[-1].date, rows[-1].booking_id)
+    return rows, next_cursor
+
+
+def booking_counts(user_id, now=None):
+    now = now or datetime.now()
+    total, upcoming = db.session.execute(
+        db.select(
+            db.func.count(Booking.booking_id),
+            db.func.coalesce(db.func.sum(db.case((Booking.date >= now, 1), else_=0)), 0),
+        ).where(Booking.user_id == user_id)
+    ).one()
+    return {'total': total, 'upcoming': upcoming, 'past': total - upcoming}
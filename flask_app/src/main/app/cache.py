@@ -0,0 +1,165 @@
+import threading
+import time
+from contextlib import nullcontext
+
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .routing import primary_reads
+
+## In-process park catalog cache ##
+# Park rows only change when an admin edits them, so the public pages read
+# a per-worker snapshot instead of running Park.query.all() on every hit.
+# Entries are plain dicts (Park.to_json()) so they never go stale against
+# a closed session; Jinja resolves park.name etc. on dicts the same way.
+# For REPLICA_STICKY_SECONDS after an invalidation the refill reads the
+# primary, so a lagging replica cannot put the old rows back for a whole
+# TTL; a fill that raced an invalidation is returned but not kept.
+
+class ParkCatalogCache:
+
+    def __init__(self, ttl=300):
+        self.default_ttl = ttl
+        self._lock = threading.Lock()
+        self._parks = None
+        self._expires_at = 0.0
+        self._primary_until = 0.0
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def init_app(self, app):
+        app.config.setdefault('PARK_CACHE_TTL', self.default_ttl)
+        app.extensions['park_catalog'] = self
+
+    def _ttl(self):
+        try:
+            return current_app.config.get('PARK_CACHE_TTL', self.default_ttl)
+        except RuntimeError:
+            return self.default_ttl
+
+    def _replica_lag(self):
+        try:
+            return current_app.config.get('REPLICA_STICKY_SECONDS', 5)
+        except RuntimeError:
+            return 5
+
+    def get_parks(self):
+        now = time.monotonic()
+        with self._lock:
+            if self._parks is not None and now < self._expires_at:
+                self.hits += 1
+                return self._parks
+            self.misses += 1
+            generation = self._generation
+            from_primary = now < self._primary_until
+
+        from .models import Park
+        with primary_reads() if from_primary else nullcontext():
+            parks = [park.to_json() for park in Park.query.order_by(Park.park_id).all()]
+
+        with self._lock:
+            if generation == self._generation:
+                self._parks = parks
+                self._expires_at = time.monotonic() + self._ttl()
+        return parks
+
+    def invalidate(self):
+        with self._lock:
+            self._parks = None
+            self._expires_at = 0.0
+            self._primary_until = time.monotonic() + self._replica_lag()
+            self._generation += 1
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'hit_ratio': (self.hits / total) if total else 0.0,
+                'cached': self._parks is not None,
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.invalidations = 0
+
+
+park_catalog = ParkCatalogCache()
+
+
+## Small keyed TTL cache, per worker ##
+class TTLCache:
+
+    def __init__(self, ttl=60, maxsize=10000):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._data = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and now < entry[0]:
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            if len(self._data) >= self.maxsize and key not in self._data:
+                self._data.pop(next(iter(self._data)))
+            self._data[key] = (expires_at, value)
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'hit_ratio': (self.hits / total) if total else 0.0,
+                'size': len(self._data),
+            }
+
+
+## Evict on any committed change to a Park, whoever made it ##
+@event.listens_for(Session, "after_flush")
+def _track_park_changes(session, flush_context):
+    from .models import Park
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Park):
+            session.info['park_catalog_dirty'] = True
+            return
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop('park_catalog_dirty', False):
+        park_catalog.invalidate()
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session):
+    session.info.pop('park_catalog_dirty', None)
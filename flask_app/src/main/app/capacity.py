@@ -0,0 +1,122 @@
+from sqlalchemy import exists, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from . import db
+from .models import Park, ParkDailyStats, ParkDayInventory
+
+## Per-park, per-day ticket capacity ##
+# Every reservation is a single conditional UPDATE on park_day_inventory:
+#   UPDATE ... SET tickets_sold = tickets_sold + n
+#    WHERE park_id = ? AND day = ? AND tickets_sold + n <= capacity
+# The row lock taken by that statement is the only serialization point, so
+# concurrent writers can never push tickets_sold past capacity and there is
+# no SELECT-then-INSERT window. The caller owns the transaction: the
+# reservation and the Booking insert commit (or roll back) together.
+# Every path that writes bookings goes through here: main.booking, the API
+# and BookingView (which releases the old day before reserving the new one
+# on an edit). A row snapshots the park's daily_capacity when it is opened;
+# set_capacity() carries a later change over to today's and future rows.
+
+class SoldOutError(Exception):
+    def __init__(self, park_id, day, requested):
+        self.park_id = park_id
+        self.day = day
+        self.requested = requested
+        super().__init__(f'Not enough tickets left for park {park_id} on {day}')
+
+
+def _claim(park_id, day, num_tickets):
+    inventory = ParkDayInventory.__table__
+    result = db.session.execute(
+        update(inventory)
+        .where(inventory.c.park_id == park_id)
+        .where(inventory.c.day == day)
+        .where(inventory.c.tickets_sold + num_tickets <= inventory.c.capacity)
+        .values(tickets_sold=inventory.c.tickets_sold + num_tickets)
+    )
+    return result.rowcount == 1
+
+
+def _open_day(park_id, day):
+    ## Create the counter row if missing; losing the race to another writer is fine ##
+    capacity = db.session.execute(
+        db.select(Park.daily_capacity).where(Park.park_id == park_id)
+    ).scalar_one_or_none()
+    if capacity is None:
+        raise LookupError(f'Park {park_id} does not exist')
+
+    inventory = ParkDayInventory.__table__
+    values = dict(park_id=park_id, day=day, capacity=capacity, tickets_sold=0)
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'mysql':
+        stmt = mysql_insert(inventory).values(**values)
+        stmt = stmt.on_duplicate_key_update(park_id=stmt.inserted.park_id)
+    else:
+        stmt = sqlite_insert(inventory).values(**values).on_conflict_do_nothing()
+    db.session.execute(stmt)
+
+
+def reserve_tickets(park_id, day, num_tickets):
+    if num_tickets < 1:
+        raise ValueError('num_tickets must be at least 1')
+
+    if _claim(park_id, day, num_tickets):
+        return
+    _open_day(park_id, day)
+    if not _claim(park_id, day, num_tickets):
+        raise SoldOutError(park_id, day, num_tickets)
+
+
+def release_tickets(park_id, day, num_tickets):
+    inventory = ParkDayInventory.__table__
+    db.session.execute(
+        update(inventory)
+        .where(inventory.c.park_id == park_id)
+        .where(inventory.c.day == day)
+        .values(tickets_sold=db.case(
+            (inventory.c.tickets_sold > num_tickets, inventory.c.tickets_sold - num_tickets),
+            else_=0,
+        ))
+    )
+
+
+def tickets_remaining(park_id, day):
+    row = db.session.execute(
+        db.select(ParkDayInventory.capacity, ParkDayInventory.tickets_sold)
+        .where(ParkDayInventory.park_id == park_id, ParkDayInventory.day == day)
+    ).first()
+    if row is None:
+        capacity = db.session.execute(
+            db.select(Park.daily_capacity).where(Park.park_id == park_id)
+        ).scalar_one_or_none()
+        return capacity or 0
+    return max(row.capacity - row.tickets_sold, 0)
+
+
+def set_capacity(park_id, capacity, from_day):
+    """Apply a new daily_capacity to the park's open rows from from_day on; sold tickets stay sold."""
+    inventory = ParkDayInventory.__table__
+    db.session.execute(
+        update(inventory)
+        .where(inventory.c.park_id == park_id, inventory.c.day >= from_day)
+        .values(capacity=capacity)
+    )
+
+
+def rebuild_inventory(conn):
+    """
+    Set tickets_sold from park_daily_stats (rebuild those from bookings
+    first) and open the days that have sales but no row yet; returns the
+    number of rows opened. For upgrades and Core bulk loads, which bypass
+    reserve_tickets().
+    """
+    inventory, stats, parks = ParkDayInventory.__table__, ParkDailyStats.__table__, Park.__table__
+    same_day = db.and_(stats.c.park_id == inventory.c.park_id, stats.c.day == inventory.c.day)
+    sold = db.select(stats.c.tickets_sold).where(same_day).scalar_subquery()
+    conn.execute(inventory.update().values(tickets_sold=db.func.coalesce(sold, 0)))
+    opened = conn.execute(inventory.insert().from_select(
+        ('park_id', 'day', 'capacity', 'tickets_sold'),
+        db.select(stats.c.park_id, stats.c.day, parks.c.daily_capacity, stats.c.tickets_sold)
+        .join(parks, parks.c.park_id == stats.c.park_id)
+        .where(stats.c.tickets_sold > 0, ~exists().where(same_day))))
+    return opened.rowcount
@@ -0,0 +1,93 @@
+import hashlib
+import json
+from datetime import datetime, timezone
+from functools import wraps
+from flask import current_app, request, session, make_response
+from flask_login import current_user
+from . import db
+
+## Conditional GET for catalog pages ##
+# The public park pages only change when a park row changes, so their
+# validator is the catalog version: the newest updated_at and the park count
+# of the cached catalog (for the index, which renders that same snapshot, so
+# a warm 304 costs no query) or one park's updated_at (for the detail page).
+# A request whose If-None-Match / If-Modified-Since still matches gets a 304
+# before any template is rendered. The ETag also covers who is logged in,
+# with the name and roles the header shows (an admin rename changes it),
+# and the static build (hashed URLs); Last-Modified cannot, so it
+# is only sent to and honoured for anonymous visitors. Pages with pending
+# flash messages are always rendered.
+
+def catalog_version():
+    from .cache import park_catalog
+    parks = park_catalog.get_parks()
+    last_modified = max((datetime.fromisoformat(park['updated_at']) for park in parks if park['updated_at']),
+                        default=None)
+    return last_modified, f'catalog:{len(parks)}:{last_modified}'
+
+
+def park_version(park_id):
+    from .models import Park
+    last_modified = db.session.execute(
+        db.select(Park.updated_at).where(Park.park_id == park_id)
+    ).scalar_one_or_none()
+    if last_modified is None:
+        return None, None
+    return last_modified, f'park:{park_id}:{last_modified}'
+
+
+def _build_id(app):
+    build_id = app.extensions.get('conditional_build_id')
+    if build_id is None:
+        manifests = {key: app.extensions.get(key, {}) for key in ('asset_manifest', 'image_manifest')}
+        build_id = hashlib.sha1(json.dumps(manifests, sort_keys=True).encode()).hexdigest()[:12]
+        app.extensions['conditional_build_id'] = build_id
+    return build_id
+
+
+def _http_date(value):
+    return value.replace(microsecond=0, tzinfo=timezone.utc)
+
+
+def conditional(version_func):
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method != 'GET' or not current_app.config.get('CONDITIONAL_GET', True):
+                return view(*args, **kwargs)
+
+            last_modified, token = version_func(*args, **kwargs)
+            if token is None:
+                return view(*args, **kwargs)
+
+            if current_user.is_authenticated:
+                roles = ','.join(sorted(current_user.role_names))
+                viewer, last_modified = f'{current_user.get_id()}:{current_user.name}:{roles}', None
+            else:
+                viewer = 'anonymous'
+            etag = hashlib.sha1(f'{token}|{viewer}|{_build_id(current_app)}'.encode()).hexdigest()
+
+            if '_flashes' not in session:
+                if request.if_none_match:
+                    fresh = request.if_none_match.contains(etag)
+                else:
+                    since = request.if_modified_since
+                    fresh = since is not None and last_modified is not None and _http_date(last_modified) <= since
+                if fresh:
+                    response = current_app.response_class(status=304)
+                    return _validators(response, etag, last_modified)
+
+            return _validators(make_response(view(*args, **kwargs)), etag, last_modified)
+        return wrapper
+    return decorator
+
+
+def _validators(response, etag, last_modified):
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = _http_date(last_modified)
+    response.cache_control.no_cache = True
+    if current_user.is_authenticated:
+        response.cache_control.private = True
+    response.vary.add('Cookie')
+    return response
@@ -0,0 +1,164 @@
+import click
+from datetime import timedelta
+from flask.cli import with_appcontext
+from sqlalchemy import event, inspect
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from . import db
+from .models import Booking, ParkDailyStats, ParkDayInventory
+
+## Materialized per-park, per-day booking totals ##
+# park_daily_stats holds tickets sold, booking count and health & safety
+# acknowledgements for each (park, day) so availability is a primary-key
+# range read instead of an aggregate over bookings. ORM inserts, edits and
+# deletes of a Booking (main.booking, BookingView, anything else using the
+# session) apply their delta in the same flush, as an upsert that adds to
+# the counters, so the totals commit or roll back with the booking. Core
+# bulk writes and Query.delete() bypass the mapper events; run
+# `flask daily-stats rebuild` after those.
+#
+# Seats are not counted here: park_day_inventory (capacity.py) is the one
+# source of truth for capacity and tickets sold, since that is what
+# reserve_tickets() checks. availability() reads both tables in one query,
+# inventory for what can still be sold and these totals for the rest.
+
+COUNTERS = ('tickets_sold', 'booking_count', 'health_safety_acks')
+
+
+def _contribution(park_id, when, num_tickets, health_safety, sign=1):
+    return (park_id, when.date()), (sign * num_tickets, sign, sign * int(bool(health_safety)))
+
+
+def apply_delta(conn, park_id, day, tickets_sold, booking_count, health_safety_acks):
+    table = ParkDailyStats.__table__
+    values = dict(park_id=park_id, day=day, tickets_sold=tickets_sold,
+                  booking_count=booking_count, health_safety_acks=health_safety_acks)
+    if conn.dialect.name == 'sqlite':
+        stmt = sqlite_insert(table).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['park_id', 'day'],
+            set_={name: table.c[name] + stmt.excluded[name] for name in COUNTERS})
+    elif conn.dialect.name == 'mysql':
+        stmt = mysql_insert(table).values(**values)
+        stmt = stmt.on_duplicate_key_update(
+            **{name: table.c[name] + stmt.inserted[name] for name in COUNTERS})
+    else:
+        updated = conn.execute(
+            table.update()
+            .where(table.c.park_id == park_id, table.c.day == day)
+            .values(**{name: table.c[name] + values[name] for name in COUNTERS}))
+        if updated.rowcount:
+            return
+        stmt = table.insert().values(**values)
+    conn.execute(stmt)
+
+
+def _apply(conn, *contributions):
+    deltas = {}
+    for key, counts in contributions:
+        total = deltas.get(key, (0, 0, 0))
+        deltas[key] = tuple(a + b for a, b in zip(total, counts))
+    for (park_id, day), counts in deltas.items():
+        if any(counts):
+            apply_delta(conn, park_id, day, *counts)
+
+
+def _previous(target, name):
+    history = inspect(target).attrs[name].history
+    return history.deleted[0] if history.deleted else getattr(target, name)
+
+
+def _active_history(target, value, oldvalue, initiator):
+    """Does nothing; registered only so that active_history=True is set on the attribute."""
+
+
+# active_history loads the old value before an expired attribute is overwritten,
+# so _previous() still sees it after a commit expired the booking
+for _attribute in (Booking.park_id, Booking.date, Booking.num_tickets, Booking.health_safety):
+    event.listen(_attribute, 'set', _active_history, active_history=True)
+
+
+@event.listens_for(Booking, 'after_insert')
+def _booking_inserted(mapper, conn, target):
+    _apply(conn, _contribution(target.park_id, target.date, target.num_tickets, target.health_safety))
+
+
+@event.listens_for(Booking, 'after_update')
+def _booking_updated(mapper, conn, target):
+    old = _contribution(_previous(target, 'park_id'), _previous(target, 'date'),
+                        _previous(target, 'num_tickets'), _previous(target, 'health_safety'), sign=-1)
+    new = _contribution(target.park_id, target.date, target.num_tickets, target.health_safety)
+    _apply(conn, old, new)
+
+
+@event.listens_for(Booking, 'after_delete')
+def _booking_deleted(mapper, conn, target):
+    _apply(conn, _contribution(_previous(target, 'park_id'), _previous(target, 'date'),
+                               _previous(target, 'num_tickets'), _previous(target, 'health_safety'), sign=-1))
+
+
+def rebuild(conn, park_id=None):
+    """Recompute park_daily_stats from bookings; returns the number of (park, day) rows written."""
+    table = ParkDailyStats.__table__
+    delete = table.delete()
+    totals = (
+        db.select(
+            Booking.park_id,
+            db.func.date(Booking.date).label('day'),
+            db.func.sum(Booking.num_tickets),
+            db.func.count(Booking.booking_id),
+            db.func.sum(db.case((Booking.health_safety, 1), else_=0)),
+        )
+        .group_by(Booking.park_id, db.func.date(Booking.date))
+    )
+    if park_id is not None:
+        delete = delete.where(table.c.park_id == park_id)
+        totals = totals.where(Booking.park_id == park_id)
+    conn.execute(delete)
+    result = conn.execute(table.insert().from_select(('park_id', 'day') + COUNTERS, totals))
+    return result.rowcount
+
+
+def availability(park, start, end):
+    """Per-day capacity, sales and totals for park (a catalog dict) from start to end inclusive, zero-filled."""
+    inventory, stats = ParkDayInventory.__table__, ParkDailyStats.__table__
+    rows = db.session.execute(
+        db.select(inventory.c.day, inventory.c.capacity, inventory.c.tickets_sold,
+                  stats.c.booking_count, stats.c.health_safety_acks)
+        .outerjoin(stats, db.and_(stats.c.park_id == inventory.c.park_id, stats.c.day == inventory.c.day))
+        .where(inventory.c.park_id == park['park_id'], inventory.c.day >= start, inventory.c.day <= end)
+    )
+    by_day = {row.day: row for row in rows}
+    days = []
+    day = start
+    while day <= end:
+        row = by_day.get(day)
+        # days nobody booked yet have no inventory row and sell the park's current capacity
+        capacity = row.capacity if row else park['daily_capacity']
+        sold = row.tickets_sold if row else 0
+        days.append({
+            'day': day.isoformat(),
+            'capacity': capacity,
+            'tickets_sold': sold,
+            'booking_count': (row.booking_count or 0) if row else 0,
+            'health_safety_acks': (row.health_safety_acks or 0) if row else 0,
+            'tickets_remaining': max(capacity - sold, 0),
+        })
+        day += timedelta(days=1)
+    return days
+
+
+## CLI: flask daily-stats ... ##
+@click.group('daily-stats')
+def daily_stats_cli():
+    """Materialized per-park daily booking totals."""
+
+
+@daily_stats_cli.command('rebuild')
+@click.option('--park', 'park_id', type=int, default=None, help='Only rebuild this park.')
+@with_appcontext
+def rebuild_command(park_id):
+    """Recompute park_daily_stats from the bookings table."""
+    with db.engine.begin() as conn:
+        written = rebuild(conn, park_id)
+    click.echo(f'rebuilt {written} park-day rows')
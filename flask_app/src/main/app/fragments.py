@@ -0,0 +1,73 @@
+import hashlib
+from flask import current_app
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+from werkzeug.utils import import_string
+from .cache import TTLCache
+
+## Jinja fragment cache ##
+# {% cache key, ttl %}...{% endcache %} renders the body once and serves the
+# stored HTML until the TTL runs out. The key is combined with the template
+# name, the tag's line and the static build id, so callers only list what
+# the fragment depends on, e.g.
+#     {% cache ['park-card', park.park_id, park.updated_at], 3600 %}
+# A new park version produces a new key; stale entries just age out.
+# FRAGMENT_CACHE_BACKEND picks the store: 'simple' (per-worker, in memory),
+# 'null' (disabled) or a dotted path to a class with get/set/invalidate.
+
+class NullBackend:
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl=None):
+        pass
+
+    def invalidate(self, key=None):
+        pass
+
+    def stats(self):
+        return {}
+
+
+BACKENDS = {'simple': TTLCache, 'null': NullBackend}
+
+
+class FragmentCacheExtension(Extension):
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        key = parser.parse_expression()
+        ttl = nodes.Const(None)
+        if parser.stream.skip_if('comma'):
+            ttl = parser.parse_expression()
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        call = self.call_method('_render', [nodes.Const(f'{parser.name}:{lineno}'), key, ttl])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _render(self, location, key, ttl, caller):
+        app = current_app
+        backend = app.extensions.get('fragment_cache')
+        if backend is None:
+            return caller()
+
+        from .conditional import _build_id
+        raw = f'{location}|{_build_id(app)}|{key!r}'
+        cache_key = 'fragment:' + hashlib.sha1(raw.encode()).hexdigest()
+        html = backend.get(cache_key)
+        if html is None:
+            html = str(caller())
+            backend.set(cache_key, html, ttl if ttl is not None else app.config['FRAGMENT_CACHE_TTL'])
+        return Markup(html)
+
+
+def init_app(app):
+    name = app.config.get('FRAGMENT_CACHE_BACKEND', 'simple')
+    backend = (BACKENDS.get(name) or import_string(name))()
+    if isinstance(backend, TTLCache):
+        backend.ttl = app.config['FRAGMENT_CACHE_TTL']
+        backend.maxsize = app.config['FRAGMENT_CACHE_MAXSIZE']
+    app.extensions['fragment_cache'] = backend
+    app.jinja_env.add_extension(FragmentCacheExtension)
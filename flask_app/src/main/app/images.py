@@ -0,0 +1,144 @@
+import glob
+import json
+import os
+import re
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+try:
+    from PIL import Image, features
+except ImportError:  # only needed to build derivatives, not to serve them
+    Image = None
+
+## Responsive image derivatives ##
+# `flask images build` (or build_images() offline) resizes each park folder's
+# gallery photos, banner and logo into several widths and formats under
+# static/images/derived/ and writes derived/manifest.json. Gallery thumbnails
+# are generated from the full photos instead of the hand-made thumbN.jpg.
+# Templates look sources up by their original static path via
+# responsive_image(); with no manifest entry they fall back to the original.
+
+DERIVED_DIR = os.path.join('images', 'derived')
+MANIFEST_NAME = 'manifest.json'
+GALLERY_RE = re.compile(r'^(\d+)\.jpe?g$')
+
+
+def _sources(static_folder, folder):
+    park_dir = os.path.join(static_folder, 'images', 'parks', folder)
+    sources = []
+    for path in sorted(glob.glob(os.path.join(park_dir, 'gallery', '*'))):
+        match = GALLERY_RE.match(os.path.basename(path))
+        if match:
+            sources.append(('gallery', path, None))
+            thumb = os.path.join(park_dir, 'gallery', f'thumb{match.group(1)}.jpg')
+            sources.append(('thumb', path, thumb))
+    for path in sorted(glob.glob(os.path.join(park_dir, '*.png'))):
+        role = 'banner' if os.path.basename(path).startswith('banner') else 'logo'
+        sources.append((role, path, None))
+    return sources
+
+
+def _formats(requested, has_alpha):
+    fallback = 'png' if has_alpha else 'jpeg'
+    available = [fmt for fmt in requested
+                 if fmt not in ('jpeg', 'png') and features.check(fmt)]
+    return available + [fallback]
+
+
+def _save(image, path, fmt):
+    if fmt == 'jpeg':
+        image.save(path, 'JPEG', quality=80, optimize=True, progressive=True)
+    elif fmt == 'webp':
+        image.save(path, 'WEBP', quality=75, method=4)
+    elif fmt == 'avif':
+        image.save(path, 'AVIF', quality=55, speed=6)
+    else:
+        image.save(path, 'PNG', optimize=True)
+
+
+def build_images(static_folder, folders, widths, formats=('avif', 'webp', 'jpeg')):
+    if Image is None:
+        raise RuntimeError('Pillow is required to build image derivatives (pip install Pillow)')
+
+    out_root = os.path.join(static_folder, DERIVED_DIR)
+    manifest_path = os.path.join(out_root, MANIFEST_NAME)
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    for folder in folders:
+        for role, source, alias in _sources(static_folder, folder):
+            key = os.path.relpath(alias or source, static_folder).replace(os.sep, '/')
+            with Image.open(source) as opened:
+                has_alpha = opened.mode in ('RGBA', 'LA') or 'transparency' in opened.info
+                original = opened.convert('RGBA' if has_alpha else 'RGB')
+                src_w, src_h = original.size
+                targets = sorted({min(w, src_w) for w in widths[role]})
+                stem = os.path.splitext(os.path.relpath(alias or source, os.path.join(static_folder, 'images')))[0]
+                entry = {'width': src_w, 'height': src_h, 'srcset': {}}
+                for fmt in _formats(formats, has_alpha):
+                    variants = []
+                    for w in targets:
+                        h = round(src_h * w / src_w)
+                        ext = 'jpg' if fmt == 'jpeg' else fmt
+                        rel = os.path.join(DERIVED_DIR, f'{stem}-{w}.{ext}')
+                        os.makedirs(os.path.dirname(os.path.join(static_folder, rel)), exist_ok=True)
+                        resized = original if w == src_w else original.resize((w, h), Image.LANCZOS)
+                        _save(resized, os.path.join(static_folder, rel), fmt)
+                        variants.append([w, rel.replace(os.sep, '/')])
+                    entry['srcset'][fmt] = variants
+                fallback_fmt = 'png' if has_alpha else 'jpeg'
+                fallback = entry['srcset'][fallback_fmt]
+                entry['src'] = fallback[len(fallback) // 2][1]
+                entry['fallback_type'] = 'image/' + fallback_fmt
+                manifest[key] = entry
+
+    os.makedirs(out_root, exist_ok=True)
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_manifest(app):
+    path = os.path.join(app.static_folder, DERIVED_DIR, MANIFEST_NAME)
+    manifest = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            manifest = json.load(f)
+    app.extensions['image_manifest'] = manifest
+    return manifest
+
+
+def responsive_image(path):
+    return current_app.extensions.get('image_manifest', {}).get(path)
+
+
+def init_app(app):
+    load_manifest(app)
+    app.jinja_env.globals['responsive_image'] = responsive_image
+    app.cli.add_command(images_cli)
+
+
+## CLI: flask images build ##
+@click.group('images')
+def images_cli():
+    """Responsive image derivatives."""
+
+
+@images_cli.command('build')
+@click.option('--folder', 'folders', multiple=True, help='Park folder(s); default all.')
+@with_appcontext
+def build_command(folders):
+    """Resize park images into static/images/derived and write the manifest."""
+    app = current_app
+    parks_dir = os.path.join(app.static_folder, 'images', 'parks')
+    folders = folders or sorted(d for d in os.listdir(parks_dir) if os.path.isdir(os.path.join(parks_dir, d)))
+    try:
+        manifest = build_images(app.static_folder, folders, app.config['IMAGE_VARIANT_WIDTHS'],
+                                app.config['IMAGE_FORMATS'])
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+    load_manifest(app)
+    click.echo(f'{len(manifest)} images in manifest for folders: {", ".join(folders)}')
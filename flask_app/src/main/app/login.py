@@ -1,8 +1,8 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_user, logout_user, login_required
-from werkzeug.security import generate_password_hash, check_password_hash
 from .models import User, Role
 from . import db
+from .passwords import hash_password, verify_password, needs_rehash
 
 auth_login = Blueprint('login', __name__)
 
@@ -17,10 +17,15 @@ def login_post():
 
     user = User.query.filter_by(email=email).first()
 
-    if not user or not check_password_hash(user.password, password):
+    if not user or not verify_password(user.password, password):
         flash('Please check your login details and try again.')
         return redirect(url_for('login.login'))
 
+    ## upgrade hashes made with outdated parameters while we have the plain password ##
+    if needs_rehash(user.password):
+        user.password = hash_password(password)
+        db.session.commit()
+
     login_user(user, remember=False)
     return redirect(url_for('main.profile'))
 
@@ -32,7 +37,7 @@ def forgot_password():
 
         user = User.query.filter_by(email=email).first()
         if user:
-            user.password = generate_password_hash(new_password, method='pbkdf2:sha256')
+            user.password = hash_password(new_password)
             db.session.commit()
             flash("Password successfully updated. You can now login.")
             return redirect(url_for('login.login'))
@@ -60,7 +65,7 @@ def register_post():
         return redirect(url_for('login.register'))
 
     customer_role = Role.query.filter_by(name='customer').first()
-    new_user = User(email=email, name=name, last_name=last_name, role=customer_role, password=generate_password_hash(password, method='pbkdf2:sha256'))
+    new_user = User(email=email, name=name, last_name=last_name, role=customer_role, password=hash_password(password))
     db.session.add(new_user)
     db.session.commit()
 
@@ -1,50 +1,112 @@
-from datetime import datetime
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+from datetime import date, datetime, timedelta
+from flask import Blueprint, abort, render_template, request, redirect, url_for, flash, current_app, jsonify
 from flask_login import login_required, current_user
 from .models import Booking, Park, Message
 from . import db
+from .cache import park_catalog
+from .capacity import reserve_tickets, SoldOutError
+from .bookings import booking_history, booking_counts
+from .daily_stats import availability
+from .conditional import conditional, catalog_version, park_version
+from .transactions import commit_with_retry
+from sqlalchemy.exc import OperationalError
 
 main = Blueprint('main', __name__)
 
 @main.route('/')
+@conditional(catalog_version)
 def index():
-    parks = Park.query.all()
+    parks = park_catalog.get_parks()
     return render_template('index.html', parks=parks)
 
 @main.route('/parks/<int:park_id>')
+@conditional(park_version)
 def park_detail(park_id):
     park = Park.query.get_or_404(park_id)
     return render_template('park_detail.html', park=park)
 
+@main.route('/parks/<int:park_id>/availability')
+def park_availability(park_id):
+    park = next((p for p in park_catalog.get_parks() if p['park_id'] == park_id), None)
+    if park is None:
+        return jsonify({'error': 'park not found'}), 404
+    try:
+        start = date.fromisoformat(request.args['from']) if 'from' in request.args else date.today()
+        end = date.fromisoformat(request.args['to']) if 'to' in request.args else start + timedelta(days=30)
+    except ValueError:
+        return jsonify({'error': 'from and to must be YYYY-MM-DD dates'}), 400
+    if end < start or (end - start).days >= current_app.config['AVAILABILITY_MAX_DAYS']:
+        return jsonify({'error': f"date range must be 1 to {current_app.config['AVAILABILITY_MAX_DAYS']} days"}), 400
+    return jsonify({
+        'park_id': park_id,
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'capacity': park['daily_capacity'],
+        'days': availability(park, start, end),
+    })
+
 @main.route('/profile')
 @login_required
 def profile():
-    return render_template('profile.html', name=current_user.name)
+    try:
+        bookings, next_cursor = booking_history(
+            current_user.user_id,
+            cursor=request.args.get('before'),
+            per_page=current_app.config['PROFILE_BOOKINGS_PER_PAGE'],
+        )
+    except ValueError:
+        return redirect(url_for('main.profile'))
+    counts = booking_counts(current_user.user_id)
+    return render_template('profile.html', name=current_user.name, bookings=bookings,
+                           counts=counts, next_cursor=next_cursor)
 
 @main.route('/booking/new')
 @login_required
 def new_booking():
-    parks = Park.query.all()
+    parks = park_catalog.get_parks()
     return render_template('new_booking.html', parks=parks)
 
 @main.route('/booking', methods=['GET', 'POST'])
 @login_required
 def booking():
     if request.method == 'POST':
-        booking = Booking(
-            user_id=current_user.user_id,
-            park_id=request.form['park_id'],
-            date=datetime.fromisoformat(request.form['date']),
-            num_tickets=int(request.form['num_tickets']),
-            health_safety='health_safety' in request.form
-        )
+        try:
+            park_id = int(request.form['park_id'])
+            visit_date = datetime.fromisoformat(request.form['date'])
+            num_tickets = int(request.form['num_tickets'])
+        except (KeyError, ValueError):
+            flash('Please choose a park, a date and at least one ticket.')
+            return redirect(url_for('main.new_booking'))
 
-        db.session.add(booking)
-        db.session.commit()
+        def place_booking():
+            reserve_tickets(park_id, visit_date.date(), num_tickets)
+            db.session.add(Booking(
+                user_id=current_user.user_id,
+                park_id=park_id,
+                date=visit_date,
+                num_tickets=num_tickets,
+                health_safety='health_safety' in request.form
+            ))
+
+        try:
+            commit_with_retry(place_booking)
+        except SoldOutError:
+            db.session.rollback()
+            flash('Sorry, there are not enough tickets left for that park on that day.')
+            return redirect(url_for('main.new_booking'))
+        except ValueError:
+            db.session.rollback()
+            flash('Please choose a park, a date and at least one ticket.')
+            return redirect(url_for('main.new_booking'))
+        except LookupError:
+            db.session.rollback()
+            abort(404)
+        except OperationalError:
+            flash('We are very busy right now, please try your booking again.')
+            return redirect(url_for('main.new_booking'))
 
         return redirect(url_for('main.profile'))
 
-    parks = Park.query.all()
     return redirect(url_for('main.profile'))
 
 @main.route('/health-safety-guidelines')
@@ -55,16 +117,23 @@ def health_safety_guidelines():
 
 @main.route('/contact', methods=['GET', 'POST'])
 def contact():
-    parks = Park.query.all()
+    parks = park_catalog.get_parks()
     if request.method == 'POST':
-        message = Message(
-            name=request.form['name'],
-            email=request.form['email'],
-            message=request.form['message']
-        )
-
-        db.session.add(message)
-        db.session.commit()
+        buffer = current_app.extensions['message_buffer']
+        if buffer.enabled:
+            # written in batches by the background thread, see message_buffer.py
+            buffer.enqueue(request.form['name'], request.form['email'], request.form['message'])
+        else:
+            message = Message(
+                name=request.form['name'],
+                email=request.form['email'],
+                message=request.form['message']
+            )
+            try:
+                commit_with_retry(lambda: db.session.add(message))
+            except OperationalError:
+                flash('We are very busy right now, please send your message again.')
+                return render_template('index.html', parks=parks)
 
         flash('Thank you for your message!')
         return render_template('index.html', parks=parks)
@@ -0,0 +1,278 @@
+import atexit
+import fcntl
+import glob
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy.exc import OperationalError
+
+from . import db
+
+logger = logging.getLogger(__name__)
+
+## Write-behind buffer for contact messages ##
+# main.contact hands the message to enqueue() and returns straight away. The
+# record is first appended to this process's spool file (fsynced), then
+# queued for a background thread that bulk-inserts up to
+# MESSAGE_BUFFER_BATCH_SIZE rows per transaction, or whatever arrived within
+# MESSAGE_BUFFER_FLUSH_INTERVAL. After each commit an {"ack": seq} line is
+# appended; once everything is acked the spool is truncated. On start-up,
+# spools left by dead processes are replayed from their last ack, so a crash
+# loses nothing (a crash between a commit and its ack can repeat that one
+# batch: delivery is at-least-once). The worker starts lazily in each
+# process, so it survives preforking servers.
+#
+# Spools are named spool-<pid>-<uuid>.jsonl, unique per process start even
+# where PIDs repeat (containers), and the owner holds an exclusive flock on
+# the matching .lock file for as long as it runs. Recovery claims a spool by
+# taking that lock, which only succeeds once the owner is gone.
+#
+# Only OperationalError (lost connection, lock timeout) is retried. Any other
+# failure splits the batch in halves until the offending records are alone;
+# those are appended to dead-letters.jsonl with the error and acked, so one
+# bad record cannot wedge the buffer.
+
+DEAD_LETTER_FILE = 'dead-letters.jsonl'
+
+class MessageBuffer:
+
+    def __init__(self):
+        self.app = None
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._acked_cond = threading.Condition(self._lock)
+        self._pid = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._queue = None
+        self._spool = None
+        self._spool_id = None
+        self._owner_lock = None
+        self._seq = 0
+        self._acked = 0
+        self.inserted = 0
+        self.batches = 0
+        self.dead_letters = 0
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config.get('MESSAGE_BUFFER_ENABLED', False)
+        self.spool_dir = app.config.get('MESSAGE_SPOOL_DIR') or os.path.join(app.instance_path, 'message_spool')
+        app.extensions['message_buffer'] = self
+        if self.enabled:
+            os.makedirs(self.spool_dir, exist_ok=True)
+            self.recover()
+            atexit.register(self.close)
+
+    ## Request side ##
+    def enqueue(self, name, email, message):
+        record = {'name': name, 'email': email, 'message': message,
+                  'created_at': datetime.utcnow().isoformat()}
+        with self._lock:
+            self._ensure_worker()
+            self._seq += 1
+            record['seq'] = self._seq
+            self._append(record)
+            self._queue.put(record)
+        return record['seq']
+
+    def flush(self, timeout=10.0):
+        """Block until everything enqueued so far is committed (or dead-lettered)."""
+        deadline = time.monotonic() + timeout
+        with self._acked_cond:
+            target = self._seq
+            while self._acked < target:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._acked_cond.wait(remaining)
+        return True
+
+    def close(self, timeout=10.0):
+        if self._pid != os.getpid():
+            return  # never used here, or inherited from a parent that still owns its spool
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout)
+        if self._spool is not None:
+            self._spool.close()
+            self._spool = None
+            if self._acked == self._seq:
+                # clean shutdown: nothing to replay
+                os.remove(self._spool_path())
+                os.remove(self._spool_path('.lock'))
+        if self._owner_lock is not None:
+            self._owner_lock.close()
+            self._owner_lock = None
+
+    def stats(self):
+        with self._lock:
+            return {'pending': self._seq - self._acked, 'inserted': self.inserted, 'batches': self.batches,
+                    'dead_letters': self.dead_letters}
+
+    ## Spool ##
+    def _spool_path(self, suffix='.jsonl'):
+        return os.path.join(self.spool_dir, f'spool-{self._spool_id}{suffix}')
+
+    def _append(self, entry):
+        self._spool.write(json.dumps(entry) + '\n')
+        self._spool.flush()
+        if self.app.config.get('MESSAGE_SPOOL_FSYNC', True):
+            os.fsync(self._spool.fileno())
+
+    def _ensure_worker(self):
+        if self._pid != os.getpid():
+            # first use in this process (or after a fork): own queue and spool
+            self._pid = os.getpid()
+            self._queue = queue.Queue()
+            self._seq = self._acked = 0
+            self._spool = None
+            self._spool_id = f'{self._pid}-{uuid.uuid4().hex}'
+            self._owner_lock = None  # an inherited descriptor keeps the parent's lock, not ours
+        if self._spool is None:
+            os.makedirs(self.spool_dir, exist_ok=True)
+            if self._owner_lock is None:
+                self._owner_lock = open(self._spool_path('.lock'), 'a')
+                fcntl.flock(self._owner_lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            self._spool = open(self._spool_path(), 'a')
+        if self._thread is not None and self._thread.is_alive() and not self._stop.is_set():
+            return
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='message-buffer', daemon=True)
+        self._thread.start()
+
+    ## Worker side ##
+    def _run(self):
+        size = self.app.config.get('MESSAGE_BUFFER_BATCH_SIZE', 200)
+        interval = self.app.config.get('MESSAGE_BUFFER_FLUSH_INTERVAL', 0.5)
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = self._take(size, interval)
+            if batch and self._write(batch):
+                self._ack(batch[-1]['seq'], len(batch))
+
+    def _take(self, size, interval):
+        batch = []
+        deadline = time.monotonic() + interval
+        while len(batch) < size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch, retry=True):
+        """
+        Insert batch; True once every record is either committed or
+        dead-lettered. Transient errors are retried (unless retry is off or
+        the buffer is stopping, which returns False with the rest unwritten).
+        """
+        parts = [batch]
+        delay = 0.5
+        while parts:
+            records = parts[-1]
+            try:
+                self._insert(records)
+            except OperationalError:
+                if not retry or self._stop.is_set():
+                    logger.exception('Message insert failed with %d rows unwritten; they stay in the spool',
+                                     sum(len(part) for part in parts))
+                    return False
+                logger.exception('Message batch insert failed, retrying in %.1fs', delay)
+                time.sleep(delay)
+                delay = min(delay * 2, 30)
+                continue
+            except Exception as exc:
+                parts.pop()
+                if len(records) == 1:
+                    self._dead_letter(records[0], exc)
+                else:
+                    middle = len(records) // 2
+                    parts += [records[middle:], records[:middle]]
+                continue
+            parts.pop()
+            delay = 0.5
+        return True
+
+    def _insert(self, records):
+        from .models import Message
+        from .transactions import commit_with_retry
+        rows = [{'name': r['name'], 'email': r['email'], 'message': r['message'],
+                 'created_at': datetime.fromisoformat(r['created_at'])} for r in records]
+        with self.app.app_context():
+            try:
+                commit_with_retry(lambda: db.session.execute(db.insert(Message), rows))
+            finally:
+                db.session.remove()
+
+    def _dead_letter(self, record, exc):
+        logger.error('Contact message %s rejected (%s: %s); moved to %s',
+                     record.get('seq'), type(exc).__name__, exc, DEAD_LETTER_FILE)
+        entry = dict(record, error=f'{type(exc).__name__}: {exc}', failed_at=datetime.utcnow().isoformat())
+        with open(os.path.join(self.spool_dir, DEAD_LETTER_FILE), 'a') as f:
+            f.write(json.dumps(entry, default=str) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        with self._lock:
+            self.dead_letters += 1
+
+    def _ack(self, seq, count):
+        with self._acked_cond:
+            self._acked = seq
+            self.inserted += count
+            self.batches += 1
+            if self._acked == self._seq and self._spool.tell() > self.app.config.get('MESSAGE_SPOOL_MAX_BYTES', 1 << 20):
+                self._spool.truncate(0)
+            else:
+                self._append({'ack': seq})
+            self._acked_cond.notify_all()
+
+    ## Crash recovery ##
+    def recover(self):
+        recovered = 0
+        for path in sorted(glob.glob(os.path.join(self.spool_dir, 'spool-*.jsonl'))):
+            lock_path = path[:-len('.jsonl')] + '.lock'
+            with open(lock_path, 'a') as lock:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue  # owner still running, or another worker is replaying it
+                try:
+                    pending = _unacked(path)
+                except FileNotFoundError:
+                    continue  # replayed by another worker just before we got the lock
+                if pending and not self._write(pending, retry=False):
+                    logger.error('Could not replay %s; leaving it for the next start', path)
+                    continue
+                os.remove(path)
+                os.remove(lock_path)
+            recovered += len(pending)
+        if recovered:
+            logger.warning('Replayed %d buffered contact messages from spool', recovered)
+        return recovered
+
+
+def _unacked(path):
+    records, acked = [], 0
+    with open(path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # torn last line from the crash
+            if 'ack' in entry:
+                acked = entry['ack']
+            else:
+                records.append(entry)
+    return [r for r in records if r['seq'] > acked]
+
+
+message_buffer = MessageBuffer()
@@ -0,0 +1,244 @@
+import hmac
+import threading
+import time
+from bisect import bisect_left
+
+from flask import current_app, g, request, has_request_context, before_render_template, template_rendered
+
+from .querylog import on_query
+
+## Request metrics (Prometheus text format) ##
+# Per-endpoint latency / size histograms, status counters, in-flight gauge,
+# and per-request template and DB time, served on /metrics. Everything lives
+# in-process behind one lock per metric (no client library needed), so each
+# request costs a few dict lookups and bisects. With several workers, each
+# worker reports its own series; scrape them individually or aggregate in
+# Prometheus. Labels are the endpoint name, never the raw path, to keep
+# cardinality bounded.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+UNTRACKED_ENDPOINTS = {'metrics', 'static'}
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    escaped = (k + '="' + str(v).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n') + '"'
+               for k, v in pairs)
+    return '{' + ','.join(escaped) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    type = 'counter'
+
+    def __init__(self, name, help, labels=()):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values):
+        return self._values.get(label_values, 0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for values, count in items:
+            yield self.name, _format_labels(self.labels, values), count
+
+
+class Gauge(Counter):
+    type = 'gauge'
+
+    def dec(self, *label_values, amount=1):
+        self.inc(*label_values, amount=-amount)
+
+    def set(self, value, *label_values):
+        with self._lock:
+            self._values[label_values] = value
+
+
+class Histogram:
+    type = 'histogram'
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def observe(self, value, *label_values):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(label_values)
+            if series is None:
+                series = self._values[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *label_values):
+        series = self._values.get(label_values)
+        return series[2] if series else 0
+
+    def samples(self):
+        with self._lock:
+            items = sorted((values, (list(s[0]), s[1], s[2])) for values, s in self._values.items())
+        for values, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                yield self.name + '_bucket', _format_labels(self.labels, values, ('le', _format_value(float(bound)))), cumulative
+            yield self.name + '_sum', _format_labels(self.labels, values), total
+            yield self.name + '_count', _format_labels(self.labels, values), count
+
+
+class Registry:
+
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def add_collector(self, func):
+        # called before each render, e.g. to sample gauges from live objects
+        self.collectors.append(func)
+
+    def reset(self):
+        for metric in self.metrics:
+            with metric._lock:
+                metric._values.clear()
+
+    def render(self):
+        for collect in self.collectors:
+            collect()
+        lines = []
+        for metric in self.metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            for name, labels, value in metric.samples():
+                lines.append(f'{name}{labels} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+REQUEST_LATENCY = registry.register(Histogram(
+    'http_request_duration_seconds', 'Request latency by endpoint.', ('endpoint', 'method')))
+REQUESTS = registry.register(Counter(
+    'http_requests_total', 'Responses by endpoint and status code.', ('endpoint', 'method', 'status')))
+IN_FLIGHT = registry.register(Gauge(
+    'http_requests_in_flight', 'Requests currently being handled.', ('endpoint',)))
+RESPONSE_SIZE = registry.register(Histogram(
+    'http_response_size_bytes', 'Response body size by endpoint.', ('endpoint',), SIZE_BUCKETS))
+TEMPLATE_TIME = registry.register(Histogram(
+    'http_request_template_seconds', 'Template render time per request.', ('endpoint',)))
+DB_TIME = registry.register(Histogram(
+    'http_request_db_seconds', 'Time spent in SQL statements per request.', ('endpoint',)))
+DB_QUERIES = registry.register(Counter(
+    'http_request_db_queries_total', 'SQL statements executed per endpoint.', ('endpoint',)))
+
+
+def _endpoint():
+    return request.url_rule.endpoint if request.url_rule else 'unmatched'
+
+
+def _before_request():
+    endpoint = _endpoint()
+    if endpoint in UNTRACKED_ENDPOINTS:
+        return
+    g._metrics = {'endpoint': endpoint, 'start': time.perf_counter(),
+                  'template': 0.0, 'db': 0.0, 'queries': 0, 'render_started': []}
+    IN_FLIGHT.inc(endpoint)
+
+
+def _after_request(response):
+    state = g.get('_metrics')
+    if state is not None and not response.is_streamed:
+        size = response.calculate_content_length()
+        if size is not None:
+            RESPONSE_SIZE.observe(size, state['endpoint'])
+        state['status'] = response.status_code
+    return response
+
+
+def _teardown_request(exc):
+    state = g.pop('_metrics', None)
+    if state is None:
+        return
+    endpoint = state['endpoint']
+    REQUEST_LATENCY.observe(time.perf_counter() - state['start'], endpoint, request.method)
+    REQUESTS.inc(endpoint, request.method, str(state.get('status', 500)))
+    TEMPLATE_TIME.observe(state['template'], endpoint)
+    DB_TIME.observe(state['db'], endpoint)
+    if state['queries']:
+        DB_QUERIES.inc(endpoint, amount=state['queries'])
+    IN_FLIGHT.dec(endpoint)
+
+
+def _request_state():
+    return g.get('_metrics') if has_request_context() else None
+
+
+def _template_started(app, template, context, **extra):
+    state = _request_state()
+    if state is not None:
+        state['render_started'].append(time.perf_counter())
+
+
+def _template_finished(app, template, context, **extra):
+    state = _request_state()
+    if state is not None and state['render_started']:
+        state['template'] += time.perf_counter() - state['render_started'].pop()
+
+
+@on_query
+def _query_finished(statement, duration):
+    ## timed once by querylog's cursor hooks ##
+    state = _request_state()
+    if state is not None:
+        state['db'] += duration
+        state['queries'] += 1
+
+
+def _scrape_allowed():
+    token = current_app.config.get('METRICS_TOKEN')
+    if token and hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return True
+    allowed = current_app.config.get('METRICS_ALLOWED_IPS')
+    if allowed:
+        return request.remote_addr in allowed
+    return not token
+
+
+def metrics_view():
+    if not _scrape_allowed():
+        return 'Forbidden', 403
+    return registry.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+
+def init_app(app):
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+    app.extensions['metrics'] = registry
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    before_render_template.connect(_template_started, app)
+    template_rendered.connect(_template_finished, app)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
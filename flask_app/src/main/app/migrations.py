@@ -0,0 +1,279 @@
+import click
+from datetime import datetime
+from flask.cli import with_appcontext
+from sqlalchemy import inspect, text
+from . import db
+
+## Versioned schema migrations ##
+# Each migration is a (version, description, upgrade(conn)) entry applied in
+# order inside its own transaction; the applied version is recorded in the
+# schema_version table. Upgrades must be idempotent (checkfirst / inspect)
+# so they are safe on databases that were built with db.create_all().
+
+MIGRATIONS = []
+
+
+def migration(version, description):
+    def decorator(func):
+        MIGRATIONS.append((version, description, func))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return func
+    return decorator
+
+
+def _ensure_version_table(conn):
+    conn.execute(text(
+        'CREATE TABLE IF NOT EXISTS schema_version ('
+        'version INTEGER PRIMARY KEY, description VARCHAR(200) NOT NULL, applied_at DATETIME NOT NULL)'
+    ))
+
+
+def current_version(conn):
+    _ensure_version_table(conn)
+    return conn.execute(text('SELECT MAX(version) FROM schema_version')).scalar() or 0
+
+
+def upgrade(engine=None, target=None):
+    engine = engine or db.engine
+    applied = []
+    with engine.begin() as conn:
+        version = current_version(conn)
+    for number, description, func in MIGRATIONS:
+        if number <= version or (target is not None and number > target):
+            continue
+        with engine.begin() as conn:
+            func(conn)
+            conn.execute(
+                text('INSERT INTO schema_version (version, description, applied_at) VALUES (:v, :d, :t)'),
+                {'v': number, 'd': description, 't': datetime.now()}
+            )
+        applied.append((number, description))
+    return applied
+
+
+@migration(1, 'baseline tables')
+def _baseline(conn):
+    from . import models
+    db.metadata.create_all(conn)
+
+
+@migration(2, 'parks.daily_capacity')
+def _park_daily_capacity(conn):
+    columns = {c['name'] for c in inspect(conn).get_columns('parks')}
+    if 'daily_capacity' not in columns:
+        conn.execute(text('ALTER TABLE parks ADD COLUMN daily_capacity INTEGER NOT NULL DEFAULT 500'))
+
+
+@migration(3, 'indexes for hot queries')
+def _hot_query_indexes(conn):
+    from .models import Booking, Message, User
+    for table in (Booking.__table__, Message.__table__, User.__table__):
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
+@migration(4, 'users.password widened to 255')
+def _widen_password(conn):
+    ## modern PBKDF2/scrypt hashes are longer than 100 chars; SQLite does not enforce length ##
+    if conn.dialect.name == 'mysql':
+        conn.execute(text('ALTER TABLE users MODIFY password VARCHAR(255) NOT NULL'))
+
+
+@migration(5, 'parks.updated_at')
+def _park_updated_at(conn):
+    columns = {c['name'] for c in inspect(conn).get_columns('parks')}
+    if 'updated_at' not in columns:
+        conn.execute(text('ALTER TABLE parks ADD COLUMN updated_at DATETIME'))
+        conn.execute(text('UPDATE parks SET updated_at = :now'), {'now': datetime.utcnow()})
+
+
+@migration(6, 'full-text index on messages')
+def _message_search_index(conn):
+    from .search import ensure_index
+    ensure_index(conn)
+
+
+@migration(7, 'indexes for admin list sorting')
+def _admin_sort_indexes(conn):
+    from .models import Booking, Park
+    for table in (Booking.__table__, Park.__table__):
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
+@migration(8, 'park_daily_stats materialized totals')
+def _park_daily_stats(conn):
+    from .models import ParkDailyStats
+    from .daily_stats import rebuild
+    ParkDailyStats.__table__.create(conn, checkfirst=True)
+    rebuild(conn)
+
+
+@migration(9, 'structured pricing')
+def _structured_pricing(conn):
+    from .models import PriceModifier, PriceTier
+    from .pricing import parse_display_price
+    columns = {c['name'] for c in inspect(conn).get_columns('parks')}
+    if 'base_price_cents' not in columns:
+        conn.execute(text('ALTER TABLE parks ADD COLUMN base_price_cents INTEGER NOT NULL DEFAULT 4999'))
+        ## the display strings are parsed once here, never per booking ##
+        for park_id, price in conn.execute(text('SELECT park_id, price FROM parks')).all():
+            cents = parse_display_price(price)
+            if cents is not None:
+                conn.execute(text('UPDATE parks SET base_price_cents = :c WHERE park_id = :p'),
+                             {'c': cents, 'p': park_id})
+    PriceTier.__table__.create(conn, checkfirst=True)
+    PriceModifier.__table__.create(conn, checkfirst=True)
+
+
+@migration(10, 'park_day_inventory backfilled from bookings')
+def _backfill_inventory(conn):
+    ## rows only existed for days sold through reserve_tickets(); older bookings were never counted ##
+    from .models import ParkDayInventory
+    from .capacity import rebuild_inventory
+    from .daily_stats import rebuild
+    ParkDayInventory.__table__.create(conn, checkfirst=True)
+    rebuild(conn)
+    rebuild_inventory(conn)
+
+
+## EXPLAIN-based plan check ##
+# Registered hot queries must be answered through an index. On SQLite a
+# plain "SCAN <table>" row in EXPLAIN QUERY PLAN is a full table scan; on
+# MySQL it is an EXPLAIN row with type = ALL.
+
+HOT_QUERIES = {}
+
+
+def hot_query(name):
+    def decorator(func):
+        HOT_QUERIES[name] = func
+        return func
+    return decorator
+
+
+@hot_query('profile bookings by user')
+def _q_bookings_by_user():
+    from .models import Booking
+    return (db.select(Booking.booking_id).where(Booking.user_id == 1)
+            .order_by(Booking.date.desc(), Booking.booking_id.desc()).limit(21))
+
+
+@hot_query('bookings by park and day')
+def _q_bookings_by_park_day():
+    from .models import Booking
+    return (db.select(db.func.sum(Booking.num_tickets))
+            .where(Booking.park_id == 1, Booking.date >= '2026-01-01', Booking.date < '2026-01-02'))
+
+
+@hot_query('park availability range')
+def _q_park_availability():
+    from .models import ParkDayInventory
+    return (db.select(ParkDayInventory.tickets_sold)
+            .where(ParkDayInventory.park_id == 1,
+                   ParkDayInventory.day >= '2026-01-01', ParkDayInventory.day <= '2026-01-31'))
+
+
+@hot_query('message inbox newest first')
+def _q_messages_newest():
+    from .models import Message
+    return db.select(Message.message_id).order_by(Message.created_at.desc()).limit(20)
+
+
+@hot_query('admin bookings newest first')
+def _q_admin_bookings_newest():
+    from .models import Booking
+    return (db.select(Booking.booking_id)
+            .where(db.or_(Booking.date < '2026-01-01',
+                          db.and_(Booking.date == '2026-01-01', Booking.booking_id < 100)))
+            .order_by(Booking.date.desc(), Booking.booking_id.desc()).limit(20))
+
+
+@hot_query('users by role')
+def _q_users_by_role():
+    from .models import User
+    return db.select(User.user_id).where(User.role_id == 1)
+
+
+@hot_query('login by email')
+def _q_user_by_email():
+    from .models import User
+    return db.select(User.user_id).where(User.email == 'someone@example.com')
+
+
+@hot_query('park by slug')
+def _q_park_by_slug():
+    from .models import Park
+    return db.select(Park.park_id).where(Park.slug == 'park-1-dublin')
+
+
+def explain(conn, stmt):
+    compiled = stmt.compile(dialect=conn.dialect)
+    params = compiled.construct_params()
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+    if conn.dialect.name == 'sqlite':
+        return [tuple(row) for row in conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + str(compiled), params)]
+    return [dict(row._mapping) for row in conn.exec_driver_sql('EXPLAIN ' + str(compiled), params)]
+
+
+def is_full_scan(conn, plan):
+    if conn.dialect.name == 'sqlite':
+        for row in plan:
+            detail = str(row[-1])
+            if detail.startswith('SCAN ') and 'INDEX' not in detail:
+                return True
+        return False
+    return any(str(row.get('type', '')).upper() == 'ALL' for row in plan)
+
+
+def check_plans(engine=None):
+    engine = engine or db.engine
+    failures = {}
+    with engine.connect() as conn:
+        for name, build in HOT_QUERIES.items():
+            plan = explain(conn, build())
+            if is_full_scan(conn, plan):
+                failures[name] = plan
+    return failures
+
+
+## CLI: flask schema ... ##
+@click.group('schema')
+def schema_cli():
+    """Schema migrations and query plan checks."""
+
+
+@schema_cli.command('upgrade')
+@click.option('--to', 'target', type=int, default=None, help='Stop at this version.')
+@with_appcontext
+def upgrade_command(target):
+    """Apply pending migrations."""
+    applied = upgrade(target=target)
+    for number, description in applied:
+        click.echo(f'applied {number}: {description}')
+    if not applied:
+        click.echo('schema is up to date')
+
+
+@schema_cli.command('current')
+@with_appcontext
+def current_command():
+    """Show the applied schema version."""
+    with db.engine.begin() as conn:
+        version = current_version(conn)
+    latest = MIGRATIONS[-1][0] if MIGRATIONS else 0
+    click.echo(f'current version {version} (latest {latest})')
+
+
+@schema_cli.command('check-plans')
+@with_appcontext
+def check_plans_command():
+    """Fail if a registered hot query needs a full table scan."""
+    failures = check_plans()
+    for name in HOT_QUERIES:
+        click.echo(f"{'FULL SCAN' if name in failures else 'ok':9} {name}")
+        for row in failures.get(name, []):
+            click.echo(f'          {row}')
+    if failures:
+        raise SystemExit(1)
@@ -1,10 +1,8 @@
-from wtforms.validators import DataRequired, Email 
-from werkzeug.security import generate_password_hash
-from flask_login import UserMixin, current_user
-from flask_admin.contrib.sqla import ModelView
-from flask_admin import AdminIndexView
-from flask import redirect, url_for, flash
+from datetime import datetime
+from flask_login import UserMixin
+from sqlalchemy import event
 from . import db
+from . import search
 
 class User(UserMixin,db.Model):
     __tablename__ = 'users'
@@ -12,8 +10,8 @@ class User(UserMixin,db.Model):
     name = db.Column(db.String(100), nullable=False)
     last_name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(100), unique=True) 
-    password = db.Column(db.String(100), nullable=False) 
-    role_id = db.Column(db.Integer, db.ForeignKey('roles.role_id'))
+    password = db.Column(db.String(255), nullable=False) 
+    role_id = db.Column(db.Integer, db.ForeignKey('roles.role_id'), index=True)
     bookings = db.relationship('Booking', backref='user')
     role = db.relationship('Role', back_populates='users')
 
@@ -60,7 +58,7 @@ class Role(db.Model):
 class Park(db.Model):
     __tablename__ = 'parks'
     park_id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(150), nullable=False)
+    name = db.Column(db.String(150), nullable=False, index=True)
     location = db.Column(db.String(150), nullable=False)
     description = db.Column(db.String(100), nullable=False)
     image_path = db.Column(db.String(200), default='images/parks/default.jpg')
@@ -71,8 +69,11 @@ class Park(db.Model):
     difficulty = db.Column(db.String(50), default='Moderate')
     min_age = db.Column(db.Integer, default=12)
     price = db.Column(db.String(50), default='Starting at $49.99')
+    base_price_cents = db.Column(db.Integer, nullable=False, default=4999)
     wait_time = db.Column(db.String(50), default='30-60 minutes')
     height_requirement = db.Column(db.String(50), default='48" (1.2m)')
+    daily_capacity = db.Column(db.Integer, nullable=False, default=500)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     bookings = db.relationship('Booking', backref='park')
     
 
@@ -91,8 +92,9 @@ class Park(db.Model):
             'min_age': self.min_age,
             'price':self.price, 
             'wait_time': self.wait_time,
-            'height_requirement': self.height_requirement
- 
+            'height_requirement': self.height_requirement,
+            'daily_capacity': self.daily_capacity,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
     def __str__(self):
@@ -101,6 +103,11 @@ class Park(db.Model):
 
 class Booking(db.Model):
     __tablename__ = 'bookings'
+    __table_args__ = (
+        db.Index('ix_bookings_user_id_date', 'user_id', 'date'),
+        db.Index('ix_bookings_park_id_date', 'park_id', 'date'),
+        db.Index('ix_bookings_date', 'date'),
+    )
     booking_id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=False)
     park_id = db.Column(db.Integer, db.ForeignKey('parks.park_id'), nullable=False)
@@ -120,6 +127,79 @@ class Booking(db.Model):
     
     def __repr__(self):
         return f''
+
+
+class ParkDayInventory(db.Model):
+    __tablename__ = 'park_day_inventory'
+    park_id = db.Column(db.Integer, db.ForeignKey('parks.park_id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    capacity = db.Column(db.Integer, nullable=False)
+    tickets_sold = db.Column(db.Integer, nullable=False, default=0)
+
+    def to_json(self):
+        return {
+            'park_id': self.park_id,
+            'day': self.day.isoformat(),
+            'capacity': self.capacity,
+            'tickets_sold': self.tickets_sold,
+            'tickets_remaining': max(self.capacity - self.tickets_sold, 0)
+        }
+
+
+class PriceTier(db.Model):
+    """Per-ticket price for parties of at least min_tickets."""
+    __tablename__ = 'price_tiers'
+    __table_args__ = (
+        db.UniqueConstraint('park_id', 'min_tickets', name='uq_price_tiers_park_min_tickets'),
+    )
+    tier_id = db.Column(db.Integer, primary_key=True)
+    park_id = db.Column(db.Integer, db.ForeignKey('parks.park_id'), nullable=False)
+    min_tickets = db.Column(db.Integer, nullable=False)
+    unit_price_cents = db.Column(db.Integer, nullable=False)
+    park = db.relationship('Park')
+
+    def __str__(self):
+        return f'{self.min_tickets}+ tickets'
+
+
+class PriceModifier(db.Model):
+    """Percentage added to (or, if negative, taken off) prices on matching days."""
+    __tablename__ = 'price_modifiers'
+    modifier_id = db.Column(db.Integer, primary_key=True)
+    park_id = db.Column(db.Integer, db.ForeignKey('parks.park_id'), nullable=True)  # NULL: every park
+    name = db.Column(db.String(100), nullable=False)
+    starts_on = db.Column(db.Date, nullable=True)
+    ends_on = db.Column(db.Date, nullable=True)
+    weekdays = db.Column(db.String(7), nullable=True)  # e.g. '56' = Saturday and Sunday, NULL: every day
+    percent = db.Column(db.Integer, nullable=False)
+    park = db.relationship('Park')
+
+    def applies_on(self, day):
+        return ((self.starts_on is None or day >= self.starts_on)
+                and (self.ends_on is None or day <= self.ends_on)
+                and (not self.weekdays or str(day.weekday()) in self.weekdays))
+
+    def __str__(self):
+        return self.name
+
+
+class ParkDailyStats(db.Model):
+    __tablename__ = 'park_daily_stats'
+    park_id = db.Column(db.Integer, db.ForeignKey('parks.park_id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    tickets_sold = db.Column(db.Integer, nullable=False, default=0)
+    booking_count = db.Column(db.Integer, nullable=False, default=0)
+    health_safety_acks = db.Column(db.Integer, nullable=False, default=0)
+
+    def to_json(self):
+        return {
+            'park_id': self.park_id,
+            'day': self.day.isoformat(),
+            'tickets_sold': self.tickets_sold,
+            'booking_count': self.booking_count,
+            'health_safety_acks': self.health_safety_acks
+        }
+
     
 class Message(db.Model):
     __tablename__ = 'messages'
@@ -127,7 +207,7 @@ class Message(db.Model):
     name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(100), nullable=False)
     message = db.Column(db.Text, nullable=False)
-    created_at = db.Column(db.DateTime, default=db.func.now())
+    created_at = db.Column(db.DateTime, default=db.func.now(), index=True)
 
     def to_json(self):
         return {
@@ -138,109 +218,6 @@ class Message(db.Model):
             'created_at': self.created_at.isoformat()
         }
 
-
-class AppModelView(ModelView):
-    def is_accessible(self):
-        return (current_user.is_authenticated and current_user.has_role('admin'))
-    
-    def inaccessible_callback(self, name, **kwargs):
-        flash('ADMIN ACCESS ONLY! Please login with Admin credentials!')
-        return redirect(url_for("login.login"))
-
-class AppIndexView(AdminIndexView):
-    def is_accessible(self):
-        return (current_user.is_authenticated and current_user.has_role('admin'))
-    
-    def inaccessible_callback(self, name, **kwargs):
-        flash('ADMIN ACCESS ONLY! Please login with Admin credentials!')
-        return redirect(url_for("login.login"))
-    
-
-class UserView(AppModelView):
-
-    column_list = ('name', 'last_name', 'email', 'password', 'role')
-    column_labels = dict(name='Name', last_name= 'Last Name', email='Email', password='Password', role='Role')
-    column_filters = ('name', 'email')
-    column_formatters = dict(password=lambda v, c, m, p: '*****')
-    column_searchable_list = ('name', 'email')
-    column_sortable_list = ()
-    form_columns = ('name', 'last_name', 'email', 'password', 'role')
-    form_args = dict(
-        name=dict(validators=[DataRequired()]),
-        last_name=dict(validators=[DataRequired()]),
-        email=dict(validators=[DataRequired()]),
-        password=dict(validators=[DataRequired()]),
-        role=dict(validators=[DataRequired()])
-    )
-
-    def on_model_change(self, form, model, is_created):
-        model.password = generate_password_hash(model.password, method='pbkdf2:sha256')
-
-
-class RoleView(AppModelView):
-
-    column_list = ('name',)
-    column_labels = dict(name='Name')
-    column_filters = ('name',)
-    column_searchable_list = ('name',)
-    column_sortable_list = ()
-    form_columns = ('name',)
-    form_args = dict(
-        name=dict(validators=[DataRequired()])
-    )
-
-class BookingView(AppModelView):
-  
-    column_list = ('park','date', 'num_tickets', 'health_safety', 'user')
-    column_labels = dict(park='Park', date='Date', num_tickets='Number of Tickets', health_safety='Health & Safety', user='User')
-    column_filters = ('park', 'user')
-    column_searchable_list = ('park.name', 'user.name')
-    column_sortable_list = ()
-    form_columns = ('park', 'date', 'num_tickets', 'health_safety', 'user')
-    form_args = dict(
-        park=dict(validators=[DataRequired()]),
-        user=dict(validators=[DataRequired()]),
-        date=dict(validators=[DataRequired()]),
-        num_tickets=dict(validators=[DataRequired()]),
-        health_safety=dict(validators=[DataRequired()])
-    )
-
-class ParkView(AppModelView):
-  
-    column_list = ('name', 'location', 'description', 'image_path', 'short_description', 'slug', 'folder', 'hours','min_age', 'price','wait_time', 'height_requirement')
-    column_labels = dict(name='Name', location='Location', description='Description', image_path='Image Path', short_description='Short Description', slug='Slug', folder='Folder', hours='Hours', min_age='Min Age', price='Price', wait_time='Wait Time', height_requirement='Height Requirement')
-    column_filters = ('name', 'location')
-    column_formatters = dict(description=lambda v, c, m, p: m.description[:50] + '...')
-    column_searchable_list = ('name', 'location')
-    column_sortable_list = ()
-    form_columns = ('name', 'location', 'description', 'image_path', 'short_description', 'slug', 'folder', 'hours','min_age', 'price','wait_time', 'height_requirement')
-    form_args = dict(
-        name=dict(validators=[DataRequired()]),
-        location=dict(validators=[DataRequired()]),
-        description=dict(validators=[DataRequired()]),
-        image_path=dict(validators=[DataRequired()]),
-        short_description=dict(validators=[DataRequired()]),
-        slug=dict(validators=[DataRequired()]),
-        folder=dict(validators=[DataRequired()]),
-        hours=dict(validators=[DataRequired()]),
-        min_age=dict(validators=[DataRequired()]),
-        price=dict(validators=[DataRequired()]),
-        wait_time=dict(validators=[DataRequired()]),
-        height_requirement=dict(validators=[DataRequired()]),
-    )
-
-class MessageView(AppModelView):
-   
-    column_list = ('name', 'email', 'message', 'created_at')
-    column_labels = dict(name='Name', email='Email', message='Message', created_at='Create Date')
-    column_filters = ('email',)
-    column_searchable_list = ('name', 'email', 'message')
-    column_sortable_list = ()
-    column_default_sort = ('created_at', True)
-    form_columns = ('name', 'email', 'message', 'created_at')
-    form_args = dict(
-        name=dict(validators=[DataRequired()]),
-        email=dict(validators=[DataRequired()]),
-        message=dict(validators=[DataRequired()])
-    )
-
+## Full-text index (SQLite FTS5 / MySQL FULLTEXT) follows the messages table, see search.py ##
+event.listen(Message.__table__, 'after_create', search.after_messages_create)
+event.listen(Message.__table__, 'before_drop', search.before_messages_drop)
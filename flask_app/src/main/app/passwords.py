@@ -0,0 +1,93 @@
+import atexit
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash, DEFAULT_PBKDF2_ITERATIONS
+
+## Password hashing service ##
+# PBKDF2/scrypt cost is pure CPU held under the GIL, so one login burst can
+# stall every other request in the worker. Hashing parameters come from the
+# config class (PASSWORD_HASH_METHOD) and, when PASSWORD_HASH_WORKERS > 0,
+# hashing and verification run in a small process pool while the request
+# thread just waits on the future. PASSWORD_HASH_MAX_PENDING bounds how many
+# requests can queue work on the pool at once; a request that cannot get a
+# slot within PASSWORD_HASH_TIMEOUT fails instead of waiting forever.
+
+_pool = None
+_pool_size = 0
+_pool_lock = threading.Lock()
+_pending = None
+
+
+def _get_pool():
+    global _pool, _pool_size, _pending
+    workers = current_app.config.get('PASSWORD_HASH_WORKERS', 0)
+    if workers <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None or _pool_size != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=workers)
+            _pool_size = workers
+            _pending = threading.BoundedSemaphore(current_app.config.get('PASSWORD_HASH_MAX_PENDING', workers * 8))
+        return _pool
+
+
+def _run(func, *args):
+    pool = _get_pool()
+    if pool is None:
+        return func(*args)
+    timeout = current_app.config.get('PASSWORD_HASH_TIMEOUT', 30)
+    pending = _pending
+    if not pending.acquire(timeout=timeout):
+        raise TimeoutError(f'password hashing queue still full after {timeout}s')
+    try:
+        return pool.submit(func, *args).result(timeout=timeout)
+    finally:
+        pending.release()
+
+
+@atexit.register
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+            _pool = None
+
+
+def _method_params(method):
+    """(algorithm, cost factors) with werkzeug's defaults filled in, as it writes them into the hash."""
+    parts = method.split(':')
+    if parts[0] == 'pbkdf2':
+        hash_name = parts[1] if len(parts) > 1 else 'sha256'
+        iterations = int(parts[2]) if len(parts) > 2 else DEFAULT_PBKDF2_ITERATIONS
+        return f'pbkdf2:{hash_name}', (iterations,)
+    if parts[0] == 'scrypt':
+        defaults = [32768, 8, 1]
+        return 'scrypt', tuple(int(part) for part in parts[1:]) + tuple(defaults[len(parts) - 1:])
+    return method, ()
+
+
+def hash_password(password):
+    return _run(generate_password_hash, password, current_app.config['PASSWORD_HASH_METHOD'])
+
+
+def verify_password(stored_hash, password):
+    if not stored_hash or password is None:
+        return False
+    return _run(check_password_hash, stored_hash, password)
+
+
+def needs_rehash(stored_hash):
+    """
+    True when the configured method is a different algorithm, or the same one
+    with a higher cost than the stored hash. Never trades a stored hash for a
+    cheaper one (e.g. a 1,000,000-iteration PBKDF2 under a 600,000 setting).
+    """
+    stored, stored_cost = _method_params(stored_hash.split('$', 1)[0])
+    wanted, wanted_cost = _method_params(current_app.config['PASSWORD_HASH_METHOD'])
+    if stored != wanted:
+        return True
+    return any(want > have for want, have in zip(wanted_cost, stored_cost))
@@ -0,0 +1,93 @@
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+from . import db
+from .metrics import registry, Counter, Gauge, Histogram
+
+## Connection pool sizing and health metrics ##
+# Pool sizes come from config (see pool_options() in config.py). Engines that
+# use a queue pool get TimedQueuePool, which times how long each checkout
+# waits for a free connection and counts checkout timeouts. Invalidations
+# (connections dropped after an error or a failed pre-ping) are counted
+# through pool events, and size / checked-out / overflow are sampled on
+# every /metrics scrape. Series are labelled by app ('web', or 'admin' for
+# the admin-only app a lazy ADMIN_MOUNT builds, which has engines of its
+# own) and bind ('default', 'replica'). The admin app's pools are capped at
+# ADMIN_POOL_SIZE connections with no overflow; production sizes the web
+# pools with that share of max_connections set aside (see config.py).
+
+WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+POOL_WAIT = registry.register(Histogram(
+    'db_pool_checkout_wait_seconds', 'Time spent waiting for a pooled connection.', ('app', 'bind'), WAIT_BUCKETS))
+POOL_TIMEOUTS = registry.register(Counter(
+    'db_pool_checkout_timeouts_total', 'Checkouts that gave up after pool_timeout.', ('app', 'bind')))
+POOL_INVALIDATIONS = registry.register(Counter(
+    'db_pool_invalidations_total', 'Pooled connections invalidated.', ('app', 'bind', 'kind')))
+POOL_SIZE = registry.register(Gauge(
+    'db_pool_size', 'Configured pool size.', ('app', 'bind')))
+POOL_CHECKED_OUT = registry.register(Gauge(
+    'db_pool_checked_out', 'Connections currently checked out.', ('app', 'bind')))
+POOL_OVERFLOW = registry.register(Gauge(
+    'db_pool_overflow', 'Connections open beyond pool_size (negative while the pool warms up).', ('app', 'bind')))
+
+_engines = {}
+
+
+class TimedQueuePool(QueuePool):
+    metrics_labels = ('web', 'default')
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            POOL_TIMEOUTS.inc(*self.metrics_labels)
+            raise
+        finally:
+            POOL_WAIT.observe(time.perf_counter() - started, *self.metrics_labels)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics_labels = self.metrics_labels
+        return pool
+
+
+def apply_pool_class(app, admin_only=False):
+    options = app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {})
+    if 'pool_size' not in options:
+        return
+    if admin_only:
+        options = dict(options, pool_size=app.config.get('ADMIN_POOL_SIZE', 2), max_overflow=0)
+    if 'poolclass' not in options:
+        options = dict(options, poolclass=TimedQueuePool)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+
+def _collect():
+    for labels, engine in list(_engines.items()):
+        pool = engine.pool
+        if isinstance(pool, QueuePool):
+            POOL_SIZE.set(pool.size(), *labels)
+            POOL_CHECKED_OUT.set(pool.checkedout(), *labels)
+            POOL_OVERFLOW.set(pool.overflow(), *labels)
+
+
+def instrument(engine, bind, app_label='web'):
+    labels = (app_label, bind)
+    engine.pool.metrics_labels = labels
+    _engines[labels] = engine
+    event.listen(engine, 'invalidate',
+                 lambda dbapi_conn, record, e: POOL_INVALIDATIONS.inc(*labels, 'hard'))
+    event.listen(engine, 'soft_invalidate',
+                 lambda dbapi_conn, record, e: POOL_INVALIDATIONS.inc(*labels, 'soft'))
+
+
+def init_app(app, app_label='web'):
+    with app.app_context():
+        for key, engine in db.engines.items():
+            instrument(engine, key or 'default', app_label)
+
+
+registry.add_collector(_collect)
@@ -0,0 +1,95 @@
+import re
+from datetime import timedelta
+from . import db
+from .models import Park, PriceModifier, PriceTier
+
+try:
+    import numpy as np
+except ImportError:  # in requirements.txt; without it reports fall back to plain Python loops
+    np = None
+
+## Structured ticket pricing ##
+# A booking costs num_tickets x the unit price for its park and party size
+# (the park's base_price_cents, or the largest PriceTier the party reaches),
+# plus the sum of the percentages of every PriceModifier covering that park
+# and day, rounded half up to the cent. Park.price stays as display text.
+# PriceBook flattens all of it for a date range into two small tables,
+# unit[park][tickets] and percent[park][day], so pricing a whole column of
+# bookings is two lookups and a multiply (see revenue.py).
+
+PRICE_RE = re.compile(r'(\d+)(?:\.(\d{1,2}))?')
+
+
+def parse_display_price(text, default=None):
+    """Cents from a display string such as 'Starting at $39.99'."""
+    match = PRICE_RE.search(text or '')
+    if match is None:
+        return default
+    return int(match.group(1)) * 100 + int((match.group(2) or '0').ljust(2, '0'))
+
+
+def apply_percent(cents, percent):
+    return (cents * (100 + percent) + 50) // 100
+
+
+def format_cents(cents):
+    sign = '-' if cents < 0 else ''
+    return f'{sign}{abs(cents) // 100:,}.{abs(cents) % 100:02d}'
+
+
+class PriceBook:
+
+    def __init__(self, base_prices, tiers, modifiers, start, end):
+        """
+        base_prices: {park_id: cents}; tiers: [(park_id, min_tickets, unit_cents)];
+        modifiers: PriceModifier rows (or anything with park_id, percent and applies_on()).
+        """
+        self.start = start
+        self.end = end
+        self.days = (end - start).days + 1
+        self.park_ids = sorted(base_prices)
+        self.index = {park_id: i for i, park_id in enumerate(self.park_ids)}
+        self.max_tier = max((min_tickets for _, min_tickets, _ in tiers), default=1)
+
+        self.unit = [[base_prices[park_id]] * (self.max_tier + 1) for park_id in self.park_ids]
+        for park_id, min_tickets, cents in sorted(tiers, key=lambda tier: tier[1]):
+            if park_id in self.index:
+                row = self.unit[self.index[park_id]]
+                row[min_tickets:] = [cents] * (self.max_tier + 1 - min_tickets)
+
+        self.percent = [[0] * self.days for _ in self.park_ids]
+        for modifier in modifiers:
+            if modifier.park_id is None:
+                rows = [self.percent[i] for i in range(len(self.park_ids))]
+            elif modifier.park_id in self.index:
+                rows = [self.percent[self.index[modifier.park_id]]]
+            else:
+                continue
+            for offset in range(self.days):
+                if modifier.applies_on(start + timedelta(days=offset)):
+                    for row in rows:
+                        row[offset] += modifier.percent
+        self._arrays = None
+
+    @classmethod
+    def load(cls, start, end):
+        base_prices = dict(db.session.execute(db.select(Park.park_id, Park.base_price_cents)).all())
+        tiers = [tuple(row) for row in db.session.execute(
+            db.select(PriceTier.park_id, PriceTier.min_tickets, PriceTier.unit_price_cents)).all()]
+        modifiers = PriceModifier.query.all()
+        return cls(base_prices, tiers, modifiers, start, end)
+
+    def price(self, park_index, day_offset, num_tickets):
+        """Cents for one booking, by park index and day offset from start."""
+        unit = self.unit[park_index][min(num_tickets, self.max_tier)]
+        return apply_percent(unit * num_tickets, self.percent[park_index][day_offset])
+
+    def quote(self, park_id, day, num_tickets):
+        return self.price(self.index[park_id], (day - self.start).days, num_tickets)
+
+    def arrays(self):
+        """(unit, percent) as int64 NumPy arrays, built on first use."""
+        if self._arrays is None:
+            self._arrays = (np.array(self.unit, dtype=np.int64).reshape(len(self.park_ids), self.max_tier + 1),
+                            np.array(self.percent, dtype=np.int64).reshape(len(self.park_ids), self.days))
+        return self._arrays
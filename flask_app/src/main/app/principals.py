@@ -0,0 +1,92 @@
+from flask import current_app
+from flask_login import UserMixin
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from . import db
+from .cache import TTLCache
+
+## Authenticated-principal cache ##
+# Flask-Login calls the user loader on every authenticated request and the
+# admin views then ask has_role(), which lazy-loads Role. Instead the loader
+# returns a small read-only principal (id, names, role names) cached per
+# worker for PRINCIPAL_CACHE_TTL seconds, so a logged-in page view needs no
+# user/role queries. A committed User or Role change (admin views or any
+# other writer) evicts it in this worker after the commit, so a concurrent
+# request cannot re-cache the old row; other workers catch up when the TTL
+# expires.
+
+principal_cache = TTLCache(ttl=60)
+
+
+class CachedPrincipal(UserMixin):
+
+    def __init__(self, user_id, name, last_name, email, role_names):
+        self.user_id = user_id
+        self.name = name
+        self.last_name = last_name
+        self.email = email
+        self.role_names = frozenset(role_names)
+
+    def get_id(self):
+        return str(self.user_id)
+
+    def has_role(self, role_name: str) -> bool:
+        return role_name in self.role_names
+
+    def __str__(self):
+        return self.name + ' ' + self.last_name
+
+
+def _fetch_principal(user_id):
+    from .models import User, Role
+    row = db.session.execute(
+        db.select(User.user_id, User.name, User.last_name, User.email, Role.name.label('role_name'))
+        .outerjoin(Role, User.role_id == Role.role_id)
+        .where(User.user_id == user_id)
+    ).first()
+    if row is None:
+        return None
+    roles = [row.role_name] if row.role_name else []
+    return CachedPrincipal(row.user_id, row.name, row.last_name, row.email, roles)
+
+
+def load_principal(user_id):
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        principal = _fetch_principal(user_id)
+        if principal is not None:
+            principal_cache.set(user_id, principal, ttl=current_app.config.get('PRINCIPAL_CACHE_TTL', 60))
+    return principal
+
+
+def invalidate_principal(user_id=None):
+    principal_cache.invalidate(user_id)
+
+
+## Evict after any committed change to a User or Role ##
+@event.listens_for(Session, "after_flush")
+def _track_principal_changes(session, flush_context):
+    from .models import User, Role
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Role):
+            session.info['principals_dirty'] = None
+            return
+        if isinstance(obj, User) and obj.user_id is not None:
+            dirty = session.info.setdefault('principals_dirty', set())
+            if dirty is not None:
+                dirty.add(obj.user_id)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    if 'principals_dirty' not in session.info:
+        return
+    dirty = session.info.pop('principals_dirty')
+    if dirty is None:
+        invalidate_principal()
+    else:
+        for user_id in dirty:
+            invalidate_principal(user_id)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session):
+    session.info.pop('principals_dirty', None)
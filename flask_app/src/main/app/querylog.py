@@ -0,0 +1,150 @@
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+## Per-request SQL counting and N+1 detection ##
+# Cursor hooks count and time every statement into the active recorders: the
+# one opened for the current request and any opened by record_queries()
+# (tests, benchmarks, shell). At teardown a request whose statements repeat
+# the same shape QUERY_N_PLUS_ONE_THRESHOLD+ times (same SQL, different
+# literals - e.g. one SELECT parks per booking row) logs a likely-N+1
+# warning; any statement slower than QUERY_SLOW_MS is logged as it finishes.
+# QUERY_COUNT_HEADER adds X-Query-Count / X-Query-Time to responses.
+# These are the app's only cursor hooks: other per-query consumers (the
+# metrics DB histograms) subscribe with on_query() instead of timing every
+# statement a second time.
+
+_NUMBER_RE = re.compile(r'\b\d+(\.\d+)?\b')
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_IN_LIST_RE = re.compile(r'\(\s*\?(\s*,\s*\?)*\s*\)|\(\s*%\(\w+\)s(\s*,\s*%\(\w+\)s)*\s*\)')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def statement_shape(statement):
+    shape = _STRING_RE.sub('?', statement)
+    shape = _NUMBER_RE.sub('?', shape)
+    shape = _IN_LIST_RE.sub('(?)', shape)
+    return _SPACE_RE.sub(' ', shape).strip()
+
+
+class QueryRecorder:
+
+    def __init__(self):
+        self.queries = []
+
+    def add(self, statement, duration):
+        self.queries.append((statement, duration))
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def total_time(self):
+        return sum(duration for _, duration in self.queries)
+
+    def shapes(self):
+        return Counter(statement_shape(statement) for statement, _ in self.queries)
+
+    def repeated(self, threshold):
+        return [(shape, n) for shape, n in self.shapes().most_common() if n >= threshold]
+
+    def report(self):
+        lines = [f'{self.count} queries, {self.total_time * 1000:.1f} ms']
+        lines += [f'  {n} x {shape}' for shape, n in self.shapes().most_common()]
+        return '\n'.join(lines)
+
+
+_local = threading.local()
+_observers = []
+
+
+def on_query(func):
+    """Call func(statement, duration) after every statement."""
+    _observers.append(func)
+    return func
+
+
+def _active():
+    recorders = list(getattr(_local, 'recorders', ()))
+    if has_request_context():
+        recorder = g.get('_query_recorder')
+        if recorder is not None:
+            recorders.append(recorder)
+    return recorders
+
+
+@contextmanager
+def record_queries():
+    recorder = QueryRecorder()
+    stack = _local.__dict__.setdefault('recorders', [])
+    stack.append(recorder)
+    try:
+        yield recorder
+    finally:
+        stack.remove(recorder)
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _query_started(conn, cursor, statement, parameters, context, executemany):
+    context._querylog_start = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _query_finished(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_querylog_start', None)
+    if started is None:
+        return
+    duration = time.perf_counter() - started
+    for recorder in _active():
+        recorder.add(statement, duration)
+    for observe in _observers:
+        observe(statement, duration)
+
+    slow_ms = _config('QUERY_SLOW_MS')
+    if slow_ms is not None and duration * 1000 >= slow_ms:
+        where = request.endpoint if has_request_context() else '-'
+        logger.warning('Slow query (%.1f ms) in %s: %s', duration * 1000, where, statement_shape(statement))
+
+
+def _config(key):
+    try:
+        return current_app.config.get(key)
+    except RuntimeError:
+        return None
+
+
+def _before_request():
+    g._query_recorder = QueryRecorder()
+
+
+def _after_request(response):
+    recorder = g.get('_query_recorder')
+    if recorder is not None and current_app.config.get('QUERY_COUNT_HEADER'):
+        response.headers['X-Query-Count'] = str(recorder.count)
+        response.headers['X-Query-Time'] = f'{recorder.total_time * 1000:.2f}ms'
+    return response
+
+
+def _teardown_request(exc):
+    recorder = g.pop('_query_recorder', None)
+    threshold = current_app.config.get('QUERY_N_PLUS_ONE_THRESHOLD')
+    if recorder is None or not threshold:
+        return
+    for shape, n in recorder.repeated(threshold):
+        logger.warning('Possible N+1 in %s: %d x %s', request.endpoint, n, shape)
+
+
+def init_app(app):
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
@@ -0,0 +1,209 @@
+import csv
+import sys
+import time
+from array import array
+from datetime import datetime, timedelta
+
+import click
+from sqlalchemy import Date, Integer, cast
+from flask import current_app
+from flask.cli import with_appcontext
+from . import db
+from .models import Booking, Park
+from .pricing import PriceBook, format_cents, np
+
+## Revenue reporting ##
+# Bookings are read as bare (park_id, day offset, num_tickets) columns: a
+# Query.with_entities() statement on a streamed cursor, fetched straight
+# from the DBAPI in chunks of REVENUE_CHUNK_SIZE rows, with the day computed
+# in SQL. No ORM objects, Rows or datetimes are built and at most one chunk
+# is in memory. Each chunk is priced and summed into dense per-(park, day)
+# accumulators sized parks x days, so memory depends on the report range,
+# not on the number of bookings. With NumPy the chunk is handled as arrays
+# (PriceBook table lookups, then bincount into the accumulators); without
+# it the same arithmetic runs as a plain loop. Week and park totals are
+# rolled up from the day totals afterwards.
+
+GRAINS = ('day', 'week', 'park')
+
+
+def day_offset(column, start, dialect):
+    """SQL for whole days from start to column's date, so no datetimes are built per row."""
+    if dialect == 'sqlite':
+        # julianday() of midnight on start; truncating the difference gives the day
+        return cast(db.func.julianday(column) - (start.toordinal() + 1721424.5), Integer)
+    if dialect == 'mysql':
+        return db.func.datediff(column, start)
+    return cast(column, Date) - start
+
+
+def booking_chunks(start, end, chunk_size):
+    """Columns (park_ids, day offsets from start, num_tickets) of the bookings from start to end inclusive."""
+    conn = db.session.connection()
+    query = Booking.query.with_entities(
+        Booking.park_id, day_offset(Booking.date, start, conn.dialect.name), Booking.num_tickets)
+    span = booking_date_range()
+    if span is None or start > span[0] or end < span[1]:
+        # a partial range reads ix_bookings_date; the whole history is cheaper as one table scan
+        query = query.filter(Booking.date >= datetime.combine(start, datetime.min.time()),
+                             Booking.date < datetime.combine(end + timedelta(days=1), datetime.min.time()))
+    # sqlite3 cursors already step through the result lazily; other drivers need a server-side cursor
+    streaming = conn.dialect.name != 'sqlite'
+    result = conn.execute(query.statement.execution_options(stream_results=streaming))
+    try:
+        if streaming:
+            chunks = result.partitions(chunk_size)
+        else:
+            # plain DBAPI tuples: building a Row per booking costs more than the aggregation
+            chunks = iter(lambda: result.cursor.fetchmany(chunk_size), [])
+        for rows in chunks:
+            yield tuple(zip(*rows))
+    finally:
+        result.close()
+
+
+def booking_date_range():
+    first, last = db.session.query(db.func.min(Booking.date), db.func.max(Booking.date)).one()
+    if first is None:
+        return None
+    return first.date(), last.date()
+
+
+class RevenueTotals:
+    """Per-(park, day) bookings, tickets and revenue in cents over a PriceBook's range."""
+
+    def __init__(self, book, use_numpy=None):
+        self.book = book
+        self.use_numpy = (np is not None) if use_numpy is None else use_numpy
+        cells = len(book.park_ids) * book.days
+        if self.use_numpy:
+            self.bookings = np.zeros(cells, dtype=np.int64)
+            self.tickets = np.zeros(cells, dtype=np.int64)
+            self.revenue = np.zeros(cells, dtype=np.int64)
+        else:
+            self.bookings = array('q', bytes(8 * cells))
+            self.tickets = array('q', bytes(8 * cells))
+            self.revenue = array('q', bytes(8 * cells))
+        self.rows = 0
+        self.chunks = 0
+
+    def add(self, park_ids, days, num_tickets):
+        if self.use_numpy:
+            self._add_arrays(park_ids, days, num_tickets)
+        else:
+            self._add_rows(park_ids, days, num_tickets)
+        self.rows += len(park_ids)
+        self.chunks += 1
+
+    def _add_arrays(self, park_ids, days, num_tickets):
+        book = self.book
+        unit_table, percent_table = book.arrays()
+        parks = np.searchsorted(np.asarray(book.park_ids, dtype=np.int64), np.asarray(park_ids, dtype=np.int64))
+        days = np.asarray(days, dtype=np.int64)
+        tickets = np.asarray(num_tickets, dtype=np.int64)
+        unit = unit_table[parks, np.minimum(tickets, book.max_tier)]
+        revenue = (unit * tickets * (100 + percent_table[parks, days]) + 50) // 100
+        cells = parks * book.days + days
+        size = len(self.revenue)
+        # bincount sums in float64, exact while a chunk's cell total stays under 2**53 cents
+        self.bookings += np.bincount(cells, minlength=size)
+        self.tickets += np.bincount(cells, weights=tickets, minlength=size).astype(np.int64)
+        self.revenue += np.bincount(cells, weights=revenue, minlength=size).astype(np.int64)
+
+    def _add_rows(self, park_ids, days, num_tickets):
+        book = self.book
+        index, width, price = book.index, book.days, book.price
+        bookings, tickets, revenue = self.bookings, self.tickets, self.revenue
+        for park_id, day, count in zip(park_ids, days, num_tickets):
+            park = index[park_id]
+            cell = park * width + day
+            bookings[cell] += 1
+            tickets[cell] += count
+            revenue[cell] += price(park, day, count)
+
+    def cells(self):
+        """(park_id, day, bookings, tickets, revenue_cents) for every non-empty cell, by park then day."""
+        book = self.book
+        if self.use_numpy:
+            filled = np.flatnonzero(self.bookings).tolist()
+        else:
+            filled = (cell for cell, count in enumerate(self.bookings) if count)
+        for cell in filled:
+            park, day = divmod(cell, book.days)
+            yield (book.park_ids[park], book.start + timedelta(days=day),
+                   int(self.bookings[cell]), int(self.tickets[cell]), int(self.revenue[cell]))
+
+    def rows_by(self, grain):
+        totals = {}
+        for park_id, day, bookings, tickets, revenue in self.cells():
+            if grain == 'day':
+                key = (park_id, day)
+            elif grain == 'week':
+                key = (park_id, day - timedelta(days=day.weekday()))
+            else:
+                key = (park_id, None)
+            current = totals.get(key, (0, 0, 0))
+            totals[key] = (current[0] + bookings, current[1] + tickets, current[2] + revenue)
+        return [
+            {'park_id': park_id, 'period': period, 'bookings': b, 'tickets': t, 'revenue_cents': r}
+            for (park_id, period), (b, t, r) in totals.items()
+        ]
+
+
+def revenue_report(start, end, grain='day', chunk_size=None, use_numpy=None):
+    """Report rows plus a summary dict for bookings from start to end inclusive."""
+    if grain not in GRAINS:
+        raise ValueError(f'grain must be one of {", ".join(GRAINS)}')
+    chunk_size = chunk_size or current_app.config.get('REVENUE_CHUNK_SIZE', 50000)
+    started = time.perf_counter()
+    totals = RevenueTotals(PriceBook.load(start, end), use_numpy=use_numpy)
+    for park_ids, days, num_tickets in booking_chunks(start, end, chunk_size):
+        totals.add(park_ids, days, num_tickets)
+    rows = totals.rows_by(grain)
+    names = dict(db.session.execute(db.select(Park.park_id, Park.name)).all())
+    for row in rows:
+        row['park'] = names.get(row['park_id'], str(row['park_id']))
+    summary = {
+        'from': start, 'to': end, 'grain': grain,
+        'bookings': totals.rows, 'chunks': totals.chunks,
+        'tickets': sum(row['tickets'] for row in rows),
+        'revenue_cents': sum(row['revenue_cents'] for row in rows),
+        'engine': 'numpy' if totals.use_numpy else 'python',
+        'seconds': time.perf_counter() - started,
+    }
+    return rows, summary
+
+
+## CLI: flask revenue ... ##
+@click.group('revenue')
+def revenue_cli():
+    """Revenue reports computed from bookings and structured prices."""
+
+
+@revenue_cli.command('report')
+@click.option('--from', 'start', type=click.DateTime(['%Y-%m-%d']), default=None, help='First day (default: first booking).')
+@click.option('--to', 'end', type=click.DateTime(['%Y-%m-%d']), default=None, help='Last day (default: last booking).')
+@click.option('--by', 'grain', type=click.Choice(GRAINS), default='day', show_default=True)
+@click.option('--chunk-size', type=int, default=None, help='Bookings per streamed chunk (REVENUE_CHUNK_SIZE).')
+@click.option('--python', 'pure_python', is_flag=True, help='Skip NumPy even if it is installed.')
+@with_appcontext
+def report_command(start, end, grain, chunk_size, pure_python):
+    """Write revenue per park and day, week or park as CSV to stdout."""
+    if start is None or end is None:
+        span = booking_date_range()
+        if span is None:
+            click.echo('no bookings', err=True)
+            return
+        start = start or datetime.combine(span[0], datetime.min.time())
+        end = end or datetime.combine(span[1], datetime.min.time())
+    rows, summary = revenue_report(start.date(), end.date(), grain, chunk_size,
+                                   use_numpy=False if pure_python else None)
+    writer = csv.writer(sys.stdout)
+    writer.writerow(['park_id', 'park', 'period', 'bookings', 'tickets', 'revenue'])
+    for row in rows:
+        period = row['period'].isoformat() if row['period'] else ''
+        writer.writerow([row['park_id'], row['park'], period, row['bookings'], row['tickets'],
+                         format_cents(row['revenue_cents']).replace(',', '')])
+    click.echo(f"{summary['bookings']} bookings in {summary['chunks']} chunks, "
+               f"{summary['tickets']} tickets, revenue {format_cents(summary['revenue_cents'])}, "
+               f"{summary['seconds']:.1f}s ({summary['engine']})", err=True)
@@ -0,0 +1,81 @@
+import time
+from contextlib import contextmanager
+from fnmatch import fnmatchcase
+
+from flask import current_app, g, has_request_context, request, session as flask_session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+## Read replica routing ##
+# With a 'replica' entry in SQLALCHEMY_BINDS, GET requests to the endpoints
+# in READ_REPLICA_ENDPOINTS (public catalog pages, admin list views) read
+# from the replica engine; everything else uses the primary. Writes always
+# go to the primary: a flush switches the rest of the request back to it,
+# and a committed write pins the visitor to the primary for
+# REPLICA_STICKY_SECONDS (stored in the Flask session) so they read their
+# own writes even while the replica lags. Without a replica bind this is a
+# no-op and every query goes to the default engine.
+
+REPLICA_BIND = 'replica'
+STICKY_KEY = '_primary_until'
+
+
+class RoutingSession(Session):
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and _wants_replica():
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _wants_replica():
+    return has_request_context() and g.get('_db_route') == REPLICA_BIND
+
+
+@contextmanager
+def primary_reads():
+    """Send the session's reads inside the block to the primary, whatever the request's route."""
+    if not has_request_context() or g.get('_db_route') != REPLICA_BIND:
+        yield
+        return
+    g._db_route = 'primary'
+    try:
+        yield
+    finally:
+        if not g.get('_db_wrote'):
+            g._db_route = REPLICA_BIND
+
+
+def replica_endpoint(endpoint):
+    patterns = current_app.config.get('READ_REPLICA_ENDPOINTS', ())
+    return endpoint is not None and any(fnmatchcase(endpoint, p) for p in patterns)
+
+
+def _choose_route():
+    if REPLICA_BIND not in current_app.config.get('SQLALCHEMY_BINDS', {}):
+        return
+    sticky = flask_session.get(STICKY_KEY, 0) > time.time()
+    if request.method == 'GET' and not sticky and replica_endpoint(request.endpoint):
+        g._db_route = REPLICA_BIND
+    else:
+        g._db_route = 'primary'
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _after_flush(session, flush_context):
+    if has_request_context():
+        g._db_route = 'primary'
+        g._db_wrote = True
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _after_commit(session):
+    if has_request_context() and g.pop('_db_wrote', False):
+        if REPLICA_BIND in current_app.config.get('SQLALCHEMY_BINDS', {}):
+            flask_session[STICKY_KEY] = time.time() + current_app.config.get('REPLICA_STICKY_SECONDS', 5)
+
+
+def init_app(app):
+    app.before_request(_choose_route)
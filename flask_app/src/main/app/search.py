@@ -0,0 +1,101 @@
+import re
+
+from sqlalchemy import Float, Integer, text
+
+## Full-text search for the message inbox ##
+# SQLite: an external-content FTS5 table (messages_fts) over name, email and
+# message, kept in sync by AFTER INSERT/UPDATE/DELETE triggers, so bulk Core
+# inserts (message_buffer) and admin edits are both covered. MySQL: a
+# FULLTEXT index, which InnoDB maintains itself. match_messages() turns the
+# admin search box into a (message_id, score) subquery, best match first;
+# every word must match, the last one as a prefix so results update while
+# typing. Other dialects return None and callers fall back to LIKE.
+
+FTS_TABLE = 'messages_fts'
+MYSQL_INDEX = 'ft_messages'
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+SQLITE_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "name, email, message, content='messages', content_rowid='message_id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS messages_fts_ai AFTER INSERT ON messages BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, name, email, message) "
+    "VALUES (new.message_id, new.name, new.email, new.message); END",
+    f"CREATE TRIGGER IF NOT EXISTS messages_fts_ad AFTER DELETE ON messages BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, email, message) "
+    "VALUES ('delete', old.message_id, old.name, old.email, old.message); END",
+    f"CREATE TRIGGER IF NOT EXISTS messages_fts_au AFTER UPDATE ON messages BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, email, message) "
+    "VALUES ('delete', old.message_id, old.name, old.email, old.message); "
+    f"INSERT INTO {FTS_TABLE}(rowid, name, email, message) "
+    "VALUES (new.message_id, new.name, new.email, new.message); END",
+)
+
+
+def ensure_index(conn):
+    """Create the search index for the messages table and (re)build it."""
+    if conn.dialect.name == 'sqlite':
+        for statement in SQLITE_DDL:
+            conn.exec_driver_sql(statement)
+        conn.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    elif conn.dialect.name == 'mysql':
+        exists = conn.execute(text(f"SHOW INDEX FROM messages WHERE Key_name = '{MYSQL_INDEX}'")).first()
+        if exists is None:
+            conn.execute(text(f'ALTER TABLE messages ADD FULLTEXT INDEX {MYSQL_INDEX} (name, email, message)'))
+
+
+def drop_index(conn):
+    if conn.dialect.name == 'sqlite':
+        for trigger in ('messages_fts_ai', 'messages_fts_ad', 'messages_fts_au'):
+            conn.exec_driver_sql(f'DROP TRIGGER IF EXISTS {trigger}')
+        conn.exec_driver_sql(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+def after_messages_create(target, connection, **kw):
+    ensure_index(connection)
+
+
+def before_messages_drop(target, connection, **kw):
+    drop_index(connection)
+
+
+def _words(term):
+    return WORD_RE.findall(term or '')
+
+
+def sqlite_query(term):
+    words = _words(term)
+    if not words:
+        return None
+    quoted = ['"' + w.replace('"', '""') + '"' for w in words]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+def mysql_query(term):
+    words = _words(term)
+    if not words:
+        return None
+    terms = ['+' + w for w in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def match_messages(term, dialect):
+    """(message_id, score) subquery for term, best match (lowest score) first; None if unsupported."""
+    if dialect == 'sqlite':
+        query = sqlite_query(term)
+        sql = (f'SELECT rowid AS message_id, bm25({FTS_TABLE}) AS score '
+               f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :fts_query')
+    elif dialect == 'mysql':
+        query = mysql_query(term)
+        match = 'MATCH (name, email, message) AGAINST (:fts_query IN BOOLEAN MODE)'
+        sql = f'SELECT message_id, -{match} AS score FROM messages WHERE {match}'
+    else:
+        return None
+    if query is None:
+        return None
+    return (text(sql).bindparams(fts_query=query)
+            .columns(message_id=Integer, score=Float)
+            .subquery('message_matches'))
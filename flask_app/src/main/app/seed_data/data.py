@@ -1,6 +1,6 @@
 from app import db
 from app.models import User, Role, Park
-from werkzeug.security import generate_password_hash
+from app.passwords import hash_password
 
 def seed_dev_data():
     # prevent duplicate seeding
@@ -14,12 +14,14 @@ def seed_dev_data():
     db.session.add_all([admin_role, customer_role])
     db.session.commit()
 
+    admin_password = hash_password("admin123")
+
     # Admin users
     admin1 = User(
         name="Admin",
         last_name="One",
         email="admin1@example.com",
-        password=generate_password_hash("admin123", method='pbkdf2:sha256'),
+        password=admin_password,
         role=admin_role
     )
 
@@ -27,7 +29,7 @@ def seed_dev_data():
         name="Admin",
         last_name="Two",
         email="admin2@example.com",
-        password=generate_password_hash("admin123", method='pbkdf2:sha256'),
+        password=admin_password,
         role=admin_role
     )
 
@@ -56,6 +58,7 @@ def seed_dev_data():
         difficulty='Moderate',
         min_age=10,
         price='Starting at $39.99',
+        base_price_cents=3999,
         wait_time='20-40 minutes',
         height_requirement='42" (1.07m)',
     )
@@ -79,6 +82,7 @@ def seed_dev_data():
         difficulty='Hard',
         min_age=14,
         price='Starting at $54.99',
+        base_price_cents=5499,
         wait_time='45-75 minutes',
         height_requirement='54" (1.37m)',
     )
@@ -102,6 +106,7 @@ def seed_dev_data():
         difficulty='Easy',
         min_age=8,
         price='Starting at $29.99',
+        base_price_cents=2999,
         wait_time='15-30 minutes',
         height_requirement='None',
     )
@@ -0,0 +1,314 @@
+import random
+import time
+from datetime import date, datetime, timedelta
+
+import click
+from flask.cli import with_appcontext
+from app import db, search
+from app.models import Booking, Message, Park, PriceTier, Role, User
+from app.passwords import hash_password
+
+## Production-scale synthetic data ##
+# `flask seed --scale` fills the database with load-test volumes: users,
+# parks, bookings and contact messages, written with Core executemany
+# batches (one executemany per --batch-size rows, no ORM objects). The
+# password hash is computed once and shared by every generated account.
+# Distributions aim for realistic query shapes rather than random noise:
+#   - park popularity is Zipf-like, and park capacity follows popularity;
+#   - days are weighted by weekday, season, Halloween and the Christmas
+#     week, with steady growth, and popular days really do sell out (a
+#     booking that would pass capacity is moved to another day);
+#   - a small share of repeat customers makes most of the bookings;
+#   - party sizes cluster at 1-4 tickets with a tail of groups.
+# Core inserts bypass the Booking mapper events, so park_daily_stats and
+# park_day_inventory are rebuilt from the bookings at the end.
+
+SCALE_DOMAIN = 'scale.example.com'
+
+FIRST_NAMES = ('Ada', 'Bram', 'Ciara', 'Dmitri', 'Elif', 'Fionn', 'Grace', 'Hugo', 'Ines', 'Jonas', 'Keira',
+               'Luca', 'Maeve', 'Niamh', 'Oscar', 'Priya', 'Quinn', 'Rosa', 'Sean', 'Tara', 'Uma', 'Vlad',
+               'Wanda', 'Xavier', 'Yara', 'Zoe')
+LAST_NAMES = ('Addams', 'Byrne', 'Carpathia', 'Doyle', 'Everett', 'Fitzgerald', 'Grimm', 'Hawthorne', 'Ivers',
+              'Kelly', 'Lugosi', 'Murphy', 'Nolan', 'O\'Brien', 'Price', 'Quill', 'Ravenscroft', 'Shelley',
+              'Tepes', 'Usher', 'Vance', 'Walsh', 'Young')
+PLACES = ('Dublin', 'London', 'Berlin', 'Prague', 'Edinburgh', 'Salem', 'Bucharest', 'Vienna', 'Krakow',
+          'Galway', 'Bruges', 'York', 'Transylvania', 'New Orleans', 'Sleepy Hollow')
+THEMES = ('Witches\'', 'Spider', 'Haunted', 'Vampire', 'Werewolf', 'Zombie', 'Ghost Ship', 'Mummy', 'Goblin',
+          'Banshee', 'Phantom', 'Crypt', 'Raven', 'Skeleton', 'Pumpkin')
+KINDS = ('Park', 'House', 'Manor', 'Forest', 'Carnival', 'Castle', 'Asylum', 'Catacombs')
+SENTENCES = ('Do you offer group discounts for school trips?', 'Is the park suitable for a nine year old?',
+             'We lost a scarf near the Spider Cavern on Saturday.', 'Can I change the date of my booking?',
+             'The Halloween night event was amazing, thank you!', 'Are there wheelchair accessible routes?',
+             'How long is the queue for the Venom Drop on weekends?', 'Do tickets include the seance room?',
+             'I would like a refund for a cancelled visit.', 'Is parking available near the entrance?',
+             'Please add more vegetarian food options.', 'Can we bring a birthday cake for a party of ten?')
+
+# party size -> relative frequency
+TICKET_WEIGHTS = {1: 24, 2: 34, 3: 12, 4: 15, 5: 5, 6: 4, 8: 3, 10: 2, 12: 1}
+WEEKDAY_WEIGHTS = (0.8, 0.7, 0.75, 0.85, 1.2, 2.0, 1.7)  # Monday first
+MONTH_WEIGHTS = {6: 1.4, 7: 1.7, 8: 1.6, 10: 1.5, 12: 1.3}
+
+
+def day_weight(day, position):
+    """Relative demand for a day; position in [0, 1] adds steady growth over the range."""
+    weight = WEEKDAY_WEIGHTS[day.weekday()] * MONTH_WEIGHTS.get(day.month, 1.0) * (1 + 0.5 * position)
+    if day.month == 10 and day.day >= 24:
+        weight *= 2.5 if day.day == 31 else 1.6
+    elif day.month == 12 and day.day >= 26:
+        weight *= 1.5
+    return weight
+
+
+def _cumulative(weights):
+    total, cumulative = 0.0, []
+    for weight in weights:
+        total += weight
+        cumulative.append(total)
+    return cumulative
+
+
+class _BulkWriter:
+    """executemany batches on one connection, committing every commit_every rows.
+
+    On SQLite the table's secondary indexes (and, for messages, the search
+    triggers) are dropped for the load and rebuilt once at the end: sorting
+    millions of keys in one pass is far cheaper than updating the B-trees
+    row by row. Other databases keep their indexes (MySQL needs them for the
+    foreign keys).
+    """
+
+    def __init__(self, table, commit_every=100000):
+        self.table = table
+        self.commit_every = commit_every
+        self.pending = 0
+
+    def __enter__(self):
+        self.conn = db.engine.connect()
+        self.deferred = self.conn.dialect.name == 'sqlite'
+        if self.deferred:
+            if self.table is Message.__table__:
+                search.drop_index(self.conn)
+            for index in self.table.indexes:
+                index.drop(self.conn, checkfirst=True)
+            self.conn.commit()
+        return self
+
+    def write(self, rows):
+        self.conn.execute(self.table.insert(), rows)
+        self.pending += len(rows)
+        if self.pending >= self.commit_every:
+            self.conn.commit()
+            self.pending = 0
+
+    def __exit__(self, *exc):
+        try:
+            self.conn.commit()
+            if self.deferred:
+                for index in self.table.indexes:
+                    index.create(self.conn, checkfirst=True)
+                if self.table is Message.__table__:
+                    search.ensure_index(self.conn)
+                self.conn.commit()
+        finally:
+            self.conn.close()
+
+
+def _batches(total, batch_size):
+    done = 0
+    while done < total:
+        size = min(batch_size, total - done)
+        yield done, size
+        done += size
+
+
+def _progress(label, count, started):
+    elapsed = time.perf_counter() - started
+    click.echo(f'{label}: {count:,} rows in {elapsed:.1f}s ({count / max(elapsed, 1e-9):,.0f}/s)')
+
+
+class ScaleSeeder:
+
+    def __init__(self, users, parks, bookings, messages, start, end, batch_size=10000, seed=42,
+                 password='password123'):
+        self.users = users
+        self.parks = parks
+        self.bookings = bookings
+        self.messages = messages
+        self.start = start
+        self.end = end
+        self.days = (end - start).days + 1
+        self.batch_size = batch_size
+        self.rng = random.Random(seed)
+        self.password = password
+
+    def run(self):
+        if User.query.filter(User.email.like(f'%@{SCALE_DOMAIN}')).first() is not None:
+            raise click.ClickException(f'{SCALE_DOMAIN} users already exist; seed a fresh database')
+        self.role_id = self._customer_role()
+        self.first_user = (db.session.query(db.func.max(User.user_id)).scalar() or 0) + 1
+        self.first_park = (db.session.query(db.func.max(Park.park_id)).scalar() or 0) + 1
+        db.session.commit()
+
+        self.seed_users()
+        self.seed_parks()
+        self.seed_bookings()
+        self.seed_messages()
+        self.refresh_totals()
+
+    def _customer_role(self):
+        role = Role.query.filter_by(name='customer').first()
+        if role is None:
+            role = Role(name='customer')
+            db.session.add(role)
+            db.session.flush()
+        return role.role_id
+
+    def seed_users(self):
+        started = time.perf_counter()
+        password = hash_password(self.password)  # once for every account
+        rng = self.rng
+        with _BulkWriter(User.__table__) as writer:
+            for offset, size in _batches(self.users, self.batch_size):
+                writer.write([{
+                    'user_id': self.first_user + n,
+                    'name': rng.choice(FIRST_NAMES),
+                    'last_name': rng.choice(LAST_NAMES),
+                    'email': f'user{n}@{SCALE_DOMAIN}',
+                    'password': password,
+                    'role_id': self.role_id,
+                } for n in range(offset, offset + size)])
+        _progress('users', self.users, started)
+
+    def seed_parks(self):
+        started = time.perf_counter()
+        rng = self.rng
+        # Zipf-like popularity: a handful of headline parks, a long tail of small ones
+        self.park_weights = [1 / (rank + 1) ** 0.8 for rank in range(self.parks)]
+        mean_tickets = sum(t * w for t, w in TICKET_WEIGHTS.items()) / sum(TICKET_WEIGHTS.values())
+        tickets_per_day = self.bookings * mean_tickets / self.days / sum(self.park_weights)
+        parks, tiers = [], []
+        for n in range(self.parks):
+            park_id = self.first_park + n
+            theme, kind, place = rng.choice(THEMES), rng.choice(KINDS), rng.choice(PLACES)
+            base_price = rng.randrange(1999, 7999, 100) + 99
+            # room for three times an average day: peak days sell out, quiet ones never do
+            capacity = max(100, int(tickets_per_day * self.park_weights[n] * 3))
+            parks.append({
+                'park_id': park_id,
+                'name': f'{theme} {kind} of {place}',
+                'location': place,
+                'description': f'The {theme.lower()} {kind.lower()} of {place}. {rng.choice(SENTENCES)}',
+                'short_description': f'{theme} thrills in {place}.',
+                'slug': f'scale-{park_id}-{place.lower().replace(" ", "-")}',
+                'price': f'Starting at ${base_price // 100}.{base_price % 100:02d}',
+                'base_price_cents': base_price,
+                'daily_capacity': capacity,
+                'min_age': rng.choice((6, 8, 10, 12, 14, 16)),
+                'difficulty': rng.choice(('Easy', 'Moderate', 'Hard')),
+                'updated_at': datetime.utcnow(),
+            })
+            tiers.append({'park_id': park_id, 'min_tickets': 8, 'unit_price_cents': base_price * 85 // 100})
+        self.capacities = [park['daily_capacity'] for park in parks]
+        with db.engine.begin() as conn:
+            conn.execute(Park.__table__.insert(), parks)
+            conn.execute(PriceTier.__table__.insert(), tiers)
+        _progress('parks', self.parks, started)
+
+    def seed_bookings(self):
+        started = time.perf_counter()
+        day_list = [self.start + timedelta(days=d) for d in range(self.days)]
+        self.day_starts = [datetime.combine(day, datetime.min.time()) for day in day_list]
+        self.day_cumulative = _cumulative(day_weight(day, d / self.days) for d, day in enumerate(day_list))
+        self.park_cumulative = _cumulative(self.park_weights)
+        self.ticket_cumulative = _cumulative(TICKET_WEIGHTS.values())
+        self.slots = [timedelta(minutes=m) for m in range(9 * 60, 20 * 60, 15)]
+        # tickets already sold per (park, day), so no day ends up over capacity
+        self.sold = [0] * (self.parks * self.days)
+        written = 0
+        with _BulkWriter(Booking.__table__) as writer:
+            for _, size in _batches(self.bookings, self.batch_size):
+                rows = self._booking_rows(size)
+                writer.write(rows)
+                written += len(rows)
+        self.bookings_written = written
+        _progress('bookings', written, started)
+
+    def _booking_rows(self, size):
+        rng, sold, capacities, width = self.rng, self.sold, self.capacities, self.days
+        park_draws = rng.choices(range(self.parks), cum_weights=self.park_cumulative, k=size)
+        day_draws = rng.choices(range(width), cum_weights=self.day_cumulative, k=size)
+        ticket_draws = rng.choices(list(TICKET_WEIGHTS), cum_weights=self.ticket_cumulative, k=size)
+        rows = []
+        for park, day, tickets in zip(park_draws, day_draws, ticket_draws):
+            for _ in range(10):
+                if sold[park * width + day] + tickets <= capacities[park]:
+                    break
+                day = rng.randrange(width)  # sold out: the party picks another day
+            else:
+                continue
+            sold[park * width + day] += tickets
+            rows.append({
+                # repeat customers: low user numbers are drawn far more often
+                'user_id': self.first_user + int(self.users * rng.random() ** 3),
+                'park_id': self.first_park + park,
+                'date': self.day_starts[day] + rng.choice(self.slots),
+                'num_tickets': tickets,
+                'health_safety': rng.random() < 0.92,
+            })
+        return rows
+
+    def seed_messages(self):
+        started = time.perf_counter()
+        rng = self.rng
+        newest = min(self.end, date.today())
+        span = max(1, (newest - self.start).days + 1) * 86400
+        origin = datetime.combine(self.start, datetime.min.time())
+        with _BulkWriter(Message.__table__) as writer:
+            for _, size in _batches(self.messages, self.batch_size):
+                writer.write([{
+                    'name': f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+                    'email': (f'user{int(self.users * rng.random() ** 3)}@{SCALE_DOMAIN}' if rng.random() < 0.3
+                              else f'visitor{rng.randrange(10 ** 7)}@example.org'),
+                    'message': ' '.join(rng.sample(SENTENCES, rng.randint(1, 4))),
+                    'created_at': origin + timedelta(seconds=rng.randrange(span)),
+                } for _ in range(size)])
+        _progress('messages', self.messages, started)
+
+    def refresh_totals(self):
+        from app.capacity import rebuild_inventory
+        from app.daily_stats import rebuild
+        started = time.perf_counter()
+        with db.engine.begin() as conn:
+            written = rebuild(conn)
+            rebuild_inventory(conn)
+            if conn.dialect.name == 'sqlite':
+                conn.exec_driver_sql('ANALYZE')  # row estimates for the planner and admin counts
+        _progress('park_daily_stats', written, started)
+
+
+@click.command('seed')
+@click.option('--scale', is_flag=True, help='Generate load-test volumes instead of the dev fixtures.')
+@click.option('--users', type=int, default=1_000_000, show_default=True)
+@click.option('--parks', type=int, default=300, show_default=True)
+@click.option('--bookings', type=int, default=10_000_000, show_default=True)
+@click.option('--messages', type=int, default=500_000, show_default=True)
+@click.option('--days', type=int, default=730, show_default=True, help='Length of the booking calendar.')
+@click.option('--future-days', type=int, default=90, show_default=True, help='How much of it lies ahead of today.')
+@click.option('--batch-size', type=int, default=10000, show_default=True, help='Rows per INSERT executemany.')
+@click.option('--seed', 'random_seed', type=int, default=42, show_default=True, help='Random seed.')
+@with_appcontext
+def seed_command(scale, users, parks, bookings, messages, days, future_days, batch_size, random_seed):
+    """Seed the database: dev fixtures, or production-scale synthetic data with --scale."""
+    from app.seed_data.data import seed_dev_data
+    seed_dev_data()
+    if not scale:
+        click.echo('dev data seeded')
+        return
+    if min(users, parks, days, batch_size) < 1 or min(bookings, messages) < 0:
+        raise click.BadParameter('users, parks, days and batch size must be positive')
+    end = date.today() + timedelta(days=future_days)
+    seeder = ScaleSeeder(users, parks, bookings, messages, end - timedelta(days=days - 1), end,
+                         batch_size=batch_size, seed=random_seed)
+    started = time.perf_counter()
+    seeder.run()
+    click.echo(f'done in {time.perf_counter() - started:.1f}s')
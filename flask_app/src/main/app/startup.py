@@ -0,0 +1,150 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+## Startup cost: phase timing, lazy admin mounting, `flask startup-profile` ##
+# create_app() times each of its phases into app.extensions['startup_phases'].
+# With ADMIN_MOUNT = 'lazy' the public app never imports Flask-Admin or
+# WTForms: AdminDispatcher sends /admin/* to a second, admin-only app that
+# is built on the first such request (create_app(..., admin='only'): same
+# config, session cookie and login, its own engine and pool). Workers that
+# only serve the public site never pay for it. 'off' mounts no admin at all,
+# for fleets that route /admin to dedicated workers.
+
+ADMIN_MODES = ('eager', 'lazy', 'off')
+
+
+class StartupPhases:
+
+    def __init__(self):
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - started))
+
+
+class AdminDispatcher:
+    """WSGI middleware: requests under prefix go to the app made by factory() on first use."""
+
+    def __init__(self, wsgi_app, factory, prefix='/admin'):
+        self.wsgi_app = wsgi_app
+        self.factory = factory
+        self.prefix = prefix
+        self._admin_app = None
+        self._lock = threading.Lock()
+
+    @property
+    def admin_app(self):
+        if self._admin_app is None:
+            with self._lock:
+                if self._admin_app is None:
+                    self._admin_app = self.factory()
+        return self._admin_app
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        if path == self.prefix or path.startswith(self.prefix + '/'):
+            return self.admin_app(environ, start_response)
+        return self.wsgi_app(environ, start_response)
+
+
+## CLI: flask startup-profile ##
+# Each mode is measured in a fresh interpreter (this one has imported
+# everything already): `python -X importtime`, create_app() by phase, the
+# first /admin request, resident memory and the number of loaded modules.
+
+BOOTED = '--- booted ---'
+PROBE = '''
+import json, resource, sys, time
+started = time.perf_counter()
+from app import create_app
+imported = time.perf_counter() - started
+started = time.perf_counter()
+app = create_app(sys.argv[1], admin=sys.argv[2])
+created = time.perf_counter() - started
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+flask_admin = 'flask_admin' in sys.modules
+modules = len(sys.modules)
+print(%r, file=sys.stderr, flush=True)
+started = time.perf_counter()
+status = app.test_client().get('/admin/').status_code
+print(json.dumps({
+    'import_ms': imported * 1000, 'create_app_ms': created * 1000,
+    'phases': [(name, seconds * 1000) for name, seconds in app.extensions['startup_phases']],
+    'maxrss_mb': rss_kb / 1024, 'modules': modules, 'flask_admin_loaded': flask_admin,
+    'first_admin_request_ms': (time.perf_counter() - started) * 1000, 'admin_status': status,
+}))
+''' % BOOTED
+
+
+def import_times(stderr):
+    """Self time in ms per top-level package from `python -X importtime` output, up to the end of boot."""
+    totals = {}
+    for line in stderr.splitlines():
+        if line == BOOTED:
+            break
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        package = name.strip().split('.')[0]
+        totals[package] = totals.get(package, 0) + int(self_us) / 1000
+    return totals
+
+
+def profile_mode(config_name, mode):
+    root = os.path.dirname(current_app.root_path)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', PROBE, config_name, mode],
+                            cwd=root, capture_output=True, text=True, env=dict(os.environ, PYTHONPATH=root))
+    if result.returncode:
+        raise click.ClickException(f'{mode}: {result.stderr.strip().splitlines()[-1]}')
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    report['imports_ms'] = import_times(result.stderr)
+    return report
+
+
+@click.command('startup-profile')
+@click.option('--config', 'config_name', default=None, help='Config to boot (default: the running one).')
+@click.option('--admin', 'modes', type=click.Choice(ADMIN_MODES), multiple=True,
+              help='ADMIN_MOUNT mode(s) to compare (default: all).')
+@click.option('--top', type=int, default=12, show_default=True, help='Slowest packages to list.')
+@click.option('--json', 'as_json', is_flag=True, help='Print the raw measurements as JSON.')
+@with_appcontext
+def startup_profile_command(config_name, modes, top, as_json):
+    """Import time, create_app phases and memory of a cold start."""
+    config_name = config_name or current_app.config.get('CONFIG_NAME', 'development')
+    reports = {mode: profile_mode(config_name, mode) for mode in (modes or ADMIN_MODES)}
+    if as_json:
+        click.echo(json.dumps({'config': config_name, 'modes': reports}, indent=2))
+        return
+
+    click.echo(f'config {config_name}')
+    rows = (('import app (ms)', 'import_ms'), ('create_app (ms)', 'create_app_ms'), ('max RSS (MB)', 'maxrss_mb'),
+            ('modules loaded', 'modules'), ('flask_admin loaded', 'flask_admin_loaded'),
+            ('first /admin/ (ms)', 'first_admin_request_ms'))
+    click.echo(f'{"":22}' + ''.join(f'{mode:>12}' for mode in reports))
+    for label, key in rows:
+        values = [reports[mode][key] for mode in reports]
+        click.echo(f'{label:22}' + ''.join(
+            f'{value:>12.1f}' if isinstance(value, float) else f'{str(value):>12}' for value in values))
+
+    for mode, report in reports.items():
+        click.echo(f'\ncreate_app phases ({mode})')
+        for name, ms in report['phases']:
+            click.echo(f'  {name:20}{ms:>10.1f} ms')
+        click.echo(f'slowest imports ({mode}, self time by package)')
+        slowest = sorted(report['imports_ms'].items(), key=lambda item: item[1], reverse=True)[:top]
+        for package, ms in slowest:
+            click.echo(f'  {package:20}{ms:>10.1f} ms')
@@ -61,6 +61,13 @@ document.addEventListener('DOMContentLoaded', function() {
     if (!thumb) return;
     
     mainImg.src = thumb.dataset.src;
+    // Responsive variants (see macros.html picture()): swap every srcset too
+    if (thumb.dataset.srcset) mainImg.srcset = thumb.dataset.srcset;
+    ['avif', 'webp'].forEach(fmt => {
+      const source = document.getElementById(`gallery-main-img-${fmt}`);
+      const value = thumb.dataset[`srcset${fmt.charAt(0).toUpperCase()}${fmt.slice(1)}`];
+      if (source && value) source.srcset = value;
+    });
     
     thumbItems.forEach(item => {
       item.classList.remove('active');
@@ -0,0 +1,48 @@
+import logging
+import random
+import time
+
+from flask import current_app
+from sqlalchemy.exc import OperationalError
+from . import db
+
+logger = logging.getLogger(__name__)
+
+## Commit with bounded retry ##
+# SQLite allows one writer at a time; past busy_timeout a commit fails with
+# "database is locked". MySQL reports deadlocks / lock wait timeouts the same
+# way. Those are transient, so commit_with_retry() rolls back and re-runs the
+# whole unit of work (the rollback discarded its pending rows) with capped,
+# jittered exponential backoff, up to DB_COMMIT_RETRIES attempts. Anything
+# else - and the last failure - is raised to the caller.
+
+MYSQL_RETRYABLE_CODES = {1205, 1213}  # lock wait timeout, deadlock
+
+
+def is_retryable(exc):
+    orig = getattr(exc, 'orig', None)
+    args = getattr(orig, 'args', ())
+    if args and args[0] in MYSQL_RETRYABLE_CODES:
+        return True
+    message = str(orig or exc).lower()
+    return 'database is locked' in message or 'database is busy' in message
+
+
+def commit_with_retry(work, attempts=None):
+    config = current_app.config
+    attempts = attempts or config.get('DB_COMMIT_RETRIES', 1)
+    base = config.get('DB_RETRY_BASE_DELAY', 0.02)
+    cap = config.get('DB_RETRY_MAX_DELAY', 0.5)
+
+    for attempt in range(1, attempts + 1):
+        try:
+            result = work()
+            db.session.commit()
+            return result
+        except OperationalError as e:
+            db.session.rollback()
+            if attempt >= attempts or not is_retryable(e):
+                raise
+            delay = min(cap, base * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+            logger.info('Commit attempt %d/%d hit a lock, retrying in %.3fs', attempt, attempts, delay)
+            time.sleep(delay)
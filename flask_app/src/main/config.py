@@ -1,8 +1,101 @@
 import os
 
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS
+
+def pool_options(workers, threads, max_connections, timeout=10, recycle=1800):
+    """
+    Per-process pool: one connection per request thread plus half again as
+    overflow for bursts, capped so that workers * (size + overflow) stays
+    within the database's max_connections. recycle sits well under MySQL's
+    wait_timeout and proxy idle limits; pre_ping replaces connections the
+    server already closed instead of failing the request.
+    """
+    budget = max(1, max_connections // max(1, workers))
+    pool_size = max(1, min(threads, budget))
+    max_overflow = max(0, min(max(1, threads // 2), budget - pool_size))
+    return {
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'pool_timeout': timeout,
+        'pool_recycle': recycle,
+        'pool_pre_ping': True,
+    }
+
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "2"))
+WEB_THREADS = int(os.getenv("WEB_THREADS", "8"))
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "151"))
+# per-process pool of the admin-only app behind ADMIN_MOUNT = 'lazy' (no overflow)
+ADMIN_POOL_SIZE = int(os.getenv("ADMIN_POOL_SIZE", "2"))
+
 class Config:
     SQLALCHEMY_DATABASE_URI = "sqlite:///flask_app.db"
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = {'pool_pre_ping': True}
+    PARK_CACHE_TTL = int(os.getenv("PARK_CACHE_TTL", "300"))
+    PROFILE_BOOKINGS_PER_PAGE = 20
+    API_PAGE_SIZE = 20
+    API_MAX_PAGE_SIZE = 100
+    AVAILABILITY_MAX_DAYS = 366
+    REVENUE_CHUNK_SIZE = int(os.getenv("REVENUE_CHUNK_SIZE", "50000"))
+    REVENUE_MAX_DAYS = 731
+    ADMIN_EXACT_COUNT_LIMIT = int(os.getenv("ADMIN_EXACT_COUNT_LIMIT", "10000"))
+    ADMIN_COUNT_CACHE_TTL = 60
+    # 'eager': mount Flask-Admin at boot; 'lazy': build it on the first /admin
+    # request; 'off': no admin in this process (see app/startup.py)
+    ADMIN_MOUNT = os.getenv("ADMIN_MOUNT", "eager")
+    ADMIN_POOL_SIZE = ADMIN_POOL_SIZE
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", f"pbkdf2:sha256:{DEFAULT_PBKDF2_ITERATIONS}")
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "0"))
+    PASSWORD_HASH_MAX_PENDING = 32
+    PASSWORD_HASH_TIMEOUT = 30
+    PRINCIPAL_CACHE_TTL = int(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+    ASSET_FINGERPRINTING = True
+    ASSET_FILES = ['css/styles.css', 'js/main.js', 'js/form-validation.js', 'js/login.js']
+    IMAGE_VARIANT_WIDTHS = {
+        'gallery': [320, 640, 960, 1280],
+        'thumb': [100, 200],
+        'banner': [480, 800, 1208],
+        'logo': [200, 400],
+    }
+    IMAGE_FORMATS = ['avif', 'webp', 'jpeg']
+    CONDITIONAL_GET = True
+    FRAGMENT_CACHE_BACKEND = os.getenv("FRAGMENT_CACHE_BACKEND", "simple")
+    FRAGMENT_CACHE_TTL = int(os.getenv("FRAGMENT_CACHE_TTL", "300"))
+    FRAGMENT_CACHE_MAXSIZE = 5000
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+    # /metrics is served to METRICS_ALLOWED_IPS (request.remote_addr, so run
+    # ProxyFix behind a proxy) and to "Authorization: Bearer <METRICS_TOKEN>";
+    # with neither set it is open, which only development and testing allow
+    METRICS_ALLOWED_IPS = [ip for ip in os.getenv("METRICS_ALLOWED_IPS", "").split(",") if ip]
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+    QUERY_SLOW_MS = float(os.getenv("QUERY_SLOW_MS", "200"))
+    QUERY_N_PLUS_ONE_THRESHOLD = 5
+    QUERY_COUNT_HEADER = False
+    # Applied to every new SQLite connection (ignored for other databases).
+    # WAL lets readers run alongside the single writer; NORMAL only syncs at
+    # checkpoints, which is durable in WAL mode short of power loss.
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,
+        'cache_size': -64000,
+        'mmap_size': 268435456,
+        'temp_store': 'MEMORY',
+    }
+    DB_COMMIT_RETRIES = 5
+    DB_RETRY_BASE_DELAY = 0.02
+    DB_RETRY_MAX_DELAY = 0.5
+    # GET endpoints that may read from the 'replica' bind when one is set
+    READ_REPLICA_ENDPOINTS = ['main.index', 'main.park_detail', 'main.new_booking', 'main.park_availability',
+                              'api.list_parks', 'api.get_park', 'api.get_park_by_slug',
+                              'revenue.index', '*.index_view']
+    REPLICA_STICKY_SECONDS = 5
+    MESSAGE_BUFFER_ENABLED = os.getenv("MESSAGE_BUFFER_ENABLED", "1") == "1"
+    MESSAGE_BUFFER_BATCH_SIZE = 200
+    MESSAGE_BUFFER_FLUSH_INTERVAL = 0.5
+    MESSAGE_SPOOL_DIR = os.getenv("MESSAGE_SPOOL_DIR")  # default: <instance>/message_spool
+    MESSAGE_SPOOL_FSYNC = True
+    MESSAGE_SPOOL_MAX_BYTES = 1 << 20
 
     @staticmethod
     def init_app(app):
@@ -11,18 +104,19 @@ class Config:
 class DevelopmentConfig(Config):
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = os.getenv("DEV_DATABASE_URL", "sqlite:///flask_app.db")
+    SQLALCHEMY_BINDS = {'replica': os.getenv("DEV_REPLICA_DATABASE_URL")} if os.getenv("DEV_REPLICA_DATABASE_URL") else {}
+    QUERY_COUNT_HEADER = True
+    SQLALCHEMY_ENGINE_OPTIONS = pool_options(1, WEB_THREADS, DB_MAX_CONNECTIONS)
     WTF_CSRF_ENABLED = False  
     SECRET_KEY = 'dev-secret-key'
 
     @staticmethod
     def init_app(app):
 
-        from app import db
-        from app import models
+        from app.migrations import upgrade
 
         with app.app_context():
-            db.drop_all()
-            db.create_all()
+            upgrade()
 
             from app.seed_data.data import seed_dev_data
             seed_dev_data()
@@ -32,12 +126,24 @@ class TestingConfig(Config):
     SQLALCHEMY_DATABASE_URI = os.getenv("TEST_DATABASE_URL", "sqlite:///:memory:")
     WTF_CSRF_ENABLED = False
     SECRET_KEY = 'test-secret-key'
+    PASSWORD_HASH_METHOD = "pbkdf2:sha256:1000"
+    MESSAGE_BUFFER_ENABLED = False
 
 class ProductionConfig(Config):
     DEBUG = False
     SQLALCHEMY_DATABASE_URI = os.getenv("PROD_DATABASE_URL")
+    SQLALCHEMY_BINDS = {'replica': os.getenv("PROD_REPLICA_DATABASE_URL")} if os.getenv("PROD_REPLICA_DATABASE_URL") else {}
+    # each worker may also build the lazy admin app's pool; leave room for it
+    SQLALCHEMY_ENGINE_OPTIONS = pool_options(
+        WEB_CONCURRENCY, WEB_THREADS, DB_MAX_CONNECTIONS - WEB_CONCURRENCY * ADMIN_POOL_SIZE,
+        timeout=int(os.getenv("DB_POOL_TIMEOUT", "10")),
+        recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    )
     WTF_CSRF_ENABLED = True   
     SECRET_KEY = 'prod-secret-key'
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    ADMIN_MOUNT = os.getenv("ADMIN_MOUNT", "lazy")
+    METRICS_ALLOWED_IPS = [ip for ip in os.getenv("METRICS_ALLOWED_IPS", "127.0.0.1,::1").split(",") if ip]
 
 config = {
     "development": DevelopmentConfig,
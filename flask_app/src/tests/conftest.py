@@ -18,6 +18,8 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'main'))
 
 from app import create_app, db
 from app.models import User, Role, Park, Booking
+from app.querylog import record_queries
+from contextlib import contextmanager
 from werkzeug.security import generate_password_hash
 from datetime import datetime
 
@@ -98,6 +100,48 @@ def authenticated_client(client, app):
             sess['_user_id'] = str(user.user_id)
     return client
 
+@pytest.fixture
+def admin_client(app):
+    """
+    Fixture that provides a separate client logged in as the admin user
+    """
+    client = app.test_client()
+    with app.app_context():
+        admin = User.query.filter_by(email='admin@example.com').first()
+        with client.session_transaction() as sess:
+            sess['_user_id'] = str(admin.user_id)
+    return client
+
+@pytest.fixture
+def max_queries():
+    """
+    Context manager asserting a block runs at most n SQL statements:
+        with max_queries(3): client.get('/profile')
+    """
+    @contextmanager
+    def check(limit):
+        with record_queries() as recorder:
+            yield recorder
+        assert recorder.count <= limit, f'expected at most {limit} queries, got ' + recorder.report()
+    return check
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    """
+    @pytest.mark.max_queries(n): the same check around the whole test body
+    (fixture setup is not counted). Old-style hookwrapper: works with every
+    pluggy that pytest 7.4 accepts.
+    """
+    marker = item.get_closest_marker('max_queries')
+    if marker is None:
+        yield
+        return
+    with record_queries() as recorder:
+        outcome = yield
+    limit = marker.args[0]
+    if outcome.excinfo is None:
+        assert recorder.count <= limit, f'expected at most {limit} queries, got ' + recorder.report()
+
 def _create_test_data():
     """
     Create initial test data: roles, users, and parks
@@ -139,6 +183,7 @@ def _create_test_data():
         difficulty='Moderate',
         min_age=10,
         price='Starting at $39.99',
+        base_price_cents=3999,
         wait_time='20-40 minutes',
         height_requirement='42" (1.07m)'
     )
@@ -154,6 +199,7 @@ def _create_test_data():
         difficulty='Hard',
         min_age=14,
         price='Starting at $54.99',
+        base_price_cents=5499,
         wait_time='45-75 minutes',
         height_requirement='54" (1.37m)'
     )
@@ -169,6 +215,7 @@ def _create_test_data():
         difficulty='Easy',
         min_age=8,
         price='Starting at $29.99',
+        base_price_cents=2999,
         wait_time='15-30 minutes',
         height_requirement='None'
     )
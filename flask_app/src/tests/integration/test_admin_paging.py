@@ -0,0 +1,140 @@
+"""
+Integration tests for seek pagination and bounded counts in the admin list views
+"""
+import html as htmllib
+import re
+import pytest
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add the main directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'main'))
+
+from app import db, admin_paging
+from app.querylog import record_queries
+
+@pytest.fixture
+def messages(app):
+    """45 messages, with runs of equal created_at so the primary key breaks ties"""
+    start = datetime(2026, 3, 1)
+    with app.app_context():
+        from app.models import Message
+        db.session.execute(db.insert(Message), [
+            {'name': f'Pager {i:02d}', 'email': f'pager{i}@example.com', 'message': 'hello',
+             'created_at': start + timedelta(minutes=i // 3)}
+            for i in range(45)
+        ])
+        db.session.commit()
+    admin_paging._estimates.invalidate()
+    yield
+    with app.app_context():
+        from app.models import Message
+        Message.query.filter(Message.name.like('Pager %')).delete(synchronize_session=False)
+        db.session.commit()
+    admin_paging._estimates.invalidate()
+
+def _page(client, url):
+    body = client.get(url).get_data(as_text=True)
+    names = re.findall(r'Pager \d\d', body)
+    links = {}
+    for label, sign in (('previous', '&lt;'), ('next', '&gt;')):
+        match = re.search(r'<a class="page-link" href="([^"]+)">' + sign + '</a>', body)
+        if match and match.group(1) != 'javascript:void(0)':
+            links[label] = htmllib.unescape(match.group(1))
+    return names, links, body
+
+class TestSeekPagination:
+    """Test walking a list view with cursors"""
+
+    def test_walk_forward_and_back(self, app, admin_client, messages):
+        """Test that every row appears exactly once in both directions"""
+        url, pages = '/admin/message/', []
+        while True:
+            names, links, _ = _page(admin_client, url)
+            pages.append(names)
+            if 'next' not in links:
+                break
+            url = links['next']
+            assert 'after=' in url
+        newest_first = sorted(range(45), key=lambda i: (-(i // 3), -i))
+        assert sum(pages, []) == [f'Pager {i:02d}' for i in newest_first]
+
+        backward = []
+        while True:
+            names, links, _ = _page(admin_client, url)
+            backward.insert(0, names)
+            if 'previous' not in links:
+                break
+            url = links['previous']
+        assert backward == pages
+
+    def test_deep_page_seeks_instead_of_offset(self, app, admin_client, messages):
+        """Test that following a cursor filters on the sort key and continues after the first page"""
+        first, links, _ = _page(admin_client, '/admin/message/')
+        with record_queries() as recorder:
+            names, _, _ = _page(admin_client, links['next'])
+        assert len(names) == 20
+        assert not set(names) & set(first)
+        statement, = [s for s, _ in recorder.queries if 'ORDER BY messages.created_at' in s]
+        assert 'messages.created_at < ?' in statement
+
+    def test_stale_cursor_is_ignored(self, app, admin_client, messages):
+        """Test that a cursor from another sort or a mangled one falls back to the first page"""
+        first, links, _ = _page(admin_client, '/admin/message/')
+        cursor = re.search(r'after=([^&]+)', links['next']).group(1)
+        ascending, _, _ = _page(admin_client, '/admin/message/?sort=0')
+        assert _page(admin_client, f'/admin/message/?sort=0&after={cursor}')[0] == ascending
+        assert _page(admin_client, '/admin/message/?after=not-a-cursor')[0] == first
+
+    def test_sort_links_drop_cursor(self, app, admin_client, messages):
+        """Test that sort links on a deep page start over"""
+        _, links, _ = _page(admin_client, '/admin/message/')
+        body = admin_client.get(links['next']).get_data(as_text=True)
+        sort_links = re.findall(r'href="([^"]*sort=[^"]*)"', body)
+        assert sort_links and not any('after=' in link for link in sort_links)
+
+    @pytest.mark.parametrize('view', ['user', 'booking', 'park', 'message'])
+    def test_views_sort_on_indexed_columns(self, app, admin_client, view):
+        """Test that each large view lists and sorts by its indexed column"""
+        assert admin_client.get(f'/admin/{view}/').status_code == 200
+        assert admin_client.get(f'/admin/{view}/?sort=0&desc=1').status_code == 200
+
+class TestCounts:
+    """Test exact, estimated and lower-bound counts"""
+
+    def test_exact_below_limit(self, app, admin_client, messages):
+        """Test that small tables get an exact count"""
+        _, _, body = _page(admin_client, '/admin/message/')
+        assert re.search(r'List \(\d+\)', body)
+
+    def test_estimate_past_limit(self, app, admin_client, messages):
+        """Test that large tables show an estimate"""
+        app.config['ADMIN_EXACT_COUNT_LIMIT'] = 10
+        try:
+            _, _, body = _page(admin_client, '/admin/message/')
+            assert re.search(r'List \(~\d+\)', body)
+            _, _, body = _page(admin_client, '/admin/message/?search=Pager')
+            assert 'List (10+)' in body
+        finally:
+            app.config['ADMIN_EXACT_COUNT_LIMIT'] = 10000
+
+    def test_estimate_uses_table_stats(self, app, messages):
+        """Test that sqlite_stat1 wins over the primary key span once analyzed"""
+        with app.app_context():
+            from app.models import Message
+            span = admin_paging.estimate_rows(db.session, Message.__table__)
+            assert span >= 45
+            db.session.execute(db.text('ANALYZE messages'))
+            db.session.commit()
+            admin_paging._estimates.invalidate()
+            analyzed = admin_paging.estimate_rows(db.session, Message.__table__)
+            assert analyzed == Message.query.count()
+            db.session.execute(db.text("DELETE FROM sqlite_stat1"))
+            db.session.commit()
+
+    def test_count_labels(self):
+        """Test how approximate counts render"""
+        assert str(admin_paging.ApproximateCount(1204000)) == '~1,204,000'
+        assert str(admin_paging.ApproximateCount(10000, at_least=True)) == '10,000+'
+        assert admin_paging.ApproximateCount(40) / 20 == 2
@@ -0,0 +1,97 @@
+"""
+Integration tests for the /api/v1 JSON API
+"""
+import pytest
+import sys
+import os
+
+# Add the main directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'main'))
+
+class TestParksApi:
+    """Test park endpoints"""
+
+    def test_list_parks(self, client):
+        """Test GET /api/v1/parks returns all parks"""
+        response = client.get('/api/v1/parks')
+        assert response.status_code == 200
+        body = response.get_json()
+        assert len(body['data']) >= 3
+        assert body['next_cursor'] is None
+
+    def test_list_parks_keyset_pages(self, client):
+        """Test walking the parks list with limit=1 and cursors"""
+        ids, cursor = [], None
+        while True:
+            url = '/api/v1/parks?limit=1' + (f'&cursor={cursor}' if cursor else '')
+            body = client.get(url).get_json()
+            ids.extend(p['park_id'] for p in body['data'])
+            cursor = body['next_cursor']
+            if cursor is None:
+                break
+        assert ids == sorted(ids)
+        assert len(ids) == len(set(ids)) >= 3
+
+    def test_invalid_cursor(self, client):
+        """Test that a bad cursor is a 400"""
+        response = client.get('/api/v1/parks?cursor=!!!')
+        assert response.status_code == 400
+
+    def test_park_by_id_and_slug(self, client):
+        """Test GET /api/v1/parks/<id> and /api/v1/parks/<slug>"""
+        by_slug = client.get('/api/v1/parks/park-1-dublin').get_json()
+        by_id = client.get(f"/api/v1/parks/{by_slug['park_id']}").get_json()
+        assert by_id == by_slug
+        assert by_id['name'] == 'Leprechaun Park'
+
+    def test_park_not_found(self, client):
+        """Test unknown park returns JSON 404"""
+        response = client.get('/api/v1/parks/99999')
+        assert response.status_code == 404
+        assert response.get_json()['error'] == 'park not found'
+
+class TestUserApi:
+    """Test authenticated endpoints"""
+
+    def test_requires_login(self, client):
+        """Test that API endpoints return 401 rather than redirecting"""
+        assert client.get('/api/v1/me').status_code == 401
+        assert client.get('/api/v1/me/bookings').status_code == 401
+        assert client.post('/api/v1/bookings', json={}).status_code == 401
+
+    def test_me_does_not_leak_password(self, authenticated_client):
+        """Test the user projection omits the password hash"""
+        body = authenticated_client.get('/api/v1/me').get_json()
+        assert body['email'] == 'test@example.com'
+        assert 'password' not in body
+
+    def test_create_and_list_booking(self, authenticated_client, app):
+        """Test POST /api/v1/bookings then GET /api/v1/me/bookings"""
+        with app.app_context():
+            from app.models import Park
+            park_id = Park.query.first().park_id
+
+        response = authenticated_client.post('/api/v1/bookings', json={
+            'park_id': park_id,
+            'date': '2028-03-03T10:00',
+            'num_tickets': 2,
+            'health_safety': True
+        })
+        assert response.status_code == 201
+        created = response.get_json()
+        assert created['num_tickets'] == 2
+
+        body = authenticated_client.get('/api/v1/me/bookings?limit=100').get_json()
+        assert created['booking_id'] in [b['booking_id'] for b in body['data']]
+
+    def test_create_booking_validation(self, authenticated_client):
+        """Test that missing fields are a 400"""
+        response = authenticated_client.post('/api/v1/bookings', json={'park_id': 1})
+        assert response.status_code == 400
+
+    def test_create_booking_unknown_park(self, authenticated_client):
+        """Test that an unknown park is a 404"""
+        response = authenticated_client.post('/api/v1/bookings', json={
+            'park_id': 99999, 'date': '2028-03-03', 'num_tickets': 1
+        })
+        assert response.status_code == 404
@@ -0,0 +1,114 @@
+"""
+Integration tests for conditional GET on the public park pages
+"""
+import pytest
+import sys
+import os
+
+# Add the main directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'main'))
+
+def _first_park_id(app):
+    with app.app_context():
+        from app.models import Park
+        return Park.query.order_by(Park.park_id).first().park_id
+
+class TestConditionalGet:
+    """Test ETag / Last-Modified / 304 handling"""
+
+    def test_index_sends_validators(self, client):
+        """Test that / carries ETag and Last-Modified"""
+        response = client.get('/')
+        assert response.status_code == 200
+        assert response.headers.get('ETag')
+        assert response.headers.get('Last-Modified')
+        assert 'no-cache' in response.headers['Cache-Control']
+
+    def test_index_if_none_match_returns_304(self, client, max_queries):
+        """Test that a matching ETag on a warm catalog skips rendering without a query"""
+        etag = client.get('/').headers['ETag']
+
+        with max_queries(0):
+            response = client.get('/', headers={'If-None-Match': etag})
+
+        assert response.status_code == 304
+        assert response.data == b''
+
+    def test_if_modified_since(self, client):
+        """Test Last-Modified round trip without an ETag"""
+        last_modified = client.get('/').headers['Last-Modified']
+        response = client.get('/', headers={'If-Modified-Since': last_modified})
+        assert response.status_code == 304
+
+    def test_park_edit_changes_etag(self, client, app):
+        """Test that committing a park change invalidates the validator"""
+        park_id = _first_park_id(app)
+        etag = client.get(f'/parks/{park_id}').headers['ETag']
+        assert client.get(f'/parks/{park_id}', headers={'If-None-Match': etag}).status_code == 304
+
+        with app.app_context():
+            from app import db
+            from app.models import Park
+            park = db.session.get(Park, park_id)
+            original = park.wait_time
+            park.wait_time = 'forever'
+            db.session.commit()
+
+        response = client.get(f'/parks/{park_id}', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert b'forever' in response.data
+        assert client.get('/', headers={'If-None-Match': etag}).status_code == 200
+
+        with app.app_context():
+            from app import db
+            from app.models import Park
+            db.session.get(Park, park_id).wait_time = original
+            db.session.commit()
+
+    def test_login_changes_etag(self, app, authenticated_client):
+        """Test that anonymous and logged-in pages do not share a validator"""
+        from flask import g
+        anonymous = app.test_client().get('/').headers['ETag']
+        # pytest-flask keeps one app context (and g) alive for the whole test
+        g.pop('_login_user', None)
+        logged_in = authenticated_client.get('/', headers={'If-None-Match': anonymous})
+        assert logged_in.status_code == 200
+        assert 'private' in logged_in.headers['Cache-Control']
+
+    def test_logged_in_ignores_if_modified_since(self, app, authenticated_client):
+        """Test that a date from an anonymous page does not revalidate a logged-in one"""
+        from flask import g
+        last_modified = app.test_client().get('/').headers['Last-Modified']
+        g.pop('_login_user', None)
+        response = authenticated_client.get('/', headers={'If-Modified-Since': last_modified})
+        assert response.status_code == 200
+        assert 'Last-Modified' not in response.headers
+        assert response.headers.get('ETag')
+
+    def test_rename_changes_etag(self, app, authenticated_client):
+        """Test that renaming the logged-in user revalidates the page showing their name"""
+        from flask import g
+        etag = authenticated_client.get('/').headers['ETag']
+        g.pop('_login_user', None)
+        assert authenticated_client.get('/', headers={'If-None-Match': etag}).status_code == 304
+
+        with app.app_context():
+            from app import db
+            from app.models import User
+            user = User.query.filter_by(email='test@example.com').first()
+            user.name = 'Renamed'
+            db.session.commit()
+        try:
+            g.pop('_login_user', None)
+            response = authenticated_client.get('/', headers={'If-None-Match': etag})
+            assert response.status_code == 200
+            assert b'Welcome, Renamed!' in response.data
+        finally:
+            with app.app_context():
+                user = User.query.filter_by(email='test@example.com').first()
+                user.name = 'Test'
+                db.session.commit()
+
+    def test_missing_park_still_404(self, client):
+        """Test that unknown parks fall through to the view"""
+        assert client.get('/parks/99999').status_code == 404
@@ -0,0 +1,169 @@
+"""
+Integration tests for the materialized park_daily_stats table and the availability endpoint
+"""
+import pytest
+import sys
+import os
+from datetime import date, datetime
+
+# Add the main directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'main'))
+
+from app import db
+from app.daily_stats import rebuild
+from app.models import Booking, Park, ParkDailyStats, ParkDayInventory
+
+@pytest.fixture
+def stats_park(app):
+    """A park of its own so the totals start at zero"""
+    with app.app_context():
+        park = Park(name='Stats Park', location='Cork', description='Counting', short_description='Counting',
+                    slug='stats-park', daily_capacity=50)
+        db.session.add(park)
+        db.session.commit()
+        park_id = park.park_id
+    yield park_id
+    with app.app_context():
+        Booking.query.filter_by(park_id=park_id).delete()
+        ParkDailyStats.query.filter_by(park_id=park_id).delete()
+        ParkDayInventory.query.filter_by(park_id=park_id).delete()
+        db.session.delete(db.session.get(Park, park_id))
+        db.session.commit()
+
+def _stats(park_id, day):
+    row = db.session.get(ParkDailyStats, (park_id, day))
+    return None if row is None else (row.tickets_sold, row.booking_count, row.health_safety_acks)
+
+def _user_id():
+    from app.models import User
+    return User.query.filter_by(email='test@example.com').first().user_id
+
+class TestIncrementalUpdates:
+    """Test that every Booking write path keeps the totals in step"""
+
+    def test_booking_route(self, app, authenticated_client, stats_park):
+        """Test that POST /booking adds to the day"""
+        for tickets, ack in ((3, True), (2, False)):
+            data = {'park_id': stats_park, 'date': '2027-05-01T10:00', 'num_tickets': str(tickets)}
+            if ack:
+                data['health_safety'] = 'on'
+            assert authenticated_client.post('/booking', data=data).status_code == 302
+        with app.app_context():
+            assert _stats(stats_park, date(2027, 5, 1)) == (5, 2, 1)
+
+    def test_orm_edit_moves_totals(self, app, stats_park):
+        """Test that changing date, tickets and acknowledgement moves the counts"""
+        with app.app_context():
+            booking = Booking(user_id=_user_id(), park_id=stats_park, date=datetime(2027, 5, 2, 9),
+                              num_tickets=4, health_safety=True)
+            db.session.add(booking)
+            db.session.commit()
+            assert _stats(stats_park, date(2027, 5, 2)) == (4, 1, 1)
+
+            booking.date = datetime(2027, 5, 3, 9)
+            booking.num_tickets = 6
+            booking.health_safety = False
+            db.session.commit()
+            assert _stats(stats_park, date(2027, 5, 2)) == (0, 0, 0)
+            assert _stats(stats_park, date(2027, 5, 3)) == (6, 1, 0)
+
+            db.session.delete(booking)
+            db.session.commit()
+            assert _stats(stats_park, date(2027, 5, 3)) == (0, 0, 0)
+
+    def test_rollback_discards_delta(self, app, stats_park):
+        """Test that the totals roll back with the booking"""
+        with app.app_context():
+            db.session.add(Booking(user_id=_user_id(), park_id=stats_park, date=datetime(2027, 5, 4),
+                                   num_tickets=2, health_safety=False))
+            db.session.flush()
+            assert _stats(stats_park, date(2027, 5, 4)) == (2, 1, 0)
+            db.session.rollback()
+            assert _stats(stats_park, date(2027, 5, 4)) is None
+
+    def test_admin_edit_and_delete(self, app, admin_client, stats_park):
+        """Test that BookingView edits and deletes update the totals"""
+        with app.app_context():
+            booking = Booking(user_id=_user_id(), park_id=stats_park, date=datetime(2027, 5, 5, 12),
+                              num_tickets=2, health_safety=True)
+            db.session.add(booking)
+            db.session.commit()
+            booking_id, user_id = booking.booking_id, booking.user_id
+            other_park = Park.query.filter(Park.park_id != stats_park).first().park_id
+
+        response = admin_client.post(f'/admin/booking/edit/?id={booking_id}', data={
+            'park': str(stats_park), 'user': str(user_id), 'date': '2027-05-06 12:00:00',
+            'num_tickets': '5', 'health_safety': 'y',
+        })
+        assert response.status_code == 302
+        with app.app_context():
+            assert _stats(stats_park, date(2027, 5, 5)) == (0, 0, 0)
+            assert _stats(stats_park, date(2027, 5, 6)) == (5, 1, 1)
+
+        admin_client.post(f'/admin/booking/edit/?id={booking_id}', data={
+            'park': str(other_park), 'user': str(user_id), 'date': '2027-05-06 12:00:00',
+            'num_tickets': '5', 'health_safety': 'y',
+        })
+        with app.app_context():
+            assert _stats(stats_park, date(2027, 5, 6)) == (0, 0, 0)
+            assert _stats(other_park, date(2027, 5, 6)) == (5, 1, 1)
+
+        assert admin_client.post('/admin/booking/delete/', data={'id': str(booking_id)}).status_code == 302
+        with app.app_context():
+            assert _stats(other_park, date(2027, 5, 6)) == (0, 0, 0)
+            ParkDailyStats.query.filter_by(park_id=other_park, day=date(2027, 5, 6)).delete()
+            db.session.commit()
+
+    def test_rebuild_matches_incremental(self, app, stats_park):
+        """Test that a rebuild from bookings gives the same totals"""
+        with app.app_context():
+            for day, tickets, ack in ((7, 1, True), (7, 3, True), (8, 2, False)):
+                db.session.add(Booking(user_id=_user_id(), park_id=stats_park, date=datetime(2027, 5, day, 10),
+                                       num_tickets=tickets, health_safety=ack))
+            db.session.commit()
+            incremental = [_stats(stats_park, date(2027, 5, d)) for d in (7, 8)]
+            with db.engine.begin() as conn:
+                assert rebuild(conn, stats_park) == 2
+            db.session.expire_all()
+            assert [_stats(stats_park, date(2027, 5, d)) for d in (7, 8)] == incremental == [(4, 2, 2), (2, 1, 0)]
+
+class TestAvailabilityEndpoint:
+    """Test GET /parks/<id>/availability"""
+
+    def test_range_is_zero_filled(self, app, client, authenticated_client, stats_park):
+        """Test one entry per day with remaining tickets"""
+        authenticated_client.post('/booking', data={'park_id': stats_park, 'date': '2027-06-02T10:00',
+                                                    'num_tickets': '7', 'health_safety': 'on'})
+        body = client.get(f'/parks/{stats_park}/availability?from=2027-06-01&to=2027-06-03').get_json()
+        assert body['capacity'] == 50
+        assert [d['day'] for d in body['days']] == ['2027-06-01', '2027-06-02', '2027-06-03']
+        assert body['days'][1] == {'day': '2027-06-02', 'capacity': 50, 'tickets_sold': 7, 'booking_count': 1,
+                                   'health_safety_acks': 1, 'tickets_remaining': 43}
+        assert body['days'][0]['tickets_remaining'] == 50
+
+    def test_agrees_with_reservations(self, app, client, stats_park):
+        """Test that availability reports the inventory reserve_tickets() checks, not a second count"""
+        from app.capacity import SoldOutError, reserve_tickets, set_capacity
+        with app.app_context():
+            reserve_tickets(stats_park, date(2027, 6, 10), 45)
+            set_capacity(stats_park, 46, date(2027, 6, 10))
+            db.session.commit()
+            with pytest.raises(SoldOutError):
+                reserve_tickets(stats_park, date(2027, 6, 10), 2)
+            db.session.rollback()
+        day = client.get(f'/parks/{stats_park}/availability?from=2027-06-10&to=2027-06-10').get_json()['days'][0]
+        assert (day['capacity'], day['tickets_sold'], day['tickets_remaining']) == (46, 45, 1)
+
+    def test_reads_only_the_totals(self, app, client, stats_park, max_queries):
+        """Test that bookings are never aggregated for the response"""
+        client.get(f'/parks/{stats_park}/availability')
+        with max_queries(1) as recorder:
+            client.get(f'/parks/{stats_park}/availability?from=2027-06-01&to=2027-06-30')
+        assert all('bookings' not in shape for shape in recorder.shapes())
+
+    def test_bad_requests(self, app, client, stats_park):
+        """Test unknown parks and bad ranges"""
+        assert client.get('/parks/999999/availability').status_code == 404
+        assert client.get(f'/parks/{stats_park}/availability?from=tomorrow').status_code == 400
+        assert client.get(f'/parks/{stats_park}/availability?from=2027-06-05&to=2027-06-01').status_code == 400
+        assert client.get(f'/parks/{stats_park}/availability?from=2027-01-01&to=2028-06-01').status_code == 400
@@ -0,0 +1,95 @@
+"""
+Integration tests for request metrics and the /metrics endpoint
+"""
+import pytest
+import sys
+import os
+
+# Add the main directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'main'))
+
+from app import metrics
+
+class TestMetrics:
+    """Test per-endpoint instrumentation"""
+
+    def test_metrics_endpoint_format(self, client):
+        """Test that /metrics serves Prometheus text"""
+        client.get('/')
+        response = client.get('/metrics')
+        assert response.status_code == 200
+        assert response.content_type.startswith('text/plain; version=0.0.4')
+        body = response.get_data(as_text=True)
+        assert '# TYPE http_request_duration_seconds histogram' in body
+        assert 'http_request_duration_seconds_bucket{endpoint="main.index",method="GET",le="+Inf"}' in body
+        assert 'http_requests_total{endpoint="main.index",method="GET",status="200"}' in body
+
+    def test_request_recorded(self, client):
+        """Test latency, status, size, template and DB time for one request"""
+        before = metrics.REQUEST_LATENCY.count('main.park_detail', 'GET')
+        templates = metrics.TEMPLATE_TIME.count('main.park_detail')
+        db_before = metrics.DB_QUERIES.value('main.park_detail')
+        client.get('/parks/1')
+        assert metrics.REQUEST_LATENCY.count('main.park_detail', 'GET') == before + 1
+        assert metrics.RESPONSE_SIZE.count('main.park_detail') >= 1
+        assert metrics.TEMPLATE_TIME.count('main.park_detail') == templates + 1
+        assert metrics.DB_QUERIES.value('main.park_detail') > db_before
+        assert metrics.IN_FLIGHT.value('main.park_detail') == 0
+
+    def test_status_codes_and_unmatched(self, client):
+        """Test that 404s are counted without raw paths as labels"""
+        client.get('/no/such/page/12345')
+        assert metrics.REQUESTS.value('unmatched', 'GET', '404') >= 1
+        assert '12345' not in client.get('/metrics').get_data(as_text=True)
+
+    def test_metrics_not_self_tracked(self, client):
+        """Test that scrapes and static files are left out"""
+        client.get('/metrics')
+        assert metrics.REQUEST_LATENCY.count('metrics', 'GET') == 0
+
+    def test_allowed_ips(self, client, app):
+        """Test that METRICS_ALLOWED_IPS restricts scrapers"""
+        app.config['METRICS_ALLOWED_IPS'] = ['10.0.0.1']
+        try:
+            assert client.get('/metrics').status_code == 403
+            assert client.get('/metrics', environ_base={'REMOTE_ADDR': '10.0.0.1'}).status_code == 200
+        finally:
+            app.config['METRICS_ALLOWED_IPS'] = []
+
+    def test_token(self, client, app):
+        """Test that METRICS_TOKEN admits bearer scrapers and closes the endpoint to everyone else"""
+        app.config['METRICS_TOKEN'] = 's3cret'
+        try:
+            assert client.get('/metrics').status_code == 403
+            assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 403
+            assert client.get('/metrics', headers={'Authorization': 'Bearer s3cret'}).status_code == 200
+        finally:
+            app.config['METRICS_TOKEN'] = None
+
+    def test_production_denies_external_scrapers(self, client, app):
+        """Test that the production defaults only serve /metrics to loopback"""
+        from config import config
+        app.config['METRICS_ALLOWED_IPS'] = config['production'].METRICS_ALLOWED_IPS
+        try:
+            assert client.get('/metrics', environ_base={'REMOTE_ADDR': '203.0.113.7'}).status_code == 403
+            assert client.get('/metrics', environ_base={'REMOTE_ADDR': '127.0.0.1'}).status_code == 200
+        finally:
+            app.config['METRICS_ALLOWED_IPS'] = []
+
+
+class TestHistogram:
+    """Test the in-process histogram"""
+
+    def test_buckets_are_cumulative(self):
+        """Test bucket placement and cumulative exposition"""
+        histogram = metrics.Histogram('h', 'help', ('x',), buckets=(1, 2))
+        for value in (0.5, 1.5, 1.5, 3):
+            histogram.observe(value, 'a')
+        lines = [f'{n}{l} {v}' for n, l, v in histogram.samples()]
+        assert lines == [
+            'h_bucket{x="a",le="1.0"} 1',
+            'h_bucket{x="a",le="2.0"} 3',
+            'h_bucket{x="a",le="+Inf"} 4',
+            'h_sum{x="a"} 6.5',
+            'h_count{x="a"} 4',
+        ]
@@ -0,0 +1,82 @@
+"""
+Integration tests for the paginated profile booking history
+"""
+import pytest
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add the main directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'main'))
+
+@pytest.fixture
+def frequent_visitor(app, client):
+    """A logged in user with 45 bookings spread over all parks"""
+    with app.app_context():
+        from app import db
+        from app.models import User, Park, Booking
+        user = User(name='Frequent', last_name='Visitor', email='frequent@example.com',
+                    password='x', role_id=1)
+        db.session.add(user)
+        db.session.commit()
+        parks = Park.query.all()
+        start = datetime.now() - timedelta(days=30)
+        db.session.add_all([
+            Booking(user_id=user.user_id, park_id=parks[i % len(parks)].park_id,
+                    date=start + timedelta(days=i), num_tickets=1, health_safety=True)
+            for i in range(45)
+        ])
+        db.session.commit()
+        user_id = user.user_id
+
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(user_id)
+    yield client
+
+    with app.app_context():
+        from app import db
+        from app.models import User, Booking
+        from app.principals import invalidate_principal
+        Booking.query.filter_by(user_id=user_id).delete()
+        db.session.delete(db.session.get(User, user_id))
+        db.session.commit()
+        invalidate_principal(user_id)
+
+class TestProfileBookings:
+    """Test the profile booking history"""
+
+    def test_first_page_and_counts(self, frequent_visitor):
+        """Test that the profile shows one page and SQL-computed counts"""
+        response = frequent_visitor.get('/profile')
+        assert response.status_code == 200
+        assert b'<strong>45</strong> total bookings' in response.data
+        assert response.data.count(b'class="ticket-count"') == 20
+        assert b'Older bookings' in response.data
+
+    def test_keyset_pages_cover_all_bookings(self, frequent_visitor, app):
+        """Test following the cursor visits every booking exactly once"""
+        from app.bookings import booking_history
+        with app.app_context():
+            from app.models import User
+            user = User.query.filter_by(email='frequent@example.com').first()
+            seen, cursor = [], None
+            while True:
+                rows, cursor = booking_history(user.user_id, cursor=cursor, per_page=20)
+                seen.extend(b.booking_id for b in rows)
+                if cursor is None:
+                    break
+            assert len(seen) == 45
+            assert len(set(seen)) == 45
+
+    def test_query_count_is_constant(self, frequent_visitor, max_queries):
+        """Test that rendering does not lazy load parks per booking"""
+        frequent_visitor.get('/profile')  # warm the principal cache
+        # the page (parks joined in) and the counts
+        with max_queries(2):
+            response = frequent_visitor.get('/profile')
+        assert response.status_code == 200
+
+    def test_invalid_cursor_redirects(self, frequent_visitor):
+        """Test that a garbage cursor falls back to the first page"""
+        response = frequent_visitor.get('/profile?before=not-a-cursor')
+        assert response.status_code == 302
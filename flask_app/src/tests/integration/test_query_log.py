@@ -0,0 +1,139 @@
+"""
+Integration tests for per-request query counting and N+1 detection
+"""
+import logging
+import pytest
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add the main directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'main'))
+
+from app import querylog
+from app.querylog import statement_shape, record_queries
+
+@pytest.fixture
+def bookings(app):
+    """Five bookings for the test user across all parks"""
+    with app.app_context():
+        from app import db
+        from app.models import User, Park, Booking
+        user = User.query.filter_by(email='test@example.com').first()
+        parks = Park.query.order_by(Park.park_id).all()
+        rows = [Booking(user_id=user.user_id, park_id=parks[i % len(parks)].park_id,
+                        date=datetime.now() + timedelta(days=i + 1), num_tickets=1, health_safety=True)
+                for i in range(5)]
+        db.session.add_all(rows)
+        db.session.commit()
+        ids = [row.booking_id for row in rows]
+    yield ids
+    with app.app_context():
+        from app import db
+        from app.models import Booking
+        Booking.query.filter(Booking.booking_id.in_(ids)).delete()
+        db.session.commit()
+
+class TestStatementShape:
+    """Test SQL normalisation"""
+
+    def test_literals_and_in_lists(self):
+        """Test that literals and IN lists collapse to one shape"""
+        a = statement_shape("SELECT * FROM parks WHERE park_id = 1 AND name = 'x'")
+        b = statement_shape("SELECT *  FROM parks\n WHERE park_id = 22 AND name = 'it''s'")
+        assert a == b == 'SELECT * FROM parks WHERE park_id = ? AND name = ?'
+        assert statement_shape('WHERE id IN (?, ?, ?)') == statement_shape('WHERE id IN (?)')
+
+    def test_identifiers_untouched(self):
+        """Test that numbered bind and alias names are kept"""
+        assert statement_shape('SELECT anon_1.park_id') == 'SELECT anon_1.park_id'
+
+class TestQueryLog:
+    """Test request recording, N+1 warnings and the pytest helpers"""
+
+    def test_lazy_loads_flagged_as_n_plus_one(self, app, bookings, caplog):
+        """Test that one lazy load per row is reported"""
+        app.config['QUERY_N_PLUS_ONE_THRESHOLD'] = 3
+        try:
+            with app.test_request_context('/profile'):
+                from app.models import Booking
+                querylog._before_request()
+                rows = Booking.query.filter(Booking.booking_id.in_(bookings)).all()
+                for row in rows:
+                    row.park.name
+                with caplog.at_level(logging.WARNING, logger='app.querylog'):
+                    querylog._teardown_request(None)
+        finally:
+            app.config['QUERY_N_PLUS_ONE_THRESHOLD'] = 5
+        assert any('Possible N+1' in r.getMessage() and 'FROM parks' in r.getMessage()
+                   for r in caplog.records)
+
+    def test_slow_queries_logged(self, client, app, caplog):
+        """Test the slow query log"""
+        app.config['QUERY_SLOW_MS'] = 0
+        try:
+            with caplog.at_level(logging.WARNING, logger='app.querylog'):
+                client.get('/parks/1')
+        finally:
+            app.config['QUERY_SLOW_MS'] = 200
+        assert any('Slow query' in r.getMessage() and 'main.park_detail' in r.getMessage()
+                   for r in caplog.records)
+
+    def test_query_count_header(self, client, app):
+        """Test X-Query-Count when enabled"""
+        app.config['QUERY_COUNT_HEADER'] = True
+        try:
+            response = client.get('/parks/1')
+        finally:
+            app.config['QUERY_COUNT_HEADER'] = False
+        assert int(response.headers['X-Query-Count']) >= 1
+        assert response.headers['X-Query-Time'].endswith('ms')
+
+    def test_record_queries_nests(self, app):
+        """Test that nested recorders both see statements"""
+        with app.app_context():
+            from app.models import Park
+            with record_queries() as outer:
+                Park.query.all()
+                with record_queries() as inner:
+                    Park.query.count()
+        assert inner.count == 1
+        assert outer.count == 2
+
+    def test_one_cursor_hook_feeds_metrics(self, client, app):
+        """Test that metrics count queries through querylog instead of hooking the engine again"""
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+        from app import metrics
+        assert event.contains(Engine, 'after_cursor_execute', querylog._query_finished)
+        assert metrics._query_finished in querylog._observers
+        before = metrics.DB_QUERIES.value('main.park_detail')
+        with record_queries() as recorder:
+            client.get('/parks/1')
+        assert metrics.DB_QUERIES.value('main.park_detail') - before == recorder.count > 0
+
+    def test_profile_query_budget(self, authenticated_client, bookings, max_queries):
+        """Test the profile page stays within its query budget"""
+        authenticated_client.get('/profile')
+        with max_queries(3):
+            assert authenticated_client.get('/profile').status_code == 200
+
+    def test_admin_booking_list_no_n_plus_one(self, admin_client, bookings, max_queries):
+        """Test that BookingView joins park and user instead of lazy loading"""
+        admin_client.get('/admin/booking/')
+        with max_queries(4) as recorder:
+            assert admin_client.get('/admin/booking/').status_code == 200
+        assert not recorder.repeated(3)
+
+    def test_max_queries_fixture_fails(self, app, max_queries):
+        """Test that going over budget fails with a report"""
+        with pytest.raises(AssertionError, match='expected at most 0 queries'):
+            with app.app_context():
+                from app.models import Park
+                with max_queries(0):
+                    Park.query.all()
+
+    @pytest.mark.max_queries(2)
+    def test_max_queries_marker(self, client):
+        """Test the marker on a cached page"""
+        client.get('/')
@@ -0,0 +1,131 @@
+"""
+Integration tests for read replica routing, using two SQLite files
+"""
+import pytest
+import sqlite3
+import sys
+import os
+
+# Add the main directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'main'))
+
+from app import create_app, db
+from app.cache import park_catalog
+from config import config
+
+@pytest.fixture(scope='module')
+def replica_app(tmp_path_factory):
+    """An app whose replica is a copy of the primary with one park renamed"""
+    tmp = tmp_path_factory.mktemp('replica')
+    primary, replica = tmp / 'primary.db', tmp / 'replica.db'
+    testing = config['testing']
+    saved = testing.SQLALCHEMY_DATABASE_URI, getattr(testing, 'SQLALCHEMY_BINDS', None)
+    testing.SQLALCHEMY_DATABASE_URI = f'sqlite:///{primary}'
+    testing.SQLALCHEMY_BINDS = {'replica': f'sqlite:///{replica}'}
+    try:
+        app = create_app('testing')
+    finally:
+        testing.SQLALCHEMY_DATABASE_URI = saved[0]
+        if saved[1] is None:
+            del testing.SQLALCHEMY_BINDS
+        else:
+            testing.SQLALCHEMY_BINDS = saved[1]
+
+    with app.app_context():
+        from tests.conftest import _create_test_data
+        db.create_all(bind_key=None)
+        _create_test_data()
+        park_id = db.session.execute(db.text('SELECT min(park_id) FROM parks')).scalar()
+        db.session.remove()
+
+    with sqlite3.connect(primary) as source, sqlite3.connect(replica) as target:
+        source.backup(target)
+        target.execute("UPDATE parks SET name = 'Replica Copy' WHERE park_id = ?", (park_id,))
+    app.config['PARK_ID'] = park_id
+    yield app
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+    # the extension keeps one MetaData per bind key across apps; drop ours so
+    # the session app's drop_all() does not look for a 'replica' bind
+    db.metadatas.pop('replica', None)
+
+@pytest.fixture(autouse=True)
+def cold_catalog():
+    """Start each test with an empty catalog cache outside any post-invalidation window"""
+    park_catalog._parks = None
+    park_catalog._primary_until = 0.0
+
+def _login(client, app, email):
+    with app.app_context():
+        from app.models import User
+        user_id = User.query.filter_by(email=email).first().user_id
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(user_id)
+
+class TestReplicaRouting:
+    """Test which engine each request reads from"""
+
+    def test_public_pages_read_replica(self, replica_app):
+        """Test that park_detail is served from the replica"""
+        client = replica_app.test_client()
+        html = client.get(f'/parks/{replica_app.config["PARK_ID"]}').get_data(as_text=True)
+        assert 'Replica Copy' in html
+
+    def test_catalog_refilled_from_primary_after_invalidation(self, replica_app):
+        """Test that the first fill after an invalidation does not cache the lagging replica"""
+        client = replica_app.test_client()
+        cached_names = lambda: {park['name'] for park in park_catalog._parks}
+        with replica_app.app_context():
+            park_catalog.invalidate()
+        assert client.get('/').status_code == 200
+        assert 'Replica Copy' not in cached_names()
+
+        park_catalog._primary_until = 0.0
+        park_catalog._parks = None
+        assert client.get('/').status_code == 200
+        assert 'Replica Copy' in cached_names()
+
+    def test_other_routes_read_primary(self, replica_app):
+        """Test that routes outside READ_REPLICA_ENDPOINTS use the primary"""
+        client = replica_app.test_client()
+        data = client.get(f'/api/v1/parks/{replica_app.config["PARK_ID"]}').get_json()
+        assert data['name'] == 'Replica Copy'
+        replica_app.config['READ_REPLICA_ENDPOINTS'] = ['main.index']
+        try:
+            data = client.get(f'/api/v1/parks/{replica_app.config["PARK_ID"]}').get_json()
+        finally:
+            replica_app.config['READ_REPLICA_ENDPOINTS'] = config['testing'].READ_REPLICA_ENDPOINTS
+        assert data['name'] == 'Leprechaun Park'
+
+    def test_read_your_writes_after_commit(self, replica_app):
+        """Test that a visitor who just wrote is pinned to the primary"""
+        client = replica_app.test_client()
+        url = f'/parks/{replica_app.config["PARK_ID"]}'
+        client.post('/contact', data={'name': 'Sticky', 'email': 's@example.com', 'message': 'hi'})
+        assert 'Leprechaun Park' in client.get(url).get_data(as_text=True)
+
+        with client.session_transaction() as sess:
+            sess['_primary_until'] = 0
+        assert 'Replica Copy' in client.get(url).get_data(as_text=True)
+
+    def test_booking_goes_to_primary(self, replica_app):
+        """Test that bookings are written to and read back from the primary"""
+        client = replica_app.test_client()
+        _login(client, replica_app, 'test@example.com')
+        response = client.post('/booking', data={'park_id': replica_app.config['PARK_ID'],
+                                                 'date': '2031-01-05', 'num_tickets': '2',
+                                                 'health_safety': 'on'})
+        assert response.status_code == 302
+        assert b'Leprechaun Park' in client.get('/profile').data
+
+        with replica_app.app_context():
+            rows = db.session.execute(db.text('SELECT count(*) FROM bookings'),
+                                      bind_arguments={'bind': db.engines['replica']}).scalar()
+        assert rows == 0
+
+    def test_admin_list_reads_replica(self, replica_app):
+        """Test that admin list views use the replica"""
+        client = replica_app.test_client()
+        _login(client, replica_app, 'admin@example.com')
+        assert b'Replica Copy' in client.get('/admin/park/').data
@@ -0,0 +1,80 @@
+"""
+Integration tests for the production-scale seed generator, on a SQLite file of its own
+"""
+import pytest
+import sys
+import os
+
+# Add the main directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'main'))
+
+from app import create_app, db
+from config import config
+
+@pytest.fixture(scope='module')
+def seeded_app(tmp_path_factory):
+    """A fresh database filled by `flask seed --scale` at a small size"""
+    path = tmp_path_factory.mktemp('seed') / 'scale.db'
+    testing = config['testing']
+    saved = testing.SQLALCHEMY_DATABASE_URI
+    testing.SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+    try:
+        app = create_app('testing')
+    finally:
+        testing.SQLALCHEMY_DATABASE_URI = saved
+    with app.app_context():
+        db.create_all()
+    result = app.test_cli_runner().invoke(args=[
+        'seed', '--scale', '--users', '300', '--parks', '6', '--bookings', '4000', '--messages', '200',
+        '--days', '120', '--future-days', '30', '--batch-size', '700'])
+    assert result.exit_code == 0, result.output
+    app.config['SEED_OUTPUT'] = result.output
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+def _scalar(sql):
+    return db.session.execute(db.text(sql)).scalar()
+
+class TestScaleSeed:
+    """Test volumes, distributions and the derived tables"""
+
+    def test_volumes(self, seeded_app):
+        """Test that the requested rows exist next to the dev fixtures"""
+        with seeded_app.app_context():
+            assert _scalar("SELECT count(*) FROM users WHERE email LIKE '%@scale.example.com'") == 300
+            assert _scalar('SELECT count(*) FROM parks') == 6 + 3
+            assert _scalar('SELECT count(*) FROM messages') == 200
+            assert 3900 <= _scalar('SELECT count(*) FROM bookings') <= 4000
+            assert _scalar("SELECT count(DISTINCT password) FROM users WHERE email LIKE '%@scale.example.com'") == 1
+        assert 'bookings:' in seeded_app.config['SEED_OUTPUT']
+
+    def test_repeat_customers(self, seeded_app):
+        """Test that a tenth of the customers make a large share of the bookings"""
+        with seeded_app.app_context():
+            counts = [row[0] for row in db.session.execute(db.text(
+                'SELECT count(*) FROM bookings GROUP BY user_id ORDER BY count(*) DESC'))]
+            assert sum(counts[:30]) > 0.3 * sum(counts)
+
+    def test_capacity_and_totals(self, seeded_app):
+        """Test that no day is oversold and the totals match the bookings"""
+        with seeded_app.app_context():
+            assert _scalar('SELECT count(*) FROM park_day_inventory WHERE tickets_sold > capacity') == 0
+            tickets = _scalar('SELECT sum(num_tickets) FROM bookings')
+            assert _scalar('SELECT sum(tickets_sold) FROM park_daily_stats') == tickets
+            assert _scalar('SELECT sum(tickets_sold) FROM park_day_inventory') == tickets
+
+    def test_indexes_and_search_restored(self, seeded_app):
+        """Test that indexes dropped for the load are back and the search index is filled"""
+        with seeded_app.app_context():
+            names = {row[0] for row in db.session.execute(db.text("SELECT name FROM sqlite_master WHERE type = 'index'"))}
+            assert {'ix_bookings_date', 'ix_bookings_park_id_date', 'ix_bookings_user_id_date',
+                    'ix_messages_created_at'} <= names
+            assert _scalar("SELECT count(*) FROM sqlite_master WHERE name = 'messages_fts_ai'") == 1
+            assert _scalar("SELECT count(*) FROM messages_fts WHERE messages_fts MATCH 'refund OR parking OR scarf'") > 0
+
+    def test_refuses_to_seed_twice(self, seeded_app):
+        """Test that a second run does not add a duplicate population"""
+        result = seeded_app.test_cli_runner().invoke(args=['seed', '--scale', '--users', '5', '--bookings', '5'])
+        assert result.exit_code != 0
+        assert 'already exist' in result.output
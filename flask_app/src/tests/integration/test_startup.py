@@ -0,0 +1,92 @@
+"""
+Integration tests for lazy admin mounting and the startup profiler, on a SQLite file of their own
+"""
+import json
+import pytest
+import sys
+import os
+
+# Add the main directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'main'))
+
+from app import create_app, db
+from config import config
+
+@pytest.fixture(scope='module')
+def database_url(tmp_path_factory):
+    """A filled database; the URI stays patched so the lazily built admin app finds it too"""
+    testing = config['testing']
+    saved = testing.SQLALCHEMY_DATABASE_URI
+    testing.SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path_factory.mktemp('startup') / 'startup.db'}"
+    app = create_app('testing', admin='off')
+    with app.app_context():
+        from tests.conftest import _create_test_data
+        db.create_all()
+        _create_test_data()
+        db.session.remove()
+    yield testing.SQLALCHEMY_DATABASE_URI
+    testing.SQLALCHEMY_DATABASE_URI = saved
+
+def _login(client, app, email):
+    with app.app_context():
+        from app.models import User
+        user_id = User.query.filter_by(email=email).first().user_id
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(user_id)
+
+class TestLazyAdmin:
+    """Test that /admin is served by an app built on first use"""
+
+    def test_not_built_before_admin_request(self, database_url):
+        """Test that public pages work without building the admin app"""
+        app = create_app('testing', admin='lazy')
+        assert app.wsgi_app._admin_app is None
+        assert app.test_client().get('/').status_code == 200
+        assert app.wsgi_app._admin_app is None
+        assert 'admin' not in app.blueprints
+
+    def test_anonymous_redirected_to_login(self, database_url):
+        """Test that the first /admin request builds the admin app and applies its access rules"""
+        app = create_app('testing', admin='lazy')
+        response = app.test_client().get('/admin/')
+        assert response.status_code == 302
+        assert '/login' in response.headers['Location']
+        assert 'admin' in app.wsgi_app._admin_app.blueprints
+
+    def test_admin_shares_login_session(self, database_url):
+        """Test that a session from the public app is accepted by the admin app"""
+        app = create_app('testing', admin='lazy')
+        client = app.test_client()
+        _login(client, app, 'admin@example.com')
+        assert client.get('/admin/user/').status_code == 200
+        assert client.get('/').status_code == 200
+
+    def test_off_mounts_nothing(self, database_url):
+        """Test that with the admin off /admin is not found"""
+        app = create_app('testing', admin='off')
+        assert app.test_client().get('/admin/').status_code == 404
+
+    def test_eager_registers_admin(self, database_url):
+        """Test that the default mode still registers the admin blueprint up front"""
+        app = create_app('testing')
+        assert 'admin' in app.blueprints
+        assert app.config['ADMIN_MOUNT'] == 'eager'
+
+    def test_phases_recorded(self, database_url):
+        """Test that create_app times each of its phases"""
+        app = create_app('testing', admin='lazy')
+        names = [name for name, seconds in app.extensions['startup_phases']]
+        assert names == ['config', 'database', 'extensions', 'models and login', 'admin', 'blueprints', 'cli']
+
+class TestStartupProfile:
+    """Test the flask startup-profile command"""
+
+    def test_lazy_profile(self, database_url):
+        """Test that a cold lazy start does not import Flask-Admin"""
+        app = create_app('testing', admin='off')
+        result = app.test_cli_runner().invoke(args=['startup-profile', '--admin', 'lazy', '--json'])
+        assert result.exit_code == 0, result.output
+        report = json.loads(result.output)['modes']['lazy']
+        assert report['flask_admin_loaded'] is False
+        assert report['admin_status'] == 302
+        assert report['imports_ms']['app'] > 0
@@ -0,0 +1,72 @@
+"""
+Unit tests for the fingerprinted static asset pipeline
+"""
+import gzip
+import pytest
+import sys
+import os
+
+# Add the main directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'main'))
+
+from app import assets
+
+@pytest.fixture
+def built_assets(app, tmp_path):
+    """Build the assets into a temporary dist folder and activate the manifest"""
+    dist = str(tmp_path / 'dist')
+    manifest = assets.build_assets(app.static_folder, app.config['ASSET_FILES'], dist)
+    app.config['ASSET_DIST_FOLDER'] = dist
+    assets.load_manifest(app)
+    yield manifest
+    app.config.pop('ASSET_DIST_FOLDER')
+    assets.load_manifest(app)
+
+class TestAssetPipeline:
+    """Test build_assets and fingerprinted serving"""
+
+    def test_build_writes_hashed_and_compressed_files(self, app, built_assets):
+        """Test that every asset gets a content hash and a gzip variant"""
+        dist = app.config['ASSET_DIST_FOLDER']
+        assert set(built_assets) == set(app.config['ASSET_FILES'])
+        hashed = built_assets['css/styles.css']
+        assert hashed.startswith('dist/css/styles.') and hashed.endswith('.css')
+        path = os.path.join(dist, hashed[len('dist/'):])
+        with open(os.path.join(app.static_folder, 'css/styles.css'), 'rb') as f:
+            original = f.read()
+        with gzip.open(path + '.gz') as f:
+            assert f.read() == original
+
+    def test_pages_link_fingerprinted_urls(self, client, built_assets):
+        """Test that url_for('static') resolves through the manifest"""
+        response = client.get('/')
+        assert ('/static/' + built_assets['css/styles.css']).encode() in response.data
+        assert ('/static/' + built_assets['js/main.js']).encode() in response.data
+
+    def test_fingerprinted_asset_is_immutable_and_compressed(self, client, built_assets):
+        """Test Cache-Control and Content-Encoding negotiation"""
+        url = '/static/' + built_assets['css/styles.css']
+        response = client.get(url, headers={'Accept-Encoding': 'gzip'})
+        assert response.status_code == 200
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'immutable' in response.headers['Cache-Control']
+        assert 'max-age=31536000' in response.headers['Cache-Control']
+        assert response.mimetype == 'text/css'
+        assert 'Accept-Encoding' in response.headers['Vary']
+
+        plain = client.get(url)
+        assert 'Content-Encoding' not in plain.headers
+        assert b'{' in plain.data
+
+    def test_brotli_preferred_when_available(self, client, built_assets):
+        """Test that br wins over gzip when both are accepted"""
+        assert assets.brotli is not None, 'Brotli is in requirements.txt'
+        url = '/static/' + built_assets['js/main.js']
+        response = client.get(url, headers={'Accept-Encoding': 'gzip, br'})
+        assert response.headers['Content-Encoding'] == 'br'
+
+    def test_without_manifest_falls_back_to_plain_static(self, client):
+        """Test that plain static files still work before a build"""
+        response = client.get('/static/css/styles.css')
+        assert response.status_code == 200
+        assert 'immutable' not in response.headers.get('Cache-Control', '')
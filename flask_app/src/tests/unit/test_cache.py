@@ -0,0 +1,89 @@
+"""
+Unit tests for the park catalog cache
+"""
+import pytest
+import sys
+import os
+
+# Add the main directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'main'))
+
+from app.cache import park_catalog
+from app.models import Park
+
+class TestParkCatalogCache:
+    """Test ParkCatalogCache hit/miss and invalidation"""
+
+    def test_second_read_is_a_hit(self, app):
+        """Test that a warm cache does not query again"""
+        with app.app_context():
+            park_catalog.invalidate()
+            park_catalog.reset_stats()
+
+            first = park_catalog.get_parks()
+            second = park_catalog.get_parks()
+
+            assert first is second
+            assert len(first) == Park.query.count()
+            stats = park_catalog.stats()
+            assert stats['misses'] == 1
+            assert stats['hits'] == 1
+
+    def test_commit_on_park_invalidates(self, app):
+        """Test that committing a Park change evicts the cache"""
+        with app.app_context():
+            from app import db
+            park_catalog.get_parks()
+            assert park_catalog.stats()['cached']
+
+            park = Park.query.first()
+            original = park.hours
+            park.hours = '1:00 AM - 2:00 AM'
+            db.session.commit()
+
+            assert not park_catalog.stats()['cached']
+            parks = park_catalog.get_parks()
+            assert any(p['hours'] == '1:00 AM - 2:00 AM' for p in parks)
+
+            park.hours = original
+            db.session.commit()
+
+    def test_rollback_does_not_invalidate(self, app):
+        """Test that a rolled back Park change keeps the cache"""
+        with app.app_context():
+            from app import db
+            park_catalog.get_parks()
+            park = Park.query.first()
+            park.hours = 'never'
+            db.session.flush()
+            db.session.rollback()
+
+            assert park_catalog.stats()['cached']
+
+    def test_ttl_expiry(self, app):
+        """Test that entries expire after PARK_CACHE_TTL"""
+        with app.app_context():
+            ttl = app.config['PARK_CACHE_TTL']
+            app.config['PARK_CACHE_TTL'] = 0
+            try:
+                park_catalog.invalidate()
+                park_catalog.reset_stats()
+                park_catalog.get_parks()
+                park_catalog.get_parks()
+                assert park_catalog.stats()['misses'] == 2
+            finally:
+                app.config['PARK_CACHE_TTL'] = ttl
+
+    def test_fill_racing_an_invalidation_is_not_kept(self, app, monkeypatch):
+        """Test that rows read before an invalidation are not cached after it"""
+        with app.app_context():
+            park_catalog.invalidate()
+            original = Park.to_json
+
+            def invalidated_mid_fill(park):
+                park_catalog.invalidate()
+                return original(park)
+
+            monkeypatch.setattr(Park, 'to_json', invalidated_mid_fill)
+            assert park_catalog.get_parks()
+            assert not park_catalog.stats()['cached']
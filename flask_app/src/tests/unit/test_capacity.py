@@ -0,0 +1,217 @@
+"""
+Unit tests for per-park, per-day ticket capacity
+"""
+import pytest
+import sys
+import os
+from datetime import date, datetime
+
+# Add the main directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'main'))
+
+from app.models import Park, ParkDayInventory
+from app.capacity import reserve_tickets, release_tickets, tickets_remaining, SoldOutError
+
+@pytest.fixture
+def small_park(app):
+    """A park that only sells 5 tickets a day"""
+    with app.app_context():
+        from app import db
+        park = Park(
+            name='Tiny Park',
+            location='Sligo',
+            description='Very small',
+            short_description='Very small',
+            slug='tiny-park-capacity',
+            daily_capacity=5
+        )
+        db.session.add(park)
+        db.session.commit()
+        park_id = park.park_id
+
+    yield park_id
+
+    with app.app_context():
+        from app import db
+        from app.models import Booking, ParkDailyStats
+        Booking.query.filter_by(park_id=park_id).delete()
+        ParkDailyStats.query.filter_by(park_id=park_id).delete()
+        ParkDayInventory.query.filter_by(park_id=park_id).delete()
+        db.session.delete(db.session.get(Park, park_id))
+        db.session.commit()
+
+class TestCapacity:
+    """Test reserve_tickets / release_tickets"""
+
+    def test_first_reservation_opens_the_day(self, app, small_park):
+        """Test that the inventory row is created on first sale"""
+        with app.app_context():
+            from app import db
+            day = date(2027, 1, 1)
+            reserve_tickets(small_park, day, 2)
+            db.session.commit()
+
+            row = db.session.get(ParkDayInventory, (small_park, day))
+            assert row.capacity == 5
+            assert row.tickets_sold == 2
+            assert tickets_remaining(small_park, day) == 3
+
+    def test_cannot_oversell(self, app, small_park):
+        """Test that a reservation past capacity raises SoldOutError"""
+        with app.app_context():
+            from app import db
+            day = date(2027, 1, 2)
+            reserve_tickets(small_park, day, 4)
+            db.session.commit()
+
+            with pytest.raises(SoldOutError):
+                reserve_tickets(small_park, day, 2)
+            db.session.rollback()
+
+            reserve_tickets(small_park, day, 1)
+            db.session.commit()
+            assert tickets_remaining(small_park, day) == 0
+
+    def test_release_returns_tickets(self, app, small_park):
+        """Test that released tickets can be sold again"""
+        with app.app_context():
+            from app import db
+            day = date(2027, 1, 3)
+            reserve_tickets(small_park, day, 5)
+            release_tickets(small_park, day, 3)
+            db.session.commit()
+            assert tickets_remaining(small_park, day) == 3
+
+    def test_unopened_day_reports_full_capacity(self, app, small_park):
+        """Test tickets_remaining for a day with no sales"""
+        with app.app_context():
+            assert tickets_remaining(small_park, date(2027, 6, 1)) == 5
+
+    def test_invalid_ticket_count(self, app, small_park):
+        """Test that zero tickets is rejected"""
+        with app.app_context():
+            with pytest.raises(ValueError):
+                reserve_tickets(small_park, date(2027, 1, 4), 0)
+
+    def test_booking_route_rejects_sold_out_day(self, authenticated_client, app, small_park):
+        """Test that POST /booking does not create a booking past capacity"""
+        with app.app_context():
+            from app.models import Booking
+            before = Booking.query.filter_by(park_id=small_park).count()
+
+            response = authenticated_client.post('/booking', data={
+                'park_id': small_park,
+                'date': '2027-02-01T10:00',
+                'num_tickets': '6',
+                'health_safety': 'on'
+            })
+
+            assert response.status_code == 302
+            assert '/booking/new' in response.location
+            assert Booking.query.filter_by(park_id=small_park).count() == before
+
+    def test_booking_route_bad_input_is_not_sold_out(self, authenticated_client, small_park):
+        """Test that a bad ticket count gets a validation message and an unknown park a 404"""
+        data = {'park_id': small_park, 'date': '2027-02-01T10:00', 'num_tickets': '0'}
+        response = authenticated_client.post('/booking', data=data, follow_redirects=True)
+        assert b'at least one ticket' in response.data
+        assert b'not enough tickets' not in response.data
+
+        data['num_tickets'] = 'two'
+        response = authenticated_client.post('/booking', data=data, follow_redirects=True)
+        assert b'at least one ticket' in response.data
+
+        data.update(park_id=99999, num_tickets='1')
+        assert authenticated_client.post('/booking', data=data).status_code == 404
+
+def _sold(park_id, day):
+    from app import db
+    row = db.session.get(ParkDayInventory, (park_id, day))
+    return None if row is None else row.tickets_sold
+
+class TestAdminInventory:
+    """Test that BookingView and ParkView keep park_day_inventory in step"""
+
+    def test_admin_booking_create_edit_delete(self, app, admin_client, small_park):
+        """Test that admin writes reserve, move and release tickets"""
+        with app.app_context():
+            from app.models import Booking, User
+            user_id = User.query.filter_by(email='test@example.com').first().user_id
+        form = {'park': str(small_park), 'user': str(user_id), 'date': '2027-03-01 10:00:00',
+                'num_tickets': '3', 'health_safety': 'y'}
+        assert admin_client.post('/admin/booking/new/', data=form).status_code == 302
+        with app.app_context():
+            booking_id = Booking.query.filter_by(park_id=small_park).one().booking_id
+            assert _sold(small_park, date(2027, 3, 1)) == 3
+
+        admin_client.post(f'/admin/booking/edit/?id={booking_id}', data=dict(form, date='2027-03-02 10:00:00',
+                                                                              num_tickets='4'))
+        with app.app_context():
+            assert _sold(small_park, date(2027, 3, 1)) == 0
+            assert _sold(small_park, date(2027, 3, 2)) == 4
+
+        assert admin_client.post('/admin/booking/delete/', data={'id': str(booking_id)}).status_code == 302
+        with app.app_context():
+            assert _sold(small_park, date(2027, 3, 2)) == 0
+            assert Booking.query.filter_by(park_id=small_park).count() == 0
+
+    def test_admin_cannot_oversell(self, app, admin_client, small_park):
+        """Test that an admin booking past capacity is refused and nothing is kept"""
+        with app.app_context():
+            from app.models import Booking, User
+            user_id = User.query.filter_by(email='test@example.com').first().user_id
+        response = admin_client.post('/admin/booking/new/', data={
+            'park': str(small_park), 'user': str(user_id), 'date': '2027-03-03 10:00:00',
+            'num_tickets': '6', 'health_safety': 'y'}, follow_redirects=True)
+        assert b'Not enough tickets left' in response.data
+        with app.app_context():
+            assert Booking.query.filter_by(park_id=small_park).count() == 0
+            assert not _sold(small_park, date(2027, 3, 3))
+
+    def test_capacity_edit_applies_to_open_days(self, app, small_park):
+        """Test that a new daily_capacity reaches today's and later rows but not past ones"""
+        from app import db
+        from app.capacity import set_capacity
+        with app.app_context():
+            reserve_tickets(small_park, date(2027, 4, 1), 2)
+            reserve_tickets(small_park, date(2027, 4, 2), 2)
+            set_capacity(small_park, 3, date(2027, 4, 2))
+            db.session.commit()
+            assert db.session.get(ParkDayInventory, (small_park, date(2027, 4, 1))).capacity == 5
+            assert tickets_remaining(small_park, date(2027, 4, 2)) == 1
+            set_capacity(small_park, 1, date(2027, 4, 2))
+            db.session.commit()
+            assert tickets_remaining(small_park, date(2027, 4, 2)) == 0
+
+    def test_zero_capacity_accepted(self, app, admin_client, small_park):
+        """Test that ParkView accepts 0 (closed) for daily_capacity"""
+        from app import db
+        with app.app_context():
+            park = db.session.get(Park, small_park)
+            form = {name: str(getattr(park, name) or 'x') for name in (
+                'name', 'location', 'description', 'image_path', 'short_description', 'slug', 'folder',
+                'hours', 'min_age', 'price', 'wait_time', 'height_requirement')}
+        form.update(base_price_cents='1000', daily_capacity='0')
+        assert admin_client.post(f'/admin/park/edit/?id={small_park}', data=form).status_code == 302
+        with app.app_context():
+            assert db.session.get(Park, small_park).daily_capacity == 0
+
+    def test_backfill_from_bookings(self, app, small_park):
+        """Test that rebuild_inventory counts bookings that never went through reserve_tickets"""
+        from app import db
+        from app.capacity import rebuild_inventory
+        from app.daily_stats import rebuild
+        from app.models import Booking, User
+        with app.app_context():
+            user_id = User.query.filter_by(email='test@example.com').first().user_id
+            reserve_tickets(small_park, date(2027, 5, 1), 4)  # stale: no booking behind it
+            db.session.add(Booking(user_id=user_id, park_id=small_park, date=datetime(2027, 5, 2, 10),
+                                   num_tickets=3, health_safety=True))
+            db.session.commit()
+            assert _sold(small_park, date(2027, 5, 2)) is None
+            with db.engine.begin() as conn:
+                rebuild(conn, small_park)
+                assert rebuild_inventory(conn) >= 1
+            db.session.expire_all()
+            assert _sold(small_park, date(2027, 5, 1)) == 0
+            assert _sold(small_park, date(2027, 5, 2)) == 3
@@ -0,0 +1,109 @@
+"""
+Unit tests for the {% cache %} Jinja fragment cache
+"""
+import pytest
+import sys
+import os
+
+# Add the main directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'main'))
+
+from app import fragments
+from app.cache import TTLCache
+
+class CountingBackend(TTLCache):
+    """TTLCache that remembers the TTL each fragment was stored with"""
+
+    def __init__(self):
+        super().__init__()
+        self.ttls = []
+
+    def set(self, key, value, ttl=None):
+        self.ttls.append(ttl)
+        super().set(key, value, ttl)
+
+@pytest.fixture
+def backend(app):
+    """Swap in a fresh backend for one test"""
+    previous = app.extensions['fragment_cache']
+    app.extensions['fragment_cache'] = CountingBackend()
+    yield app.extensions['fragment_cache']
+    app.extensions['fragment_cache'] = previous
+
+def _render(app, source, **context):
+    with app.test_request_context():
+        return app.jinja_env.from_string(source).render(**context)
+
+class TestFragmentCache:
+    """Test the cache tag, keys and backends"""
+
+    def test_body_rendered_once_per_key(self, app, backend):
+        """Test that a cached fragment is not re-rendered"""
+        calls = []
+        source = "{% cache ['k', n] %}{{ tick() }}{% endcache %}"
+        tick = lambda: calls.append(1) or len(calls)
+        assert _render(app, source, n=1, tick=tick) == '1'
+        assert _render(app, source, n=1, tick=tick) == '1'
+        assert _render(app, source, n=2, tick=tick) == '2'
+        assert backend.hits == 1
+
+    def test_ttl_argument(self, app, backend):
+        """Test explicit and default TTLs"""
+        _render(app, "{% cache 'a', 42 %}x{% endcache %}")
+        _render(app, "{% cache 'b' %}x{% endcache %}")
+        assert backend.ttls == [42, app.config['FRAGMENT_CACHE_TTL']]
+
+    def test_same_key_in_two_places(self, app, backend):
+        """Test that the tag location is part of the key"""
+        html = _render(app, "{% cache 'k' %}one{% endcache %}|\n{% cache 'k' %}two{% endcache %}")
+        assert html == 'one|\ntwo'
+
+    def test_output_not_escaped_twice(self, app, backend):
+        """Test that cached HTML is emitted as markup"""
+        source = "{% cache 'm' %}<b>{{ v }}</b>{% endcache %}"
+        assert _render(app, source, v='<i>') == '<b>&lt;i&gt;</b>'
+        assert _render(app, source, v='<i>') == '<b>&lt;i&gt;</b>'
+
+    def test_null_backend(self, app):
+        """Test that the null backend always renders"""
+        previous = app.extensions['fragment_cache']
+        app.extensions['fragment_cache'] = fragments.NullBackend()
+        try:
+            source = "{% cache 'n' %}{{ v }}{% endcache %}"
+            assert _render(app, source, v=1) == '1'
+            assert _render(app, source, v=2) == '2'
+        finally:
+            app.extensions['fragment_cache'] = previous
+
+    def test_park_edit_refreshes_card(self, client, app, backend):
+        """Test that park cards are keyed by the park version"""
+        assert b'Park' in client.get('/').data
+        cached = len(backend._data)
+        client.get('/')
+        assert backend.hits >= cached
+
+        with app.app_context():
+            from app import db
+            from app.models import Park
+            park = Park.query.order_by(Park.park_id).first()
+            original = park.name
+            park.name = 'Renamed Fright Park'
+            db.session.commit()
+
+        try:
+            assert b'Renamed Fright Park' in client.get('/').data
+        finally:
+            with app.app_context():
+                from app import db
+                from app.models import Park
+                Park.query.order_by(Park.park_id).first().name = original
+                db.session.commit()
+
+    def test_navbar_keyed_by_user(self, app, authenticated_client, backend):
+        """Test that anonymous and logged-in visitors get their own navbar"""
+        from flask import g
+        anonymous = app.test_client().get('/').get_data(as_text=True)
+        g.pop('_login_user', None)
+        logged_in = authenticated_client.get('/').get_data(as_text=True)
+        assert 'Login' in anonymous and 'Welcome' not in anonymous
+        assert 'Welcome' in logged_in
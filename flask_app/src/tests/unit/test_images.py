@@ -0,0 +1,98 @@
+"""
+Unit tests for the responsive image derivative pipeline
+"""
+import pytest
+import sys
+import os
+
+# Add the main directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'main'))
+
+from app import images
+
+WIDTHS = {'gallery': [320, 640], 'thumb': [100], 'banner': [480], 'logo': [200]}
+
+@pytest.fixture
+def static_tree(tmp_path):
+    """A tiny static folder with one park: two gallery photos, a banner and a logo"""
+    from PIL import Image
+    park = tmp_path / 'images' / 'parks' / 'tiny'
+    (park / 'gallery').mkdir(parents=True)
+    for i in (1, 2):
+        Image.new('RGB', (800, 600), (i * 80, 0, 0)).save(park / 'gallery' / f'{i}.jpg')
+    Image.new('RGBA', (1000, 300), (0, 0, 0, 0)).save(park / 'banner.png')
+    Image.new('RGBA', (500, 500), (0, 255, 0, 128)).save(park / 'logo.png')
+    return tmp_path
+
+@pytest.fixture
+def manifest(app, static_tree):
+    """Build derivatives for the tiny park and activate its manifest"""
+    built = images.build_images(str(static_tree), ['tiny'], WIDTHS, formats=('webp', 'jpeg'))
+    previous = app.extensions.get('image_manifest', {})
+    app.extensions['image_manifest'] = built
+    yield built
+    app.extensions['image_manifest'] = previous
+
+class TestImagePipeline:
+    """Test build_images and the picture() macro"""
+
+    def test_manifest_entries(self, static_tree, manifest):
+        """Test widths, formats and thumbnail aliases in the manifest"""
+        photo = manifest['images/parks/tiny/gallery/1.jpg']
+        assert photo['width'] == 800
+        assert [w for w, _ in photo['srcset']['jpeg']] == [320, 640]
+        assert [w for w, _ in photo['srcset']['webp']] == [320, 640]
+        for _, path in photo['srcset']['webp']:
+            assert os.path.exists(static_tree / path)
+
+        thumb = manifest['images/parks/tiny/gallery/thumb2.jpg']
+        assert [w for w, _ in thumb['srcset']['jpeg']] == [100]
+
+    def test_transparent_sources_fall_back_to_png(self, manifest):
+        """Test that logos with alpha keep a PNG fallback"""
+        logo = manifest['images/parks/tiny/logo.png']
+        assert logo['fallback_type'] == 'image/png'
+        assert 'jpeg' not in logo['srcset']
+
+    def test_widths_never_upscale(self, manifest):
+        """Test that requested widths above the source are clamped"""
+        banner = manifest['images/parks/tiny/banner.png']
+        assert max(w for w, _ in banner['srcset']['png']) <= 1000
+
+    def test_park_detail_emits_srcset(self, client, app, manifest):
+        """Test that park_detail renders picture/srcset from the manifest"""
+        with app.app_context():
+            from app import db
+            from app.models import Park
+            park = Park(name='Tiny', location='Cavan', description='d', short_description='s',
+                        slug='tiny-images', folder='tiny', image_path='images/parks/tiny/logo.png')
+            db.session.add(park)
+            db.session.commit()
+            park_id = park.park_id
+
+        try:
+            html = client.get(f'/parks/{park_id}').get_data(as_text=True)
+            assert 'type="image/webp"' in html
+            assert 'derived/parks/tiny/gallery/1-640.jpg 640w' in html
+            assert 'derived/parks/tiny/gallery/thumb1-100.webp 100w' in html
+            assert 'loading="lazy"' in html
+
+            index = client.get('/').get_data(as_text=True)
+            assert 'derived/parks/tiny/logo-200.webp 200w' in index
+        finally:
+            with app.app_context():
+                from app import db
+                from app.models import Park
+                db.session.delete(db.session.get(Park, park_id))
+                db.session.commit()
+
+    def test_without_manifest_uses_original(self, client, app):
+        """Test the plain <img> fallback"""
+        previous = app.extensions.get('image_manifest', {})
+        app.extensions['image_manifest'] = {}
+        try:
+            html = client.get('/').get_data(as_text=True)
+            assert '/static/images/parks/witches/hat.png' in html
+            assert 'loading="lazy"' in html
+        finally:
+            app.extensions['image_manifest'] = previous
@@ -0,0 +1,147 @@
+"""
+Unit tests for the contact message write-behind buffer
+"""
+import fcntl
+import json
+import pytest
+import subprocess
+import sys
+import os
+
+# Add the main directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'main'))
+
+from app.message_buffer import MessageBuffer
+
+SETTINGS = {
+    'MESSAGE_BUFFER_ENABLED': True,
+    'MESSAGE_BUFFER_FLUSH_INTERVAL': 0.05,
+    'MESSAGE_BUFFER_BATCH_SIZE': 20,
+    'MESSAGE_SPOOL_FSYNC': False,
+}
+
+@pytest.fixture
+def buffer(app, tmp_path):
+    """An enabled buffer spooling into a temporary directory"""
+    saved = {key: app.config.get(key) for key in list(SETTINGS) + ['MESSAGE_SPOOL_DIR', 'MESSAGE_SPOOL_MAX_BYTES']}
+    previous = app.extensions['message_buffer']
+    app.config.update(SETTINGS, MESSAGE_SPOOL_DIR=str(tmp_path))
+    buffer = MessageBuffer()
+    buffer.init_app(app)
+    yield buffer
+    buffer.close()
+    app.config.update(saved)
+    app.extensions['message_buffer'] = previous
+
+def _count(app, name):
+    with app.app_context():
+        from app.models import Message
+        return Message.query.filter_by(name=name).count()
+
+def _dead_pid():
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+def _write_spool(path, name):
+    """Three records, the first acked, and a torn last line"""
+    records = [{'seq': i, 'name': name, 'email': 'c@example.com', 'message': str(i),
+                'created_at': '2030-01-01T00:00:00'} for i in (1, 2, 3)]
+    lines = [json.dumps(records[0]), json.dumps({'ack': 1}),
+             json.dumps(records[1]), json.dumps(records[2]), '{"seq": 4, "na']
+    path.write_text('\n'.join(lines))
+
+class TestMessageBuffer:
+    """Test enqueueing, batching, the spool and crash recovery"""
+
+    def test_contact_enqueues(self, client, app, buffer):
+        """Test that the contact route hands off to the buffer"""
+        response = client.post('/contact', data={'name': 'Buffered', 'email': 'b@example.com',
+                                                 'message': 'boo'})
+        assert response.status_code == 200
+        assert buffer.flush()
+        assert _count(app, 'Buffered') == 1
+
+    def test_batches(self, app, buffer):
+        """Test that rows are inserted in batches, not one by one"""
+        for i in range(50):
+            buffer.enqueue('Batch', 'b@example.com', f'message {i}')
+        assert buffer.flush()
+        stats = buffer.stats()
+        assert stats['pending'] == 0
+        assert stats['inserted'] == 50
+        assert 3 <= stats['batches'] < 50
+        assert _count(app, 'Batch') == 50
+
+    def test_spool_records_and_acks(self, app, buffer, tmp_path):
+        """Test the append-only spool file"""
+        buffer.enqueue('Spool', 's@example.com', 'hi')
+        assert buffer.flush()
+        lines = [json.loads(l) for l in open(buffer._spool_path())]
+        assert lines[0]['name'] == 'Spool' and lines[0]['seq'] == 1
+        assert lines[-1] == {'ack': 1}
+
+    def test_spool_truncated_when_drained(self, app, buffer, tmp_path):
+        """Test that a fully acked spool is compacted"""
+        app.config['MESSAGE_SPOOL_MAX_BYTES'] = 0
+        buffer.enqueue('Compact', 'c@example.com', 'hi')
+        assert buffer.flush()
+        assert os.path.getsize(buffer._spool_path()) == 0
+
+    def test_spool_named_per_start(self, app, buffer, tmp_path):
+        """Test that the spool name is unique per process start, not just per PID"""
+        buffer.enqueue('Named', 'n@example.com', 'hi')
+        assert buffer.flush()
+        name = os.path.basename(buffer._spool_path())
+        assert name.startswith(f'spool-{os.getpid()}-') and name.endswith('.jsonl')
+        assert os.path.exists(buffer._spool_path('.lock'))
+
+    def test_clean_close_removes_spool(self, app, buffer):
+        """Test that a drained buffer leaves nothing to replay"""
+        buffer.enqueue('Closed', 'c@example.com', 'hi')
+        assert buffer.flush()
+        path = buffer._spool_path()
+        buffer.close()
+        assert not os.path.exists(path)
+
+    def test_recover_dead_process_spool(self, app, buffer, tmp_path):
+        """Test that unacked records of a crashed process are replayed once"""
+        path = tmp_path / f'spool-{_dead_pid()}-0123abcd.jsonl'
+        _write_spool(path, 'Crashed')
+
+        assert buffer.recover() == 2
+        assert not path.exists()
+        assert _count(app, 'Crashed') == 2
+        assert buffer.recover() == 0
+
+    def test_recover_spool_with_reused_pid(self, app, buffer, tmp_path):
+        """Test that a spool from an earlier run whose PID is now ours is still replayed"""
+        path = tmp_path / f'spool-{os.getpid()}-0123abcd.jsonl'
+        _write_spool(path, 'Reused')
+        assert buffer.recover() == 2
+        assert _count(app, 'Reused') == 2
+
+    def test_locked_spool_left_alone(self, app, buffer, tmp_path):
+        """Test that a spool whose owner still holds its lock is not stolen"""
+        path = tmp_path / 'spool-1-live.jsonl'
+        _write_spool(path, 'Live')
+        with open(tmp_path / 'spool-1-live.lock', 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            assert buffer.recover() == 0
+            assert path.exists()
+        assert buffer.recover() == 2
+
+    def test_bad_record_dead_lettered(self, app, buffer, tmp_path):
+        """Test that a record the database rejects is set aside and the rest of its batch still lands"""
+        for i in range(5):
+            buffer.enqueue('Neighbour', 'n@example.com', f'message {i}')
+        buffer.enqueue(None, 'bad@example.com', 'no name')
+        for i in range(5):
+            buffer.enqueue('Neighbour', 'n@example.com', f'message {i + 5}')
+        assert buffer.flush()
+        assert _count(app, 'Neighbour') == 10
+        assert buffer.stats()['dead_letters'] == 1
+        assert buffer.stats()['pending'] == 0
+        letters = [json.loads(l) for l in open(tmp_path / 'dead-letters.jsonl')]
+        assert letters[0]['email'] == 'bad@example.com'
+        assert 'IntegrityError' in letters[0]['error']
@@ -0,0 +1,75 @@
+"""
+Unit tests for schema migrations and the hot query plan check
+"""
+import pytest
+import sys
+import os
+
+# Add the main directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'main'))
+
+from sqlalchemy import create_engine, inspect, text
+from app import db
+from app.migrations import MIGRATIONS, upgrade, current_version, check_plans
+
+HOT_INDEXES = ('ix_bookings_user_id_date', 'ix_bookings_park_id_date',
+               'ix_messages_created_at', 'ix_users_role_id')
+
+@pytest.fixture
+def legacy_engine(app):
+    """A database built by the old db.create_all(): no indexes, no version table"""
+    engine = create_engine('sqlite://')
+    with app.app_context():
+        db.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for name in HOT_INDEXES:
+            conn.execute(text(f'DROP INDEX {name}'))
+    yield engine
+    engine.dispose()
+
+class TestMigrations:
+    """Test upgrade() and check_plans()"""
+
+    def test_fresh_database_upgrades_to_latest(self, app):
+        """Test that an empty database reaches the latest version"""
+        engine = create_engine('sqlite://')
+        with app.app_context():
+            applied = upgrade(engine)
+        assert [number for number, _ in applied] == [m[0] for m in MIGRATIONS]
+        with engine.begin() as conn:
+            assert current_version(conn) == MIGRATIONS[-1][0]
+        engine.dispose()
+
+    def test_upgrade_is_idempotent(self, app):
+        """Test that a second upgrade applies nothing"""
+        engine = create_engine('sqlite://')
+        with app.app_context():
+            upgrade(engine)
+            assert upgrade(engine) == []
+        engine.dispose()
+
+    def test_legacy_database_gets_indexes(self, app, legacy_engine):
+        """Test that the index migration fixes full scans on a legacy schema"""
+        with app.app_context():
+            before = check_plans(legacy_engine)
+            assert 'users by role' in before
+            assert 'message inbox newest first' in before
+
+            upgrade(legacy_engine)
+
+            indexes = set()
+            for table in ('bookings', 'messages', 'users'):
+                indexes |= {ix['name'] for ix in inspect(legacy_engine).get_indexes(table)}
+            assert set(HOT_INDEXES) <= indexes
+            assert check_plans(legacy_engine) == {}
+
+    def test_app_schema_has_no_full_scans(self, app):
+        """Test the registered hot queries against the test database"""
+        with app.app_context():
+            assert check_plans() == {}
+
+    def test_check_plans_cli(self, runner):
+        """Test flask schema check-plans"""
+        result = runner.invoke(args=['schema', 'check-plans'])
+        assert result.exit_code == 0
+        assert 'FULL SCAN' not in result.output
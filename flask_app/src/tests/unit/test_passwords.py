@@ -0,0 +1,111 @@
+"""
+Unit tests for the password hashing service
+"""
+import pytest
+import sys
+import os
+
+# Add the main directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'main'))
+
+from werkzeug.security import generate_password_hash
+from app.passwords import hash_password, verify_password, needs_rehash, shutdown_pool
+
+class TestPasswordService:
+    """Test hash_password / verify_password / needs_rehash"""
+
+    def test_hash_uses_configured_method(self, app):
+        """Test that new hashes use PASSWORD_HASH_METHOD"""
+        with app.app_context():
+            hashed = hash_password('secret')
+            assert hashed.startswith(app.config['PASSWORD_HASH_METHOD'] + '$')
+            assert verify_password(hashed, 'secret')
+            assert not verify_password(hashed, 'wrong')
+            assert not needs_rehash(hashed)
+
+    def test_outdated_hash_needs_rehash(self, app):
+        """Test that cheaper hashes and other algorithms are flagged"""
+        with app.app_context():
+            assert needs_rehash(generate_password_hash('x', method='pbkdf2:sha256:500'))
+            assert needs_rehash(generate_password_hash('x', method='scrypt'))
+
+    def test_stronger_hash_is_kept(self, app):
+        """Test that a hash costlier than the configured method is not rewritten"""
+        with app.app_context():
+            method = app.config['PASSWORD_HASH_METHOD']
+            app.config['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:600000'
+            try:
+                assert not needs_rehash(generate_password_hash('x', method='pbkdf2:sha256:1000000'))
+                assert needs_rehash(generate_password_hash('x', method='pbkdf2:sha256:2000'))
+            finally:
+                app.config['PASSWORD_HASH_METHOD'] = method
+
+    def test_default_method_is_not_weaker_than_werkzeug(self):
+        """Test that the shipped default matches werkzeug's own PBKDF2 cost"""
+        from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS
+        from config import Config
+        assert Config.PASSWORD_HASH_METHOD == f'pbkdf2:sha256:{DEFAULT_PBKDF2_ITERATIONS}'
+
+    def test_default_cost_factors_are_normalised(self, app):
+        """Test that a method without iterations matches werkzeug's defaults"""
+        with app.app_context():
+            method = app.config['PASSWORD_HASH_METHOD']
+            app.config['PASSWORD_HASH_METHOD'] = 'scrypt'
+            try:
+                assert not needs_rehash(generate_password_hash('x', method='scrypt'))
+            finally:
+                app.config['PASSWORD_HASH_METHOD'] = method
+
+    def test_missing_password_does_not_verify(self, app):
+        """Test None / empty inputs"""
+        with app.app_context():
+            assert not verify_password(None, 'x')
+            assert not verify_password(hash_password('x'), None)
+
+    def test_process_pool(self, app):
+        """Test hashing and verification through the process pool"""
+        with app.app_context():
+            app.config['PASSWORD_HASH_WORKERS'] = 1
+            try:
+                hashed = hash_password('pooled')
+                assert verify_password(hashed, 'pooled')
+                assert not verify_password(hashed, 'nope')
+            finally:
+                app.config['PASSWORD_HASH_WORKERS'] = 0
+                shutdown_pool()
+
+    def test_full_queue_times_out(self, app):
+        """Test that a request gives up when every pool slot stays taken"""
+        from app import passwords
+        with app.app_context():
+            app.config.update(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_MAX_PENDING=1, PASSWORD_HASH_TIMEOUT=0.05)
+            try:
+                hash_password('warm')
+                passwords._pending.acquire()
+                try:
+                    with pytest.raises(TimeoutError):
+                        hash_password('blocked')
+                finally:
+                    passwords._pending.release()
+            finally:
+                app.config.update(PASSWORD_HASH_WORKERS=0, PASSWORD_HASH_MAX_PENDING=32, PASSWORD_HASH_TIMEOUT=30)
+                shutdown_pool()
+
+    def test_login_upgrades_outdated_hash(self, client, app):
+        """Test that a successful login rewrites an outdated hash"""
+        with app.app_context():
+            from app import db
+            from app.models import User
+            user = User(name='Old', last_name='Hash', email='oldhash@example.com', role_id=1,
+                        password=generate_password_hash('legacy', method='pbkdf2:sha256:500'))
+            db.session.add(user)
+            db.session.commit()
+
+        response = client.post('/login', data={'email': 'oldhash@example.com', 'password': 'legacy'})
+        assert response.status_code == 302
+        assert '/profile' in response.location
+
+        with app.app_context():
+            user = User.query.filter_by(email='oldhash@example.com').first()
+            assert not needs_rehash(user.password)
+            assert verify_password(user.password, 'legacy')
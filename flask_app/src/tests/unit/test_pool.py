@@ -0,0 +1,110 @@
+"""
+Unit tests for pool sizing and pool health metrics
+"""
+import pytest
+import sys
+import os
+
+# Add the main directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'main'))
+
+from sqlalchemy import create_engine, exc, text
+from config import pool_options
+from app import pool
+from app.metrics import registry
+
+@pytest.fixture
+def engine(tmp_path):
+    """A one-connection instrumented pool on a SQLite file"""
+    engine = create_engine(f'sqlite:///{tmp_path / "pool.db"}', poolclass=pool.TimedQueuePool,
+                           pool_size=1, max_overflow=0, pool_timeout=0.05)
+    pool.instrument(engine, 'unit')
+    yield engine
+    pool._engines.pop(('web', 'unit'), None)
+    engine.dispose()
+
+class TestPoolOptions:
+    """Test pool sizing from workers and threads"""
+
+    def test_one_connection_per_thread(self):
+        """Test the default shape for a small deployment"""
+        options = pool_options(workers=2, threads=8, max_connections=151)
+        assert options['pool_size'] == 8
+        assert options['max_overflow'] == 4
+        assert options['pool_pre_ping'] is True
+        assert options['pool_recycle'] < 8 * 3600
+
+    def test_capped_by_max_connections(self):
+        """Test that many workers never exceed the server limit"""
+        options = pool_options(workers=20, threads=8, max_connections=100)
+        assert 20 * (options['pool_size'] + options['max_overflow']) <= 100
+
+    def test_admin_only_app_gets_a_small_pool(self):
+        """Test that the lazily built admin app is capped at ADMIN_POOL_SIZE without overflow"""
+        from flask import Flask
+        admin_app = Flask(__name__)
+        admin_app.config.update(SQLALCHEMY_ENGINE_OPTIONS=pool_options(2, 8, 151), ADMIN_POOL_SIZE=2)
+        pool.apply_pool_class(admin_app, admin_only=True)
+        options = admin_app.config['SQLALCHEMY_ENGINE_OPTIONS']
+        assert (options['pool_size'], options['max_overflow']) == (2, 0)
+        assert options['poolclass'] is pool.TimedQueuePool
+
+    def test_production_leaves_room_for_admin_pools(self):
+        """Test that web pools plus one admin pool per worker fit in max_connections"""
+        import config
+        options = config.ProductionConfig.SQLALCHEMY_ENGINE_OPTIONS
+        per_worker = options['pool_size'] + options['max_overflow'] + config.ADMIN_POOL_SIZE
+        assert config.WEB_CONCURRENCY * per_worker <= config.DB_MAX_CONNECTIONS
+
+    def test_pool_class_only_for_sized_pools(self, app):
+        """Test that in-memory SQLite keeps its StaticPool"""
+        with app.app_context():
+            from app import db
+            assert not isinstance(db.engine.pool, pool.TimedQueuePool)
+
+class TestPoolMetrics:
+    """Test checkout wait, timeouts, invalidations and gauges"""
+
+    def test_checkout_wait_and_timeout(self, engine):
+        """Test that an exhausted pool records a timeout"""
+        waits = pool.POOL_WAIT.count('web', 'unit')
+        timeouts = pool.POOL_TIMEOUTS.value('web', 'unit')
+        with engine.connect():
+            with pytest.raises(exc.TimeoutError):
+                engine.connect()
+        assert pool.POOL_WAIT.count('web', 'unit') == waits + 2
+        assert pool.POOL_TIMEOUTS.value('web', 'unit') == timeouts + 1
+
+    def test_invalidations_counted(self, engine):
+        """Test hard invalidation events"""
+        before = pool.POOL_INVALIDATIONS.value('web', 'unit', 'hard')
+        with engine.connect() as conn:
+            conn.execute(text('SELECT 1'))
+            conn.invalidate()
+        assert pool.POOL_INVALIDATIONS.value('web', 'unit', 'hard') == before + 1
+
+    def test_gauges_sampled_on_scrape(self, engine):
+        """Test size / checked out / overflow in the exposition"""
+        with engine.connect():
+            body = registry.render()
+        assert 'db_pool_size{app="web",bind="unit"} 1' in body
+        assert 'db_pool_checked_out{app="web",bind="unit"} 1' in body
+        assert 'db_pool_overflow{app="web",bind="unit"}' in body
+
+    def test_apps_labelled_separately(self, engine, tmp_path):
+        """Test that the admin app's engine does not replace the web app's series"""
+        admin_engine = create_engine(f'sqlite:///{tmp_path / "pool.db"}', poolclass=pool.TimedQueuePool,
+                                     pool_size=2, max_overflow=0)
+        pool.instrument(admin_engine, 'unit', app_label='admin')
+        try:
+            body = registry.render()
+            assert 'db_pool_size{app="web",bind="unit"} 1' in body
+            assert 'db_pool_size{app="admin",bind="unit"} 2' in body
+        finally:
+            pool._engines.pop(('admin', 'unit'), None)
+            admin_engine.dispose()
+
+    def test_label_survives_dispose(self, engine):
+        """Test that a recreated pool keeps its bind label"""
+        engine.dispose()
+        assert engine.pool.metrics_labels == ('web', 'unit')
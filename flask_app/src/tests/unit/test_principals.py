@@ -0,0 +1,107 @@
+"""
+Unit tests for the authenticated-principal cache
+"""
+import pytest
+import sys
+import os
+
+# Add the main directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'main'))
+
+from app.principals import load_principal, invalidate_principal, principal_cache
+from app.querylog import record_queries
+
+def _user_queries(recorder):
+    return [s for s, _ in recorder.queries if 'FROM users' in s or 'FROM roles' in s]
+
+class TestPrincipalCache:
+    """Test load_principal and invalidation"""
+
+    def test_principal_carries_roles(self, app):
+        """Test the principal exposes id, name and role names"""
+        with app.app_context():
+            from app.models import User
+            admin = User.query.filter_by(email='admin@example.com').first()
+            invalidate_principal()
+            principal = load_principal(admin.user_id)
+            assert principal.get_id() == str(admin.user_id)
+            assert principal.name == 'Admin'
+            assert principal.has_role('admin')
+            assert not principal.has_role('user')
+            assert principal.is_authenticated
+
+    def test_unknown_user(self, app):
+        """Test that a missing user is not cached"""
+        with app.app_context():
+            assert load_principal(99999) is None
+            assert principal_cache.get(99999) is None
+
+    def test_cached_page_view_runs_no_user_queries(self, authenticated_client, app):
+        """Test that a warm cache serves a logged-in page with no user/role queries"""
+        authenticated_client.get('/booking/new')
+        with record_queries() as recorder:
+            authenticated_client.get('/booking/new')
+        assert not _user_queries(recorder)
+
+    def test_admin_access_uses_cached_roles(self, admin_client, app):
+        """Test that the admin index accepts the cached principal"""
+        admin_client.get('/admin/')
+        with record_queries() as recorder:
+            assert admin_client.get('/admin/').status_code == 200
+        assert not _user_queries(recorder)
+
+    def test_invalidate_reloads(self, app):
+        """Test that invalidation picks up a changed name"""
+        with app.app_context():
+            from app import db
+            from app.models import User
+            user = User.query.filter_by(email='test@example.com').first()
+            load_principal(user.user_id)
+
+            db.session.execute(db.update(User).where(User.user_id == user.user_id).values(name='Renamed'))
+            db.session.commit()
+            assert load_principal(user.user_id).name == 'Test'
+
+            invalidate_principal(user.user_id)
+            assert load_principal(user.user_id).name == 'Renamed'
+
+            db.session.execute(db.update(User).where(User.user_id == user.user_id).values(name='Test'))
+            db.session.commit()
+            invalidate_principal(user.user_id)
+
+    def test_evicted_after_commit_not_before(self, app):
+        """Test that a User change evicts its principal only once it is committed"""
+        with app.app_context():
+            from app import db
+            from app.models import User
+            user = User.query.filter_by(email='test@example.com').first()
+            load_principal(user.user_id)
+
+            user.last_name = 'Flushed'
+            db.session.flush()
+            assert principal_cache.get(user.user_id) is not None
+            db.session.rollback()
+            assert principal_cache.get(user.user_id) is not None
+
+            user.last_name = 'Committed'
+            db.session.commit()
+            assert principal_cache.get(user.user_id) is None
+            assert load_principal(user.user_id).last_name == 'Committed'
+
+            user.last_name = 'User'
+            db.session.commit()
+
+    def test_role_change_evicts_everyone(self, app):
+        """Test that a committed Role change clears every cached principal"""
+        with app.app_context():
+            from app import db
+            from app.models import User, Role
+            user = User.query.filter_by(email='test@example.com').first()
+            load_principal(user.user_id)
+            role = db.session.get(Role, 1)
+            role.name = 'visitor'
+            db.session.commit()
+            assert principal_cache.get(user.user_id) is None
+
+            role.name = 'user'
+            db.session.commit()
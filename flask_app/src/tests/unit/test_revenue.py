@@ -0,0 +1,163 @@
+"""
+Unit tests for structured pricing and the revenue report
+"""
+import pytest
+import sys
+import os
+from datetime import date, datetime
+
+# Add the main directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'main'))
+
+from app import db
+from app.models import Booking, Park, PriceModifier, PriceTier
+from app.pricing import PriceBook, apply_percent, format_cents, parse_display_price
+from app.revenue import RevenueTotals, revenue_report
+
+START, END = date(2027, 7, 1), date(2027, 7, 14)  # 2027-07-01 is a Thursday
+
+def _book():
+    modifiers = [
+        PriceModifier(park_id=None, name='Weekend', weekdays='56', percent=10),
+        PriceModifier(park_id=1, name='Summer fest', starts_on=date(2027, 7, 10), ends_on=date(2027, 7, 11), percent=25),
+    ]
+    return PriceBook({1: 4000, 2: 3000}, [(1, 4, 3500), (1, 10, 3000)], modifiers, START, END)
+
+@pytest.fixture
+def priced_park(app):
+    """A park with a group tier, a weekend surcharge and four bookings"""
+    with app.app_context():
+        from app.models import User
+        park = Park(name='Revenue Park', location='Galway', description='Money', short_description='Money',
+                    slug='revenue-park', base_price_cents=2000)
+        db.session.add(park)
+        db.session.flush()
+        db.session.add_all([
+            PriceTier(park_id=park.park_id, min_tickets=5, unit_price_cents=1500),
+            PriceModifier(park_id=park.park_id, name='Weekend', weekdays='56', percent=50),
+        ])
+        user_id = User.query.filter_by(email='test@example.com').first().user_id
+        for when, tickets in ((datetime(2027, 7, 1, 10), 2),   # Thu: 2 x 20.00
+                              (datetime(2027, 7, 1, 15), 5),   # Thu: 5 x 15.00
+                              (datetime(2027, 7, 3, 11), 1),   # Sat: 20.00 + 50%
+                              (datetime(2027, 7, 6, 9), 3)):   # next Tue: 3 x 20.00
+            db.session.add(Booking(user_id=user_id, park_id=park.park_id, date=when,
+                                   num_tickets=tickets, health_safety=True))
+        db.session.commit()
+        park_id = park.park_id
+    yield park_id
+    with app.app_context():
+        from app.models import ParkDailyStats
+        Booking.query.filter_by(park_id=park_id).delete()
+        ParkDailyStats.query.filter_by(park_id=park_id).delete()
+        PriceTier.query.filter_by(park_id=park_id).delete()
+        PriceModifier.query.filter_by(park_id=park_id).delete()
+        db.session.delete(db.session.get(Park, park_id))
+        db.session.commit()
+
+class TestPricing:
+    """Test base prices, tiers and date modifiers"""
+
+    def test_parse_display_price(self):
+        """Test the one-off parse of the old display strings"""
+        assert parse_display_price('Starting at $39.99') == 3999
+        assert parse_display_price('From $45') == 4500
+        assert parse_display_price('$7.5 per person') == 750
+        assert parse_display_price('Free entry', default=0) == 0
+
+    def test_rounding_and_formatting(self):
+        """Test half-up percentage rounding and cent formatting"""
+        assert apply_percent(3999, 10) == 4399
+        assert apply_percent(1005, -50) == 503
+        assert format_cents(123456) == '1,234.56'
+        assert format_cents(-5) == '-0.05'
+
+    def test_tiers(self):
+        """Test that the largest tier reached sets the unit price"""
+        book = _book()
+        thursday = date(2027, 7, 1)
+        assert book.quote(1, thursday, 3) == 3 * 4000
+        assert book.quote(1, thursday, 4) == 4 * 3500
+        assert book.quote(1, thursday, 25) == 25 * 3000
+        assert book.quote(2, thursday, 25) == 25 * 3000
+
+    def test_modifiers_stack(self):
+        """Test weekday and date-range modifiers, per park and for all parks"""
+        book = _book()
+        assert book.quote(2, date(2027, 7, 3), 1) == 3300            # Saturday +10%
+        assert book.quote(1, date(2027, 7, 10), 1) == 5400           # Saturday +10% +25%
+        assert book.quote(2, date(2027, 7, 12), 1) == 3000           # Monday
+        assert book.quote(1, date(2027, 7, 11), 1) == 5400           # Sunday, still in the festival
+
+class TestRevenueTotals:
+    """Test the chunked aggregation"""
+
+    ROWS = [(1, 0, 2), (2, 0, 1), (1, 0, 12), (1, 9, 4), (2, 13, 3)]  # (park_id, day offset, tickets)
+
+    def _totals(self, use_numpy, chunk=2):
+        totals = RevenueTotals(_book(), use_numpy=use_numpy)
+        for i in range(0, len(self.ROWS), chunk):
+            totals.add(*zip(*self.ROWS[i:i + chunk]))
+        return totals
+
+    def test_python_path(self):
+        """Test per-day cells and rollups without NumPy"""
+        totals = self._totals(use_numpy=False)
+        book = _book()
+        assert totals.rows == 5 and totals.chunks == 3
+        cells = list(totals.cells())
+        assert cells[0] == (1, date(2027, 7, 1), 2, 14, 2 * 4000 + 12 * 3000)
+        assert cells[1] == (1, date(2027, 7, 10), 1, 4, book.quote(1, date(2027, 7, 10), 4))
+        by_park = {row['park_id']: row for row in totals.rows_by('park')}
+        assert by_park[2]['tickets'] == 4 and by_park[2]['bookings'] == 2
+        weeks = [(row['park_id'], row['period']) for row in totals.rows_by('week')]
+        assert weeks == [(1, date(2027, 6, 28)), (1, date(2027, 7, 5)), (2, date(2027, 6, 28)), (2, date(2027, 7, 12))]
+
+    def test_numpy_matches_python(self):
+        """Test that the vectorized path gives identical totals"""
+        from app.pricing import np
+        assert np is not None, 'numpy is in requirements.txt; the vectorized path must be tested'
+        assert list(self._totals(use_numpy=True).cells()) == list(self._totals(use_numpy=False).cells())
+
+class TestRevenueReport:
+    """Test the report against the database, the CLI and the admin view"""
+
+    def test_report_by_day_week_and_park(self, app, priced_park):
+        """Test revenue from streamed chunks"""
+        with app.app_context():
+            rows, summary = revenue_report(START, END, 'day', chunk_size=3)
+            mine = [row for row in rows if row['park_id'] == priced_park]
+            assert [(row['period'], row['tickets'], row['revenue_cents']) for row in mine] == [
+                (date(2027, 7, 1), 7, 4000 + 7500), (date(2027, 7, 3), 1, 3000), (date(2027, 7, 6), 3, 6000)]
+            assert mine[0]['park'] == 'Revenue Park'
+            assert summary['chunks'] == -(-summary['bookings'] // 3)
+
+            rows, _ = revenue_report(START, END, 'week')
+            assert [(r['period'], r['revenue_cents']) for r in rows if r['park_id'] == priced_park] == [
+                (date(2027, 6, 28), 14500), (date(2027, 7, 5), 6000)]
+            rows, summary = revenue_report(START, END, 'park', use_numpy=False)
+            assert [r['revenue_cents'] for r in rows if r['park_id'] == priced_park] == [20500]
+            with pytest.raises(ValueError):
+                revenue_report(START, END, 'month')
+
+    def test_cli_report(self, app, priced_park):
+        """Test CSV output from flask revenue report"""
+        result = app.test_cli_runner().invoke(
+            args=['revenue', 'report', '--from', '2027-07-01', '--to', '2027-07-14', '--by', 'park', '--python'])
+        assert result.exit_code == 0, result.output
+        lines = result.stdout.splitlines()
+        assert lines[0] == 'park_id,park,period,bookings,tickets,revenue'
+        assert f'{priced_park},Revenue Park,,4,11,205.00' in lines
+        assert '4 bookings in 1 chunks' in result.stderr
+
+    def test_admin_view(self, app, priced_park):
+        """Test the admin revenue page and its range guard"""
+        client = app.test_client()
+        with app.app_context():
+            from app.models import User
+            admin_id = User.query.filter_by(email='admin@example.com').first().user_id
+        with client.session_transaction() as sess:
+            sess['_user_id'] = str(admin_id)
+        body = client.get('/admin/revenue/?from=2027-07-01&to=2027-07-14&by=week').get_data(as_text=True)
+        assert 'Revenue Park' in body and '145.00' in body and '60.00' in body
+        assert client.get('/admin/revenue/?from=2020-01-01&to=2027-01-01').status_code == 302
@@ -0,0 +1,110 @@
+"""
+Unit tests for the message full-text search index
+"""
+import pytest
+import sys
+import os
+
+# Add the main directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'main'))
+
+from sqlalchemy import create_engine, text
+from app import db, search
+from app.migrations import upgrade
+
+@pytest.fixture
+def inbox(app):
+    """A few messages inserted through the ORM and through a Core bulk insert"""
+    with app.app_context():
+        from app.models import Message
+        orm = Message(name='Morticia', email='m@example.com', message='The pumpkin maze was pumpkin perfect')
+        db.session.add(orm)
+        db.session.commit()
+        db.session.execute(db.insert(Message), [
+            {'name': 'Gomez', 'email': 'g@example.com', 'message': 'Lost my hat near the pumpkin patch, great day out'},
+            {'name': 'Lurch', 'email': 'lurch@example.com', 'message': 'You rang? The ghost train was slow'},
+        ])
+        db.session.commit()
+        ids = [m.message_id for m in Message.query.filter(Message.name.in_(['Morticia', 'Gomez', 'Lurch']))]
+    yield ids
+    with app.app_context():
+        from app.models import Message
+        Message.query.filter(Message.message_id.in_(ids)).delete()
+        db.session.commit()
+
+def _search(term):
+    matches = search.match_messages(term, db.engine.dialect.name)
+    rows = db.session.execute(db.select(matches.c.message_id).order_by(matches.c.score)).scalars()
+    from app.models import Message
+    return [db.session.get(Message, i).name for i in rows]
+
+class TestSearchQuery:
+    """Test how the search box is turned into FTS syntax"""
+
+    def test_sqlite_prefix_and_quoting(self):
+        """Test that words are quoted and the last one is a prefix"""
+        assert search.sqlite_query('ghost tra') == '"ghost" "tra"*'
+        assert search.sqlite_query('a"b OR') == '"a" "b" "OR"*'
+        assert search.sqlite_query('  %% ') is None
+
+    def test_mysql_boolean_mode(self):
+        """Test required words in boolean mode"""
+        assert search.mysql_query('ghost tra') == '+ghost +tra*'
+
+    def test_unsupported_dialect(self):
+        """Test that other databases fall back"""
+        assert search.match_messages('ghost', 'postgresql') is None
+
+class TestSearchIndex:
+    """Test index sync and ranking"""
+
+    def test_finds_orm_and_bulk_inserts(self, app, inbox):
+        """Test that triggers index both insert paths"""
+        with app.app_context():
+            assert set(_search('pumpkin')) == {'Morticia', 'Gomez'}
+            assert _search('lurch') == ['Lurch']
+            assert _search('gho') == ['Lurch']
+
+    def test_ranked(self, app, inbox):
+        """Test that the closer match comes first"""
+        with app.app_context():
+            assert _search('pumpkin')[0] == 'Morticia'
+
+    def test_update_and_delete_stay_in_sync(self, app, inbox):
+        """Test the update and delete triggers"""
+        with app.app_context():
+            from app.models import Message
+            lurch = Message.query.filter_by(name='Lurch').first()
+            lurch.message = 'Only bats here'
+            db.session.commit()
+            assert _search('ghost') == []
+            assert _search('bats') == ['Lurch']
+            db.session.delete(lurch)
+            db.session.commit()
+            assert _search('bats') == []
+
+    def test_migration_builds_index_for_existing_rows(self, app):
+        """Test that upgrading a database indexes messages already there"""
+        engine = create_engine('sqlite://')
+        with app.app_context():
+            upgrade(engine, target=5)
+            with engine.begin() as conn:
+                search.drop_index(conn)
+                conn.execute(text("INSERT INTO messages (name, email, message) VALUES ('Old', 'o@example.com', 'vintage scream')"))
+            upgrade(engine)
+        with engine.connect() as conn:
+            hits = conn.execute(text(f"SELECT rowid FROM {search.FTS_TABLE} WHERE {search.FTS_TABLE} MATCH 'vintage'")).all()
+        assert len(hits) == 1
+        engine.dispose()
+
+    def test_admin_search_uses_index(self, app, inbox):
+        """Test MessageView search results and order"""
+        client = app.test_client()
+        with app.app_context():
+            from app.models import User
+            admin_id = User.query.filter_by(email='admin@example.com').first().user_id
+        with client.session_transaction() as sess:
+            sess['_user_id'] = str(admin_id)
+        html = client.get('/admin/message/?search=pumpkin').get_data(as_text=True)
+        assert 'Morticia' in html and 'Gomez' in html and 'Lurch' not in html
+        assert html.index('Morticia') < html.index('Gomez')
@@ -0,0 +1,153 @@
+"""
+Unit tests for the SQLite pragma profile and commit_with_retry
+"""
+import pytest
+import sqlite3
+import sys
+import os
+
+# Add the main directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'main'))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from app.transactions import commit_with_retry, is_retryable
+
+def _locked():
+    return OperationalError('INSERT', {}, sqlite3.OperationalError('database is locked'))
+
+@pytest.fixture
+def no_delay(app):
+    """Retry without sleeping"""
+    previous = app.config['DB_RETRY_BASE_DELAY']
+    app.config['DB_RETRY_BASE_DELAY'] = 0
+    yield
+    app.config['DB_RETRY_BASE_DELAY'] = previous
+
+class TestSqlitePragmas:
+    """Test the connect-time pragma profile"""
+
+    def test_profile_bound_to_app_engines(self, tmp_path):
+        """Test WAL, synchronous and busy_timeout on a file database, even outside an app context"""
+        from app import create_app, db
+        from config import config
+        testing = config['testing']
+        saved = testing.SQLALCHEMY_DATABASE_URI
+        testing.SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp_path / "profile.db"}'
+        try:
+            app = create_app('testing', admin='off')
+        finally:
+            testing.SQLALCHEMY_DATABASE_URI = saved
+        with app.app_context():
+            engine = db.engine
+        with engine.connect() as conn:
+            pragma = lambda name: conn.execute(text(f'PRAGMA {name}')).scalar()
+            assert pragma('journal_mode') == 'wal'
+            assert pragma('synchronous') == 1
+            assert pragma('busy_timeout') == 5000
+            assert pragma('foreign_keys') == 1
+        engine.dispose()
+
+    def test_foreign_keys_only_on_other_engines(self, app, tmp_path):
+        """Test that engines the app did not create keep the old behaviour"""
+        engine = create_engine(f'sqlite:///{tmp_path / "plain.db"}')
+        with app.app_context(), engine.connect() as conn:
+            assert conn.execute(text('PRAGMA journal_mode')).scalar() == 'delete'
+            assert conn.execute(text('PRAGMA foreign_keys')).scalar() == 1
+        engine.dispose()
+
+class TestCommitWithRetry:
+    """Test bounded retry of locked commits"""
+
+    def test_retries_then_succeeds(self, app, no_delay):
+        """Test that a locked unit of work is re-run"""
+        calls = []
+        def work():
+            calls.append(1)
+            if len(calls) < 3:
+                raise _locked()
+            return 'done'
+        with app.app_context():
+            assert commit_with_retry(work) == 'done'
+        assert len(calls) == 3
+
+    def test_gives_up_after_attempts(self, app, no_delay):
+        """Test that the last lock error is raised"""
+        calls = []
+        def work():
+            calls.append(1)
+            raise _locked()
+        with app.app_context(), pytest.raises(OperationalError):
+            commit_with_retry(work, attempts=4)
+        assert len(calls) == 4
+
+    def test_other_errors_not_retried(self, app, no_delay):
+        """Test that non-lock operational errors fail fast"""
+        calls = []
+        def work():
+            calls.append(1)
+            raise OperationalError('SELECT', {}, sqlite3.OperationalError('no such table: x'))
+        with app.app_context(), pytest.raises(OperationalError):
+            commit_with_retry(work)
+        assert len(calls) == 1
+
+    def test_mysql_codes(self):
+        """Test deadlock and lock wait timeout detection"""
+        class MySQLError(Exception):
+            pass
+        assert is_retryable(OperationalError('UPDATE', {}, MySQLError(1213, 'Deadlock found')))
+        assert is_retryable(OperationalError('UPDATE', {}, MySQLError(1205, 'Lock wait timeout')))
+        assert not is_retryable(OperationalError('UPDATE', {}, MySQLError(1054, 'Unknown column')))
+
+    def test_contact_form_commits(self, client, app):
+        """Test the contact route through commit_with_retry"""
+        response = client.post('/contact', data={'name': 'Retry', 'email': 'r@example.com',
+                                                 'message': 'hello'})
+        assert response.status_code == 200
+        with app.app_context():
+            from app.models import Message
+            assert Message.query.filter_by(name='Retry').count() == 1
+
+    def test_api_booking_retries_lock(self, authenticated_client, app, no_delay, monkeypatch):
+        """Test that POST /api/v1/bookings re-runs a locked booking instead of failing"""
+        import app.api as api
+        calls = []
+        def flaky_reserve(*args):
+            calls.append(1)
+            if len(calls) == 1:
+                raise _locked()
+            return reserve(*args)
+        reserve = api.reserve_tickets
+        monkeypatch.setattr(api, 'reserve_tickets', flaky_reserve)
+        with app.app_context():
+            from app.models import Park
+            park_id = Park.query.first().park_id
+
+        response = authenticated_client.post('/api/v1/bookings', json={
+            'park_id': park_id, 'date': '2029-04-04', 'num_tickets': 1
+        })
+        assert response.status_code == 201
+        assert len(calls) == 2
+
+    def test_api_booking_busy_is_503(self, authenticated_client, app, no_delay, monkeypatch):
+        """Test that a lock that outlasts the retries is a 503, not a 500"""
+        import app.api as api
+        def locked(*args):
+            raise _locked()
+        monkeypatch.setattr(api, 'reserve_tickets', locked)
+        response = authenticated_client.post('/api/v1/bookings', json={
+            'park_id': 1, 'date': '2029-04-04', 'num_tickets': 1
+        })
+        assert response.status_code == 503
+
+    def test_contact_form_busy(self, client, app, no_delay, monkeypatch):
+        """Test that a lock outlasting the retries is reported instead of a 500"""
+        from app import db
+        def locked():
+            raise _locked()
+        monkeypatch.setattr(db.session, 'commit', locked)
+        response = client.post('/contact', data={'name': 'Busy', 'email': 'b@example.com',
+                                                 'message': 'hello'})
+        assert response.status_code == 200
+        assert b'very busy' in response.data
+        assert b'Thank you' not in response.data